@@ -87,6 +87,9 @@ setup(
             "get_next_uv_dates=siglatools.bin.get_next_uv_dates:main",
             "run_qa_test=siglatools.bin.run_qa_test:main",
             "load_spreadsheets=siglatools.bin.load_spreadsheets:main",
+            "promote=siglatools.bin.promote:main",
+            "siglatools=siglatools.bin.run_jobs:main",
+            "run_benchmark=siglatools.bin.run_benchmark:main",
         ],
     },
     install_requires=requirements,
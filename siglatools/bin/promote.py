@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script will get deployed in the bin directory of the
+users' virtualenv when the parent module is installed using pip.
+"""
+
+import argparse
+import logging
+import sys
+import traceback
+
+from siglatools import get_module_version
+
+from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+
+def promote(staging_db_connection_url: str, prod_db_connection_url: str):
+    """
+    Publish the staging database to production.
+    The staging collections and their indexes are copied as they are, so production
+    serves exactly the documents that were checked on staging.
+
+    Parameters
+    ----------
+    staging_db_connection_url: str
+        The Staging DB's connection url str.
+    prod_db_connection_url: str
+        The Production DB's connection url str.
+    """
+    # The database client is imported once the arguments are checked
+    from ..databases.mongodb_database import MongoDBDatabase
+
+    database = MongoDBDatabase(staging_db_connection_url)
+    database.promote(prod_db_connection_url)
+    database.close_connection()
+
+
+###############################################################################
+# Args
+
+
+class Args(argparse.Namespace):
+    def __init__(self):
+        self.__parse()
+
+    def __parse(self):
+        # Set up parser
+        p = argparse.ArgumentParser(
+            prog="promote",
+            description="A script to copy the staging database to the production database.",
+        )
+        # Arguments
+        p.add_argument(
+            "-v",
+            "--version",
+            action="version",
+            version="%(prog)s " + get_module_version(),
+        )
+        p.add_argument(
+            "-sdbcu",
+            "--staging_db_connection_url",
+            action="store",
+            dest="staging_db_connection_url",
+            type=str,
+            help="The Staging Database Connection URL",
+        )
+        p.add_argument(
+            "-pdbcu",
+            "--prod_db_connection_url",
+            action="store",
+            dest="prod_db_connection_url",
+            type=str,
+            help="The Production Database Connection URL",
+        )
+        p.add_argument(
+            "--debug", action="store_true", dest="debug", help=argparse.SUPPRESS
+        )
+        # Parse
+        p.parse_args(namespace=self)
+
+
+###############################################################################
+
+
+def main():
+    try:
+        args = Args()
+        dbg = args.debug
+        if not args.staging_db_connection_url or not args.prod_db_connection_url:
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {
+                        "reason": "Both the staging and the production database connection urls are required."
+                    }
+                )
+            )
+        if args.staging_db_connection_url == args.prod_db_connection_url:
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {
+                        "reason": "The staging and the production databases must be different."
+                    }
+                )
+            )
+        log.info("Promoting the staging database to the production database.")
+        promote(args.staging_db_connection_url, args.prod_db_connection_url)
+    except Exception as e:
+        log.error("=============================================")
+        if dbg:
+            log.error("\n\n" + traceback.format_exc())
+            log.error("=============================================")
+        log.error("\n\n" + str(e) + "\n")
+        log.error("=============================================")
+        sys.exit(1)
+
+
+###############################################################################
+# Allow caller to directly run this module (usually in development scenarios)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script will get deployed in the bin directory of the
+users' virtualenv when the parent module is installed using pip.
+"""
+
+import argparse
+import logging
+import sys
+import traceback
+
+from siglatools import get_module_version
+
+from ..databases.constants import LoadMode
+from ..institution_extracters.synthetic_sheets import CorpusScale
+from ..pipelines.arguments import (
+    add_executor_arguments,
+    add_resource_limits_argument,
+    parse_resource_limits,
+)
+from ..pipelines.constants import (
+    BENCHMARK_RESULTS_PATH,
+    BULK_LOAD_WRITE_CONCERN,
+    ExecutorType,
+)
+from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+from .run_sigla_pipeline import check_pipeline_options
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+# Args
+
+
+class Args(argparse.Namespace):
+    def __init__(self):
+        self.__parse()
+
+    def __parse(self):
+        # Set up parser
+        p = argparse.ArgumentParser(
+            prog="run_benchmark",
+            description="A script to benchmark the SIGLA pipeline on a synthetic corpus of spreadsheets.",
+        )
+        # Arguments
+        p.add_argument(
+            "-v",
+            "--version",
+            action="version",
+            version="%(prog)s " + get_module_version(),
+        )
+        p.add_argument(
+            "-ss",
+            "--spreadsheets",
+            action="store",
+            dest="spreadsheets",
+            type=int,
+            default=CorpusScale().spreadsheets,
+            help="The number of spreadsheets of the corpus",
+        )
+        p.add_argument(
+            "-sh",
+            "--sheets",
+            action="store",
+            dest="sheets",
+            type=int,
+            default=CorpusScale().sheets,
+            help="The number of sheets of each spreadsheet",
+        )
+        p.add_argument(
+            "-r",
+            "--rows",
+            action="store",
+            dest="rows",
+            type=int,
+            default=CorpusScale().rows,
+            help="The number of rows of data of each sheet",
+        )
+        p.add_argument(
+            "-i",
+            "--institutions",
+            action="store",
+            dest="institutions",
+            type=int,
+            default=CorpusScale().institutions,
+            help="The number of institutions of each standard institution sheet",
+        )
+        p.add_argument(
+            "-dbcu",
+            "--db_connection_url",
+            action="store",
+            dest="db_connection_url",
+            type=str,
+            help="The Database Connection URL, e.g. of a local MongoDB. An in-memory database if not given",
+        )
+        p.add_argument(
+            "-lm",
+            "--load_mode",
+            action="store",
+            dest="load_mode",
+            type=str,
+            default=LoadMode.clean_up,
+            help="How to replace the documents in the db: clean-up, swap, diff, generation or incremental",
+        )
+        p.add_argument(
+            "-st",
+            "--streaming",
+            action="store_true",
+            dest="streaming",
+            help="Load each spreadsheet on its own, as soon as it is extracted",
+        )
+        p.add_argument(
+            "-br",
+            "--benchmark_results",
+            action="store",
+            dest="benchmark_results",
+            type=str,
+            default=BENCHMARK_RESULTS_PATH,
+            help="The path of the JSON file the benchmark result is added to",
+        )
+        add_executor_arguments(p)
+        # The in-memory database is only shared by the threads of a process
+        p.set_defaults(executor=ExecutorType.threads)
+        add_resource_limits_argument(p)
+        p.add_argument(
+            "--debug", action="store_true", dest="debug", help=argparse.SUPPRESS
+        )
+        # Parse
+        p.parse_args(namespace=self)
+
+
+###############################################################################
+
+
+def main():
+    try:
+        args = Args()
+        dbg = args.debug
+        scale = CorpusScale(
+            args.spreadsheets, args.sheets, args.rows, args.institutions
+        )
+        if min(scale) < 1:
+            raise InvalidWorkflowInputs(
+                ErrorInfo({"reason": "The scale of the corpus must be at least 1."})
+            )
+        if args.db_connection_url is None and args.executor != ExecutorType.threads:
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {
+                        "reason": "The in-memory database needs the threads executor. "
+                        "Give a database connection url to benchmark on another executor."
+                    }
+                )
+            )
+        check_pipeline_options(
+            args.load_mode, False, BULK_LOAD_WRITE_CONCERN, args.streaming
+        )
+        # Prefect, Dask and the database and Google API clients are imported once the arguments are checked
+        from ..pipelines.benchmark import run_benchmark
+        from ..pipelines.executors import create_executor_from_args
+
+        run_benchmark(
+            scale,
+            args.db_connection_url,
+            args.load_mode,
+            args.streaming,
+            executor=create_executor_from_args(args),
+            results_path=args.benchmark_results,
+            resource_limits=parse_resource_limits(args.resource_limits),
+        )
+    except Exception as e:
+        log.error("=============================================")
+        if dbg:
+            log.error("\n\n" + traceback.format_exc())
+            log.error("=============================================")
+        log.error("\n\n" + str(e) + "\n")
+        log.error("=============================================")
+        sys.exit(1)
+
+
+###############################################################################
+# Allow caller to directly run this module (usually in development scenarios)
+
+if __name__ == "__main__":
+    main()
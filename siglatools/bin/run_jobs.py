@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script will get deployed in the bin directory of the
+users' virtualenv when the parent module is installed using pip.
+"""
+
+import argparse
+import logging
+import sys
+import traceback
+
+from siglatools import get_module_version
+
+from ..databases.constants import Environment, LoadMode
+from ..pipelines.arguments import (
+    add_executor_arguments,
+    add_resource_limits_argument,
+    add_run_report_argument,
+    parse_resource_limits,
+)
+from ..pipelines.constants import (
+    BULK_LOAD_WRITE_CONCERN,
+    LOAD_METRICS_REPORT_PATH,
+    JobType,
+    SpreadsheetOrder,
+)
+from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+from .get_next_uv_dates import _get_date_range
+from .run_sigla_pipeline import check_pipeline_options
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+JOB_TYPES = [
+    JobType.sigla_pipeline,
+    JobType.qa_test,
+    JobType.external_link_checker,
+    JobType.next_uv_dates,
+]
+
+###############################################################################
+# Args
+
+
+class Args(argparse.Namespace):
+    def __init__(self):
+        self.__parse()
+
+    def __parse(self):
+        # Set up parser
+        p = argparse.ArgumentParser(
+            prog="siglatools",
+            description="A script to run SIGLA jobs that share one extraction of the spreadsheets",
+        )
+        p.add_argument(
+            "-v",
+            "--version",
+            action="version",
+            version="%(prog)s " + get_module_version(),
+        )
+        subparsers = p.add_subparsers(dest="command", required=True)
+        run_parser = subparsers.add_parser(
+            "run", help="Run several jobs in one flow, extracting the spreadsheets once"
+        )
+        # Arguments
+        run_parser.add_argument(
+            "-j",
+            "--jobs",
+            action="store",
+            dest="jobs",
+            type=str,
+            default=",".join(JOB_TYPES),
+            help=f"The jobs to run, delimited by comma, among {', '.join(JOB_TYPES)}",
+        )
+        run_parser.add_argument(
+            "-msi",
+            "--master_spreadsheet_id",
+            action="store",
+            dest="master_spreadsheet_id",
+            type=str,
+            help="The master spreadsheet id",
+        )
+        run_parser.add_argument(
+            "-gacp",
+            "--google_api_credentials_path",
+            action="store",
+            dest="google_api_credentials_path",
+            type=str,
+            help="The google api credentials path",
+        )
+        run_parser.add_argument(
+            "-dbe",
+            "--db-env",
+            action="store",
+            dest="db_env",
+            type=str,
+            help="The environment of the database, staging or production",
+        )
+        run_parser.add_argument(
+            "-sdbcu",
+            "--staging_db_connection_url",
+            action="store",
+            dest="staging_db_connection_url",
+            type=str,
+            help="The Staging Database Connection URL",
+        )
+        run_parser.add_argument(
+            "-pdbcu",
+            "--prod_db_connection_url",
+            action="store",
+            dest="prod_db_connection_url",
+            type=str,
+            help="The Production Database Connection URL",
+        )
+        run_parser.add_argument(
+            "-lm",
+            "--load_mode",
+            action="store",
+            dest="load_mode",
+            type=str,
+            default=LoadMode.clean_up,
+            help="How to replace the documents in the database, clean-up, swap, diff, generation or incremental",
+        )
+        run_parser.add_argument(
+            "-bl",
+            "--bulk_load",
+            action="store_true",
+            dest="bulk_load",
+            help="Load with the bulk-load profile, for the clean-up load mode",
+        )
+        run_parser.add_argument(
+            "-wc",
+            "--write_concern",
+            action="store",
+            dest="write_concern",
+            type=int,
+            default=BULK_LOAD_WRITE_CONCERN,
+            help="The number of acknowledgments each write of a bulk load waits for",
+        )
+        run_parser.add_argument(
+            "-mi",
+            "--materialize_institutions",
+            action="store_true",
+            dest="materialize_institutions",
+            help="Rebuild the institution pages collection once the documents are loaded",
+        )
+        run_parser.add_argument(
+            "-mr",
+            "--metrics_report",
+            action="store",
+            dest="metrics_report",
+            type=str,
+            default=LOAD_METRICS_REPORT_PATH,
+            help="The path of the JSON report of the load's database operations",
+        )
+        run_parser.add_argument(
+            "-st",
+            "--streaming",
+            action="store_true",
+            dest="streaming",
+            help="Load each spreadsheet on its own, as soon as it is extracted",
+        )
+        run_parser.add_argument(
+            "-so",
+            "--spreadsheet_order",
+            action="store",
+            dest="spreadsheet_order",
+            type=str,
+            choices=[
+                SpreadsheetOrder.master,
+                SpreadsheetOrder.size,
+                SpreadsheetOrder.previous_run,
+            ],
+            default=SpreadsheetOrder.master,
+            help="The order to extract the spreadsheets in: the master spreadsheet's, "
+            "largest first, or longest first in the previous run",
+        )
+        run_parser.add_argument(
+            "-sd",
+            "--start_date",
+            action="store",
+            dest="start_date",
+            type=str,
+            help="The start date of the next uv dates",
+        )
+        run_parser.add_argument(
+            "-ed",
+            "--end_date",
+            action="store",
+            dest="end_date",
+            type=str,
+            help="The end date of the next uv dates",
+        )
+        add_executor_arguments(run_parser)
+        add_run_report_argument(run_parser)
+        add_resource_limits_argument(run_parser)
+        run_parser.add_argument(
+            "--debug", action="store_true", dest="debug", help=argparse.SUPPRESS
+        )
+        # Parse
+        p.parse_args(namespace=self)
+
+
+###############################################################################
+
+
+def main():
+    try:
+        args = Args()
+        dbg = args.debug
+        jobs = [job.strip() for job in args.jobs.split(",") if job.strip()]
+        unknown_jobs = [job for job in jobs if job not in JOB_TYPES]
+        if not jobs or unknown_jobs:
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {
+                        "reason": f"Incorrect job specification. Use {', '.join(JOB_TYPES)}.",
+                        "unknown_jobs": ", ".join(unknown_jobs),
+                    }
+                )
+            )
+        if args.master_spreadsheet_id is None:
+            raise InvalidWorkflowInputs(
+                ErrorInfo({"reason": "No main spreadsheet id found."})
+            )
+        db_connection_url = None
+        if JobType.sigla_pipeline in jobs or JobType.qa_test in jobs:
+            if args.db_env not in [Environment.staging, Environment.production]:
+                raise InvalidWorkflowInputs(
+                    ErrorInfo(
+                        {
+                            "reason": "Incorrect database environment specification. Use 'staging' or 'production'."
+                        }
+                    )
+                )
+            db_connection_url = (
+                args.staging_db_connection_url
+                if args.db_env == Environment.staging
+                else args.prod_db_connection_url
+            )
+        if JobType.sigla_pipeline in jobs:
+            check_pipeline_options(
+                args.load_mode, args.bulk_load, args.write_concern, args.streaming
+            )
+        start_date = end_date = None
+        if JobType.next_uv_dates in jobs:
+            [start_date, end_date] = _get_date_range(args.start_date, args.end_date)
+        # Prefect, Dask and the database and Google API clients are imported once the arguments are checked
+        from ..pipelines.executors import create_executor_from_args
+        from ..pipelines.jobs import run_jobs
+
+        run_jobs(
+            jobs,
+            args.master_spreadsheet_id,
+            args.google_api_credentials_path,
+            db_connection_url,
+            args.load_mode,
+            args.bulk_load,
+            args.write_concern,
+            args.materialize_institutions,
+            args.metrics_report,
+            args.streaming,
+            start_date,
+            end_date,
+            executor=create_executor_from_args(args),
+            run_report_path=args.run_report,
+            spreadsheet_order=args.spreadsheet_order,
+            resource_limits=parse_resource_limits(args.resource_limits),
+            measure_result_bytes=args.measure_result_bytes,
+        )
+    except Exception as e:
+        log.error("=============================================")
+        if dbg:
+            log.error("\n\n" + traceback.format_exc())
+            log.error("=============================================")
+        log.error("\n\n" + str(e) + "\n")
+        log.error("=============================================")
+        sys.exit(1)
+
+
+###############################################################################
+# Allow caller to directly run this module (usually in development scenarios)
+
+if __name__ == "__main__":
+    main()
@@ -11,24 +11,20 @@ import logging
 import sys
 import traceback
 
-from distributed import LocalCluster
-from prefect import Flow, flatten, task, unmapped
-from prefect.executors import DaskExecutor
-
 from siglatools import get_module_version
 
-from ..databases import MongoDBDatabase
-from ..databases.constants import Environment
-from ..institution_extracters.constants import GoogleSheetsFormat as gs_format
-from ..pipelines.exceptions import PrefectFlowFailure
-from ..pipelines.utils import (
-    _create_filter_task,
-    _extract,
-    _get_spreadsheet_ids,
-    _load_composites_data,
-    _load_institutions_data,
-    _log_spreadsheets,
-    _transform,
+from ..databases.constants import Environment, LoadMode
+from ..pipelines.arguments import (
+    add_executor_arguments,
+    add_resource_limits_argument,
+    add_run_report_argument,
+    parse_resource_limits,
+)
+from ..pipelines.constants import (
+    BULK_LOAD_WRITE_CONCERN,
+    CHECKPOINT_DIR,
+    LOAD_METRICS_REPORT_PATH,
+    SpreadsheetOrder,
 )
 from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
 
@@ -41,99 +37,70 @@ log = logging.getLogger()
 
 ###############################################################################
 
-# Tasks
 
-
-@task
-def _clean_up(db_connection_url: str):
-    """
-    Prefect Task to delete all documents from db.
-
-    Parameters
-    ----------
-    db_connection_url: str
-        The DB's connection url str.
-    """
-    database = MongoDBDatabase(db_connection_url)
-    database.clean_up()
-    database.close_connection()
-
-
-def run_sigla_pipeline(
-    master_spreadsheet_id: str, google_api_credentials_path: str, db_connection_url: str
+def check_pipeline_options(
+    load_mode: str,
+    bulk_load: bool,
+    write_concern: int,
+    streaming: bool,
+    checkpoint: bool = False,
 ):
     """
-    Run the SIGLA ETL pipeline
+    Check the options of the pipeline's load, and raise InvalidWorkflowInputs if they are invalid.
 
     Parameters
     ----------
-    master_spreadsheet_id:
-        The master spreadsheet id.
-    google_api_credentials_path: str
-        The path to Google API credentials file needed to read Google Sheets.
-    db_connection_url: str
-        The DB's connection url str.
+    load_mode: str
+        How to replace the documents in the db.
+    bulk_load: bool
+        Whether to load with the bulk-load profile.
+    write_concern: int
+        The number of acknowledgments each write of a bulk load waits for.
+    streaming: bool
+        Whether to load each spreadsheet on its own as soon as it is extracted.
+    checkpoint: bool = False
+        Whether to checkpoint the run, or resume a checkpointed run.
     """
-    log.info("Finished pipeline set up, start running pipeline")
-    log.info("=" * 80)
-    # Spawn local dask cluster
-    cluster = LocalCluster()
-    # Log the dashboard link
-    log.info(f"Dashboard available at: {cluster.dashboard_link}")
-    # Setup workflow
-    with Flow("SIGLA Data Pipeline") as flow:
-        # Delete all documents from db
-        clean_up_task = _clean_up(db_connection_url)
-        # Get spreadsheet ids
-        spreadsheet_ids = _get_spreadsheet_ids(
-            master_spreadsheet_id, google_api_credentials_path
-        )
-        # Extract sheets data.
-        # Get back list of list of SheetData
-        spreadsheets_data = _extract.map(
-            spreadsheet_ids,
-            unmapped(google_api_credentials_path),
-            upstream_tasks=[unmapped(clean_up_task)],
-        )
-
-        # Transform list of SheetData into FormattedSheetData
-        formatted_spreadsheets_data = _transform.map(flatten(spreadsheets_data))
-        # Create instituton filter
-        gs_institution_filter = _create_filter_task(
-            [
-                gs_format.standard_institution,
-                gs_format.multiple_sigla_answer_variable,
-            ]
-        )
-        # Filter to list of institutional formatted sheet data
-        gs_institutions_data = gs_institution_filter(formatted_spreadsheets_data)
-        # Create composite filter
-        gs_composite_filter = _create_filter_task(
-            [
-                gs_format.composite_variable,
-                gs_format.institution_and_composite_variable,
-            ]
-        )
-        # Filter to list of composite formatted sheet data
-        gs_composites_data = gs_composite_filter(formatted_spreadsheets_data)
-
-        # Load instutional data
-        load_institutions_data_task = _load_institutions_data.map(
-            gs_institutions_data, unmapped(db_connection_url)
-        )
-        # Load composite data
-        load_composites_data_task = _load_composites_data.map(
-            gs_composites_data,
-            unmapped(db_connection_url),
-            upstream_tasks=[unmapped(load_institutions_data_task)],
-        )
-        # Log spreadsheets that were loaded
-        _log_spreadsheets(spreadsheets_data, upstream_tasks=[load_composites_data_task])
-
-    # Run the flow
-    state = flow.run(executor=DaskExecutor(cluster.scheduler_address))
-    if state.is_failed():
-        raise PrefectFlowFailure(ErrorInfo({"flow_name": flow.name}))
+    if load_mode not in [
+        LoadMode.clean_up,
+        LoadMode.swap,
+        LoadMode.diff,
+        LoadMode.generation,
+        LoadMode.incremental,
+    ]:
+        raise InvalidWorkflowInputs(
+            ErrorInfo(
+                {
+                    "reason": "Incorrect load mode specification. "
+                    "Use 'clean-up', 'swap', 'diff', 'generation' or 'incremental'."
+                }
+            )
+        )
+    if bulk_load and load_mode != LoadMode.clean_up:
+        raise InvalidWorkflowInputs(
+            ErrorInfo({"reason": "Bulk load is only for the 'clean-up' load mode."})
+        )
+    if streaming and load_mode == LoadMode.incremental:
+        raise InvalidWorkflowInputs(
+            ErrorInfo({"reason": "Streaming is not for the 'incremental' load mode."})
+        )
+    if streaming and checkpoint:
+        raise InvalidWorkflowInputs(
+            ErrorInfo(
+                {
+                    "reason": "Streaming transforms the sheets as it loads them, "
+                    "so a streaming run can't be checkpointed or resumed."
+                }
+            )
+        )
+    if write_concern < 1:
+        raise InvalidWorkflowInputs(
+            ErrorInfo(
+                {
+                    "reason": "The write concern must be at least 1, to get back the ids of the upserted documents."
+                }
+            )
+        )
 
 
 ###############################################################################
@@ -180,6 +147,47 @@ class Args(argparse.Namespace):
             type=str,
             help="The environment of the database, staging or production",
         )
+        p.add_argument(
+            "-lm",
+            "--load_mode",
+            action="store",
+            dest="load_mode",
+            type=str,
+            default=LoadMode.clean_up,
+            help="How to replace the documents in the database, clean-up, swap, diff, generation or incremental",
+        )
+        p.add_argument(
+            "-bl",
+            "--bulk_load",
+            action="store_true",
+            dest="bulk_load",
+            help="Load with the bulk-load profile, for the clean-up load mode",
+        )
+        p.add_argument(
+            "-wc",
+            "--write_concern",
+            action="store",
+            dest="write_concern",
+            type=int,
+            default=BULK_LOAD_WRITE_CONCERN,
+            help="The number of acknowledgments each write of a bulk load waits for",
+        )
+        p.add_argument(
+            "-mi",
+            "--materialize_institutions",
+            action="store_true",
+            dest="materialize_institutions",
+            help="Rebuild the institution pages collection once the documents are loaded",
+        )
+        p.add_argument(
+            "-mr",
+            "--metrics_report",
+            action="store",
+            dest="metrics_report",
+            type=str,
+            default=LOAD_METRICS_REPORT_PATH,
+            help="The path of the JSON report of the load's database operations",
+        )
         p.add_argument(
             "-sdbcu",
             "--staging_db_connection_url",
@@ -196,6 +204,54 @@ class Args(argparse.Namespace):
             type=str,
             help="The Production Database Connection URL",
         )
+        p.add_argument(
+            "-st",
+            "--streaming",
+            action="store_true",
+            dest="streaming",
+            help="Load each spreadsheet on its own, as soon as it is extracted",
+        )
+        p.add_argument(
+            "-cp",
+            "--checkpoint",
+            action="store_true",
+            dest="checkpoint",
+            help="Persist the outputs of the extract and transform stages, to resume the run if it fails",
+        )
+        p.add_argument(
+            "-cd",
+            "--checkpoint_dir",
+            action="store",
+            dest="checkpoint_dir",
+            type=str,
+            default=CHECKPOINT_DIR,
+            help="The directory of the checkpoints",
+        )
+        p.add_argument(
+            "--resume",
+            action="store",
+            dest="resume",
+            type=str,
+            help="The id of a checkpointed run to resume, skipping its persisted stages",
+        )
+        p.add_argument(
+            "-so",
+            "--spreadsheet_order",
+            action="store",
+            dest="spreadsheet_order",
+            type=str,
+            choices=[
+                SpreadsheetOrder.master,
+                SpreadsheetOrder.size,
+                SpreadsheetOrder.previous_run,
+            ],
+            default=SpreadsheetOrder.master,
+            help="The order to extract and load the spreadsheets in: the master spreadsheet's, "
+            "largest first, or longest first in the previous run",
+        )
+        add_executor_arguments(p)
+        add_run_report_argument(p)
+        add_resource_limits_argument(p)
         p.add_argument(
             "--debug", action="store_true", dest="debug", help=argparse.SUPPRESS
         )
@@ -222,6 +278,18 @@ def main():
                     }
                 )
             )
+        check_pipeline_options(
+            args.load_mode,
+            args.bulk_load,
+            args.write_concern,
+            args.streaming,
+            args.checkpoint or args.resume is not None,
+        )
+        # Prefect, Dask and the database and Google API clients are imported once the arguments are checked
+        from ..pipelines.checkpoints import Checkpoint, create_run_id
+        from ..pipelines.executors import create_executor_from_args
+        from ..pipelines.sigla_pipeline import run_sigla_pipeline
+
         log.info(
             f"""Loading all spreadsheets in the master spreadsheet {args.master_spreadsheet_id}""",
             f" to the {args.db_env} database.",
@@ -232,6 +300,20 @@ def main():
             args.staging_db_connection_url
             if args.db_env == Environment.staging
             else args.prod_db_connection_url,
+            args.load_mode,
+            args.bulk_load,
+            args.write_concern,
+            args.materialize_institutions,
+            args.metrics_report,
+            executor=create_executor_from_args(args),
+            run_report_path=args.run_report,
+            streaming=args.streaming,
+            checkpoint=Checkpoint(args.checkpoint_dir, args.resume or create_run_id())
+            if args.checkpoint or args.resume
+            else None,
+            spreadsheet_order=args.spreadsheet_order,
+            resource_limits=parse_resource_limits(args.resource_limits),
+            measure_result_bytes=args.measure_result_bytes,
         )
     except Exception as e:
         log.error("=============================================")
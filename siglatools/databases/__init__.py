@@ -1,5 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import importlib
 
-from .mongodb_database import MongoDBDatabase  # noqa: F401
+# The names exported by the package, by the module that defines them. The modules are imported
+# on first access (PEP 562), so that importing the constants of the package doesn't import pymongo.
+_LAZY_EXPORTS = {"MongoDBDatabase": ".mongodb_database"}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
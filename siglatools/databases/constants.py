@@ -8,6 +8,9 @@ class DatabaseCollection:
     rights = "rights"
     amendments = "amendments"
     body_of_law = "body_of_law"
+    institution_pages = "institution_pages"
+    spreadsheet_fingerprints = "spreadsheet_fingerprints"
+    deferred_composite_sheets = "deferred_composite_sheets"
 
 
 class VariableType:
@@ -21,6 +24,14 @@ class Environment:
     production = "production"
 
 
+class LoadMode:
+    clean_up = "clean-up"
+    swap = "swap"
+    diff = "diff"
+    generation = "generation"
+    incremental = "incremental"
+
+
 class InstitutionField:
     _id = "_id"
     name = "name"
@@ -52,6 +63,31 @@ class CompositeVariableField:
     sigla_answers = "sigla_answers"
 
 
+class DocumentField:
+    content_hash = "content_hash"
+    spreadsheet_id = "spreadsheet_id"
+    sheet_id = "sheet_id"
+    generation = "generation"
+
+
+class FingerprintField:
+    _id = "_id"
+    fingerprint = "fingerprint"
+
+
+class DeferredSheetField:
+    _id = "_id"
+    run = "run"
+    spreadsheet_id = "spreadsheet_id"
+    institutions = "institutions"
+    referred_institutions = "referred_institutions"
+    sheet_data = "sheet_data"
+    claimed = "claimed"
+    sheet = "sheet"
+    chunk = "chunk"
+    rows = "rows"
+
+
 class SiglaAnswerField:
     name = "name"
     answer = "answer"
@@ -7,3 +7,29 @@ from ..utils.exceptions import BaseError, ErrorInfo
 class UnableToFindDocument(BaseError):
     def __init__(self, info: ErrorInfo):
         super().__init__("Unable to find document in database.", info)
+
+
+class UnableToWriteDocuments(BaseError):
+    def __init__(self, info: ErrorInfo):
+        super().__init__("Unable to write documents to database.", info)
+
+
+class WriteBufferClosed(BaseError):
+    def __init__(self, info: ErrorInfo):
+        super().__init__("Unable to add requests to a closed write buffer.", info)
+
+
+class UnableToReloadSpreadsheet(BaseError):
+    def __init__(self, info: ErrorInfo):
+        super().__init__(
+            "Unable to reload a spreadsheet without variables that composite variable rows "
+            "of other spreadsheets refer to.",
+            info,
+        )
+
+
+class UnsupportedOperation(BaseError):
+    def __init__(self, info: ErrorInfo):
+        super().__init__(
+            "Unable to run an operator the in-memory client doesn't support.", info
+        )
@@ -0,0 +1,788 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from bson.objectid import ObjectId
+from pymongo import (
+    ASCENDING,
+    DeleteMany,
+    DeleteOne,
+    InsertOne,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateMany,
+    UpdateOne,
+)
+from pymongo.errors import BulkWriteError, InvalidOperation, OperationFailure
+from pymongo.results import (
+    BulkWriteResult,
+    DeleteResult,
+    InsertManyResult,
+    UpdateResult,
+)
+
+from ..utils.exceptions import ErrorInfo
+from .exceptions import UnsupportedOperation
+from .utils import get_hosts
+
+###############################################################################
+
+DEFAULT_DATABASE_NAME = "sigla"
+DUPLICATE_KEY_ERROR_CODE = 11000
+# The value of $$REMOVE in an aggregation expression
+_REMOVE = object()
+
+###############################################################################
+
+
+class _Store:
+    """
+    The collections and operation counts shared by the in-memory clients of a connection url.
+    """
+
+    def __init__(self):
+        self.databases: Dict[str, Dict[str, "_CollectionData"]] = {}
+        self.operation_counts: Counter = Counter()
+        # Serializes the updates that must be atomic, e.g. find_one_and_update, across threads
+        self.lock = threading.Lock()
+
+
+class _CollectionData:
+    """
+    The documents and indexes of an in-memory collection.
+    """
+
+    def __init__(self):
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Any]] = {
+            "_id_": {"v": 2, "key": [("_id", ASCENDING)]}
+        }
+
+
+# The stores by the host of their connection url, so that every client of a host sees the same data
+_stores: Dict[str, _Store] = {}
+
+
+def _get_host(db_connection_url: str) -> str:
+    """Get the hosts of a connection url, without its credentials."""
+    return ",".join(sorted(get_hosts(db_connection_url)))
+
+
+def _get_field(document: Dict[str, Any], path: str) -> Any:
+    """Get the value of a field, by its dotted path."""
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    """Whether a field value matches a value, the way a query equality does on arrays."""
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _evaluate(
+    expression: Any, document: Dict[str, Any], variables: Dict[str, Any], stage: str
+) -> Any:
+    """
+    Evaluate an aggregation expression against a document, in a stage or collection method.
+    Only the operators siglatools uses are supported.
+    """
+    if isinstance(expression, str) and expression.startswith("$$"):
+        if expression == "$$REMOVE":
+            return _REMOVE
+        return variables.get(expression[2:])
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_field(document, expression[1:])
+    if isinstance(expression, list):
+        return [_evaluate(item, document, variables, stage) for item in expression]
+    if isinstance(expression, dict) and len(expression) == 1:
+        operator, operands = next(iter(expression.items()))
+        if operator.startswith("$"):
+            values = _evaluate(operands, document, variables, stage)
+            if operator == "$eq":
+                return values[0] == values[1]
+            if operator == "$ne":
+                return values[0] != values[1]
+            if operator == "$in":
+                return values[0] in values[1]
+            if operator == "$and":
+                return all(values)
+            if operator == "$or":
+                return any(values)
+            if operator == "$ifNull":
+                return values[1] if values[0] is None else values[0]
+            if operator == "$cond":
+                return values[1] if values[0] else values[2]
+            if operator == "$concatArrays":
+                return [item for value in values for item in value]
+            raise UnsupportedOperation(
+                ErrorInfo({"operator": operator, "stage": stage})
+            )
+    if isinstance(expression, dict):
+        return {
+            key: _evaluate(value, document, variables, stage)
+            for key, value in expression.items()
+        }
+    return expression
+
+
+def _matches(
+    document: Dict[str, Any],
+    query: Dict[str, Any],
+    stage: str,
+    variables: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Whether a document matches a query filter, of a stage or collection method.
+    Only the operators siglatools uses are supported.
+    """
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(
+                _matches(document, sub_query, stage, variables)
+                for sub_query in condition
+            ):
+                return False
+        elif key == "$and":
+            if not all(
+                _matches(document, sub_query, stage, variables)
+                for sub_query in condition
+            ):
+                return False
+        elif key == "$expr":
+            if not _evaluate(condition, document, variables or {}, stage):
+                return False
+        elif isinstance(condition, dict) and any(
+            op.startswith("$") for op in condition
+        ):
+            value = _get_field(document, key)
+            for operator, operand in condition.items():
+                if operator == "$eq":
+                    matched = _equals(value, operand)
+                elif operator == "$ne":
+                    matched = not _equals(value, operand)
+                elif operator == "$in":
+                    matched = any(_equals(value, item) for item in operand)
+                elif operator == "$nin":
+                    matched = not any(_equals(value, item) for item in operand)
+                elif operator == "$exists":
+                    matched = (key in document) == bool(operand)
+                else:
+                    raise UnsupportedOperation(
+                        ErrorInfo({"operator": operator, "stage": stage})
+                    )
+                if not matched:
+                    return False
+        elif not _equals(_get_field(document, key), condition):
+            return False
+    return True
+
+
+def _project(
+    document: Dict[str, Any], projection: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Project a document with an inclusion or exclusion projection."""
+    if not projection:
+        return document
+    if any(value for key, value in projection.items() if key != "_id"):
+        projected = {
+            key: document.get(key)
+            for key, value in projection.items()
+            if value and key in document
+        }
+        if projection.get("_id", 1) and "_id" in document:
+            projected = {"_id": document.get("_id"), **projected}
+        return projected
+    return {key: value for key, value in document.items() if key not in projection}
+
+
+def _sort(
+    documents: List[Dict[str, Any]], sort: Union[List[Tuple[str, int]], Dict[str, int]]
+) -> List[Dict[str, Any]]:
+    """Sort documents by (key, direction) pairs. Missing values sort first."""
+    for key, direction in reversed(list(dict(sort).items())):
+        documents = sorted(
+            documents,
+            key=lambda document: (
+                _get_field(document, key) is not None,
+                _get_field(document, key),
+            ),
+            reverse=direction != ASCENDING,
+        )
+    return documents
+
+
+def _apply_update(
+    document: Dict[str, Any], update: Dict[str, Any], stage: str
+) -> Dict[str, Any]:
+    """Apply a $set/$unset update of a collection method to a copy of a document."""
+    updated = copy.deepcopy(document)
+    for operator, fields in update.items():
+        if operator == "$set":
+            updated.update(copy.deepcopy(fields))
+        elif operator == "$unset":
+            for key in fields:
+                updated.pop(key, None)
+        else:
+            raise UnsupportedOperation(
+                ErrorInfo({"operator": operator, "stage": stage})
+            )
+    return updated
+
+
+def _upsert_document(
+    query: Dict[str, Any], update: Dict[str, Any], stage: str
+) -> Dict[str, Any]:
+    """Create the document inserted by an upsert: the query's equality fields, updated."""
+    document = {
+        key: value
+        for key, value in query.items()
+        if not key.startswith("$")
+        and not (isinstance(value, dict) and any(op.startswith("$") for op in value))
+    }
+    document = _apply_update(document, update, stage)
+    document.setdefault("_id", ObjectId())
+    return document
+
+
+class InMemoryCursor:
+    """
+    A cursor over the documents of an in-memory collection matching a query.
+    """
+
+    def __init__(
+        self,
+        documents: List[Dict[str, Any]],
+        projection: Optional[Dict[str, Any]] = None,
+    ):
+        self._documents = documents
+        self._projection = projection
+
+    def sort(
+        self, sort: Union[List[Tuple[str, int]], Dict[str, int]]
+    ) -> "InMemoryCursor":
+        self._documents = _sort(self._documents, sort)
+        return self
+
+    def hint(self, index: Any) -> "InMemoryCursor":
+        return self
+
+    def close(self):
+        self._documents = []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for document in self._documents:
+            yield _project(copy.deepcopy(document), self._projection)
+
+    def __enter__(self) -> "InMemoryCursor":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class InMemoryCollection:
+    """
+    An in-memory collection, with the subset of the pymongo Collection interface that siglatools uses.
+    Unique indexes are enforced, other indexes are only recorded.
+    Every call is counted in the client's operation_counts, by (collection, method).
+    """
+
+    def __init__(self, database: "InMemoryDatabase", name: str):
+        self._database = database
+        self.name = name
+        self.full_name = f"{database.name}.{name}"
+
+    @property
+    def _data(self) -> _CollectionData:
+        """The data of the collection, created on first write."""
+        return self._database._collections.setdefault(self.name, _CollectionData())
+
+    def _documents(self) -> List[Dict[str, Any]]:
+        """The documents of the collection, without creating it."""
+        data = self._database._collections.get(self.name)
+        return list(data.documents.values()) if data else []
+
+    def _count(self, method: str):
+        self._database._store.operation_counts[(self.name, method)] += 1
+
+    def _check_unique(self, document: Dict[str, Any]):
+        """Raise the error message of a duplicate key if the document breaks a unique index."""
+        for name, info in self._data.indexes.items():
+            if name == "_id_" or not info.get("unique"):
+                continue
+            keys = [key for key, _ in info.get("key")]
+            values = [document.get(key) for key in keys]
+            for other in self._data.documents.values():
+                if other.get("_id") != document.get("_id") and values == [
+                    other.get(key) for key in keys
+                ]:
+                    raise ValueError(
+                        f"E11000 duplicate key error collection: {self.full_name} index: {name}"
+                    )
+
+    def _write(self, document: Dict[str, Any]):
+        """Insert or replace a document, enforcing the unique indexes."""
+        self._check_unique(document)
+        self._data.documents[document.get("_id")] = document
+
+    def with_options(self, **kwargs) -> "InMemoryCollection":
+        return self
+
+    def find(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        projection: Optional[Union[List[str], Dict[str, Any]]] = None,
+        batch_size: int = 0,
+        session: Optional["InMemorySession"] = None,
+    ) -> InMemoryCursor:
+        self._count("find")
+        if isinstance(projection, list):
+            projection = {field: 1 for field in projection}
+        return InMemoryCursor(
+            [
+                document
+                for document in self._documents()
+                if _matches(document, filter or {}, "find")
+            ],
+            projection,
+        )
+
+    def find_one(
+        self,
+        filter: Optional[Dict[str, Any]] = None,
+        session: Optional["InMemorySession"] = None,
+    ) -> Optional[Dict[str, Any]]:
+        self._count("find_one")
+        for document in self._documents():
+            if _matches(document, filter or {}, "find_one"):
+                return copy.deepcopy(document)
+        return None
+
+    def count_documents(
+        self, filter: Dict[str, Any], session: Optional["InMemorySession"] = None
+    ) -> int:
+        self._count("count_documents")
+        return len(
+            [
+                document
+                for document in self._documents()
+                if _matches(document, filter, "count_documents")
+            ]
+        )
+
+    def distinct(
+        self,
+        key: str,
+        filter: Optional[Dict[str, Any]] = None,
+        session: Optional["InMemorySession"] = None,
+    ) -> List[Any]:
+        self._count("distinct")
+        values = []
+        for document in self._documents():
+            if not _matches(document, filter or {}, "distinct"):
+                continue
+            value = _get_field(document, key)
+            for item in value if isinstance(value, list) else [value]:
+                if item is not None and item not in values:
+                    values.append(item)
+        return values
+
+    def find_one_and_update(
+        self,
+        filter: Dict[str, Any],
+        update: Dict[str, Any],
+        return_document: bool = ReturnDocument.BEFORE,
+        upsert: bool = False,
+        session: Optional["InMemorySession"] = None,
+    ) -> Optional[Dict[str, Any]]:
+        self._count("find_one_and_update")
+        with self._database._store.lock:
+            for document in self._documents():
+                if _matches(document, filter, "find_one_and_update"):
+                    updated = _apply_update(document, update, "find_one_and_update")
+                    self._write(updated)
+                    return copy.deepcopy(updated if return_document else document)
+            if not upsert:
+                return None
+            document = _upsert_document(filter, update, "find_one_and_update")
+            self._write(document)
+            return copy.deepcopy(document) if return_document else None
+
+    def aggregate(
+        self,
+        pipeline: List[Dict[str, Any]],
+        session: Optional["InMemorySession"] = None,
+    ) -> InMemoryCursor:
+        self._count("aggregate")
+        if pipeline and "$out" in pipeline[-1]:
+            # Replace the documents of the output collection, keeping its indexes
+            documents = self._aggregate(self._documents(), pipeline[:-1], {})
+            out = pipeline[-1].get("$out")
+            if isinstance(out, dict):
+                database = self._database.client.get_database(out.get("db"))
+                output = database.get_collection(out.get("coll"))._data
+            else:
+                output = self._database.get_collection(out)._data
+            output.documents = {document.get("_id"): document for document in documents}
+            return InMemoryCursor([])
+        return InMemoryCursor(self._aggregate(self._documents(), pipeline, {}))
+
+    def _aggregate(
+        self,
+        documents: List[Dict[str, Any]],
+        pipeline: List[Dict[str, Any]],
+        variables: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Run the $match, $project, $sort, $addFields and $lookup stages of a pipeline."""
+        documents = copy.deepcopy(documents)
+        for stage in pipeline:
+            name, options = next(iter(stage.items()))
+            if name == "$match":
+                documents = [
+                    document
+                    for document in documents
+                    if _matches(document, options, name, variables)
+                ]
+            elif name == "$project":
+                documents = [_project(document, options) for document in documents]
+            elif name == "$sort":
+                documents = _sort(documents, options)
+            elif name == "$addFields":
+                for document in documents:
+                    for key, expression in options.items():
+                        value = _evaluate(expression, document, variables, name)
+                        if value is _REMOVE:
+                            document.pop(key, None)
+                        else:
+                            document[key] = value
+            elif name == "$lookup":
+                foreign = self._database.get_collection(
+                    options.get("from")
+                )._documents()
+                for document in documents:
+                    matched = foreign
+                    if "localField" in options:
+                        local_value = _get_field(document, options.get("localField"))
+                        matched = [
+                            other
+                            for other in foreign
+                            if _equals(
+                                _get_field(other, options.get("foreignField")),
+                                local_value,
+                            )
+                        ]
+                    lookup_variables = {
+                        **variables,
+                        **{
+                            key: _evaluate(expression, document, variables, name)
+                            for key, expression in options.get("let", {}).items()
+                        },
+                    }
+                    document[options.get("as")] = self._aggregate(
+                        matched, options.get("pipeline", []), lookup_variables
+                    )
+            else:
+                raise UnsupportedOperation(
+                    ErrorInfo({"operator": name, "stage": "aggregate"})
+                )
+        return documents
+
+    def _run_request(self, request: Any, index: int, result: Dict[str, Any]):
+        """Run a bulk write request and record its outcome in the raw bulk write result."""
+        if isinstance(request, InsertOne):
+            document = copy.deepcopy(request._doc)
+            document.setdefault("_id", ObjectId())
+            if document.get("_id") in self._data.documents:
+                raise ValueError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: _id_"
+                )
+            self._write(document)
+            result["nInserted"] += 1
+        elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+            matched = [
+                document
+                for document in self._documents()
+                if _matches(document, request._filter, "bulk_write")
+            ]
+            if not isinstance(request, UpdateMany):
+                matched = matched[:1]
+            for document in matched:
+                if isinstance(request, ReplaceOne):
+                    updated = {
+                        "_id": document.get("_id"),
+                        **copy.deepcopy(request._doc),
+                    }
+                else:
+                    updated = _apply_update(document, request._doc, "bulk_write")
+                self._write(updated)
+                result["nMatched"] += 1
+                result["nModified"] += int(updated != document)
+            if not matched and request._upsert:
+                if isinstance(request, ReplaceOne):
+                    document = {"_id": ObjectId(), **copy.deepcopy(request._doc)}
+                else:
+                    document = _upsert_document(
+                        request._filter, request._doc, "bulk_write"
+                    )
+                self._write(document)
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": index, "_id": document.get("_id")})
+        elif isinstance(request, (DeleteOne, DeleteMany)):
+            matched = [
+                document
+                for document in self._documents()
+                if _matches(document, request._filter, "bulk_write")
+            ]
+            if isinstance(request, DeleteOne):
+                matched = matched[:1]
+            for document in matched:
+                del self._data.documents[document.get("_id")]
+            result["nRemoved"] += len(matched)
+        else:
+            raise UnsupportedOperation(
+                ErrorInfo({"operator": type(request).__name__, "stage": "bulk_write"})
+            )
+
+    def bulk_write(
+        self,
+        requests: List[Any],
+        ordered: bool = True,
+        session: Optional["InMemorySession"] = None,
+    ) -> BulkWriteResult:
+        self._count("bulk_write")
+        result = {
+            "writeErrors": [],
+            "writeConcernErrors": [],
+            "nInserted": 0,
+            "nUpserted": 0,
+            "nMatched": 0,
+            "nModified": 0,
+            "nRemoved": 0,
+            "upserted": [],
+        }
+        for index, request in enumerate(requests):
+            try:
+                self._run_request(request, index, result)
+            except ValueError as error:
+                result["writeErrors"].append(
+                    {
+                        "index": index,
+                        "code": DUPLICATE_KEY_ERROR_CODE,
+                        "errmsg": str(error),
+                        "op": request,
+                    }
+                )
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    def insert_many(
+        self,
+        documents: List[Dict[str, Any]],
+        ordered: bool = True,
+        session: Optional["InMemorySession"] = None,
+    ) -> InsertManyResult:
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+        self.bulk_write(
+            [InsertOne(document) for document in documents], ordered=ordered
+        )
+        return InsertManyResult([document.get("_id") for document in documents], True)
+
+    def update_many(
+        self,
+        filter: Dict[str, Any],
+        update: Dict[str, Any],
+        session: Optional["InMemorySession"] = None,
+    ) -> UpdateResult:
+        result = self.bulk_write([UpdateMany(filter, update)]).bulk_api_result
+        return UpdateResult(
+            {"n": result["nMatched"], "nModified": result["nModified"]}, True
+        )
+
+    def delete_one(
+        self, filter: Dict[str, Any], session: Optional["InMemorySession"] = None
+    ) -> DeleteResult:
+        result = self.bulk_write([DeleteOne(filter)]).bulk_api_result
+        return DeleteResult({"n": result["nRemoved"]}, True)
+
+    def delete_many(
+        self, filter: Dict[str, Any], session: Optional["InMemorySession"] = None
+    ) -> DeleteResult:
+        result = self.bulk_write([DeleteMany(filter)]).bulk_api_result
+        return DeleteResult({"n": result["nRemoved"]}, True)
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        self._count("index_information")
+        return copy.deepcopy(self._data.indexes)
+
+    def create_index(
+        self,
+        keys: Union[str, List[Tuple[str, int]]],
+        name: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        self._count("create_index")
+        if isinstance(keys, str):
+            keys = [(keys, ASCENDING)]
+        keys = list(keys)
+        name = name or "_".join(f"{key}_{direction}" for key, direction in keys)
+        self._data.indexes[name] = {"v": 2, "key": keys, **kwargs}
+        return name
+
+    def drop_index(self, name: str):
+        self._count("drop_index")
+        if name not in self._data.indexes or name == "_id_":
+            raise OperationFailure(f"index not found with name [{name}]")
+        del self._data.indexes[name]
+
+
+class InMemoryDatabase:
+    """
+    An in-memory database, with the subset of the pymongo Database interface that siglatools uses.
+    """
+
+    def __init__(self, client: "InMemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._store = client._store
+        self._collections = self._store.databases.setdefault(name, {})
+
+    def get_collection(self, name: str, **kwargs) -> InMemoryCollection:
+        return InMemoryCollection(self, name)
+
+    def create_collection(self, name: str, **kwargs) -> InMemoryCollection:
+        if name in self._collections:
+            raise OperationFailure(f"Collection {self.name}.{name} already exists")
+        self._collections[name] = _CollectionData()
+        return self.get_collection(name)
+
+    def list_collection_names(self) -> List[str]:
+        return list(self._collections.keys())
+
+    def drop_collection(self, name: str):
+        self._collections.pop(name, None)
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return self.get_collection(name)
+
+
+class _InMemoryAdmin:
+    """
+    The admin database of an in-memory client, which only runs renameCollection.
+    """
+
+    def __init__(self, client: "InMemoryClient"):
+        self._client = client
+
+    def command(self, command: str, value: str, to: str, dropTarget: bool = False):
+        if command != "renameCollection":
+            raise UnsupportedOperation(
+                ErrorInfo({"operator": command, "stage": "command"})
+            )
+        source_database, source = value.split(".", 1)
+        target_database, target = to.split(".", 1)
+        source_collections = self._client.get_database(source_database)._collections
+        target_collections = self._client.get_database(target_database)._collections
+        if source not in source_collections:
+            raise OperationFailure(f"Source collection {value} does not exist")
+        if target in target_collections and not dropTarget:
+            raise OperationFailure(f"Target collection {to} exists")
+        target_collections[target] = source_collections.pop(source)
+
+
+class InMemorySession:
+    """
+    A session of an in-memory client. Its transaction snapshots every database when started,
+    and restores the snapshot when aborted. Transactions aren't isolated from each other.
+    """
+
+    def __init__(self, client: "InMemoryClient"):
+        self._client = client
+        self._snapshot: Optional[Dict[str, Dict[str, _CollectionData]]] = None
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._snapshot is not None
+
+    def start_transaction(self, **kwargs):
+        if self.in_transaction:
+            raise InvalidOperation("Transaction already in progress")
+        self._snapshot = copy.deepcopy(self._client._store.databases)
+
+    def commit_transaction(self):
+        if not self.in_transaction:
+            raise InvalidOperation("No transaction started")
+        self._snapshot = None
+
+    def abort_transaction(self):
+        if not self.in_transaction:
+            raise InvalidOperation("No transaction started")
+        for name, collections in self._snapshot.items():
+            databases = self._client._store.databases.setdefault(name, {})
+            databases.clear()
+            databases.update(collections)
+        self._snapshot = None
+
+    def end_session(self):
+        if self.in_transaction:
+            self.abort_transaction()
+
+    def __enter__(self) -> "InMemorySession":
+        return self
+
+    def __exit__(self, *args):
+        self.end_session()
+
+
+class InMemoryClient:
+    """
+    An in-memory MongoDB client for tests and benchmarks, given to MongoDBDatabase in place of a MongoClient.
+    The clients of the same host share their data, as long as they are in the same process.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The connection url, e.g. memory://test/sigla. The path is the default database name.
+    """
+
+    def __init__(self, db_connection_url: str, **kwargs):
+        self._db_connection_url = db_connection_url
+        self._store = _stores.setdefault(_get_host(db_connection_url), _Store())
+        self.admin = _InMemoryAdmin(self)
+
+    @property
+    def operation_counts(self) -> Counter:
+        """The number of calls made to each (collection, method) by every client of the host."""
+        return self._store.operation_counts
+
+    def start_session(self, **kwargs) -> InMemorySession:
+        return InMemorySession(self)
+
+    def get_database(self, name: str, **kwargs) -> InMemoryDatabase:
+        return InMemoryDatabase(self, name)
+
+    def get_default_database(self, **kwargs) -> InMemoryDatabase:
+        path = urlparse(self._db_connection_url).path.lstrip("/")
+        return self.get_database(path.split("?")[0] or DEFAULT_DATABASE_NAME)
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def drop_store(db_connection_url: str):
+        """Delete the data of the host of a connection url."""
+        _stores.pop(_get_host(db_connection_url), None)
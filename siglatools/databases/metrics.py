@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import math
+from typing import Any, Dict, Hashable, List, Optional
+
+import bson
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)4s: %(module)s:%(lineno)4s %(asctime)s] %(message)s",
+)
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+LATENCY_PERCENTILES = [50, 90, 99]
+# The counts recorded for each operation
+COUNT_FIELDS = [
+    "requests",
+    "documents",
+    "matched",
+    "modified",
+    "upserted",
+    "deleted",
+    "bytes_sent",
+]
+
+
+def get_size(value: Any) -> int:
+    """
+    Get the BSON size of a value sent to the database.
+
+    Parameters
+    ----------
+    value: Any
+        The value, e.g. a filter, a document or the arguments of a call.
+
+    Returns
+    -------
+    size: int
+        The number of bytes of the value, encoded as BSON.
+    """
+    return len(bson.encode({"value": value}))
+
+
+def get_request_size(request: Any) -> int:
+    """
+    Get the BSON size of a pymongo write request, i.e. of its filter and document.
+
+    Parameters
+    ----------
+    request: Any
+        The write request, e.g. an UpdateOne.
+
+    Returns
+    -------
+    size: int
+        The number of bytes of the request, encoded as BSON.
+    """
+    return get_size([getattr(request, "_filter", None), getattr(request, "_doc", None)])
+
+
+class OperationStats:
+    """
+    The round trips, counts and latencies of the database operations of a collection method or a sheet.
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+        self.counts: Dict[str, int] = {field: 0 for field in COUNT_FIELDS}
+        self.latencies: List[float] = []
+
+    def add(self, latency: float, counts: Dict[str, int]):
+        """
+        Add a round trip.
+
+        Parameters
+        ----------
+        latency: float
+            The duration of the round trip, in seconds.
+        counts: Dict[str, int]
+            The counts of the round trip, by COUNT_FIELDS.
+        """
+        self.round_trips += 1
+        self.latencies.append(latency)
+        for field, count in counts.items():
+            self.counts[field] += count
+
+    def merge(self, other: "OperationStats"):
+        """Add the round trips of other stats."""
+        self.round_trips += other.round_trips
+        self.latencies.extend(other.latencies)
+        for field, count in other.counts.items():
+            self.counts[field] += count
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the stats, with the latency percentiles in milliseconds.
+
+        Returns
+        -------
+        summary: Dict[str, Any]
+            The round trips, the counts, and the total, maximum and percentile latencies.
+        """
+        latencies = sorted(self.latencies)
+        latency_ms = {"total": round(sum(latencies) * 1000, 3)}
+        for percentile in LATENCY_PERCENTILES:
+            # Nearest-rank percentile
+            rank = max(math.ceil(percentile / 100 * len(latencies)), 1)
+            latency_ms[f"p{percentile}"] = (
+                round(latencies[rank - 1] * 1000, 3) if latencies else None
+            )
+        latency_ms["max"] = round(latencies[-1] * 1000, 3) if latencies else None
+        return {
+            "round_trips": self.round_trips,
+            **{field: count for field, count in self.counts.items() if count},
+            "latency_ms": latency_ms,
+        }
+
+
+class LoadMetrics:
+    """
+    The database operations of a load, by collection and method, and by sheet.
+    """
+
+    def __init__(self):
+        self._collections: Dict[str, Dict[str, OperationStats]] = {}
+        self._sheets: Dict[Hashable, OperationStats] = {}
+        self._sheet_titles: Dict[Hashable, str] = {}
+
+    def record(
+        self,
+        collection: str,
+        method: str,
+        latency: float,
+        counts: Dict[str, int],
+        sheet_counts: Optional[Dict[Hashable, Dict[str, int]]] = None,
+    ):
+        """
+        Record a round trip to the database.
+
+        Parameters
+        ----------
+        collection: str
+            The collection of the operation.
+        method: str
+            The collection method, e.g. bulk_write.
+        latency: float
+            The duration of the round trip, in seconds.
+        counts: Dict[str, int]
+            The counts of the operation, by COUNT_FIELDS.
+        sheet_counts: Optional[Dict[Hashable, Dict[str, int]]] = None
+            The counts of each sheet the operation was made for, by sheet key.
+            Every sheet is recorded as taking part in the round trip.
+        """
+        self._collections.setdefault(collection, {}).setdefault(
+            method, OperationStats()
+        ).add(latency, counts)
+        for sheet_key, counts in (sheet_counts or {}).items():
+            self._sheets.setdefault(sheet_key, OperationStats()).add(latency, counts)
+
+    def name_sheet(self, sheet_key: Hashable, sheet_title: str):
+        """Set the title of a sheet, shown in the report."""
+        self._sheet_titles[sheet_key] = sheet_title
+
+    def merge(self, other: "LoadMetrics"):
+        """
+        Add the round trips recorded by other metrics, e.g. of another task.
+
+        Parameters
+        ----------
+        other: LoadMetrics
+            The other metrics.
+        """
+        for collection, methods in other._collections.items():
+            for method, stats in methods.items():
+                self._collections.setdefault(collection, {}).setdefault(
+                    method, OperationStats()
+                ).merge(stats)
+        for sheet_key, stats in other._sheets.items():
+            self._sheets.setdefault(sheet_key, OperationStats()).merge(stats)
+        self._sheet_titles.update(other._sheet_titles)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Create the report of the metrics.
+
+        Returns
+        -------
+        report: Dict[str, Any]
+            The summary of each collection method, by collection, and of each sheet,
+            sorted by total latency, longest first.
+        """
+        sheets = [
+            {
+                "sheet": "/".join(str(key) for key in sheet_key)
+                if isinstance(sheet_key, tuple)
+                else str(sheet_key),
+                "sheet_title": self._sheet_titles.get(sheet_key),
+                **stats.summary(),
+            }
+            for sheet_key, stats in self._sheets.items()
+        ]
+        return {
+            "collections": {
+                collection: {
+                    method: stats.summary() for method, stats in sorted(methods.items())
+                }
+                for collection, methods in sorted(self._collections.items())
+            },
+            "sheets": sorted(
+                sheets,
+                key=lambda sheet: sheet.get("latency_ms").get("total"),
+                reverse=True,
+            ),
+        }
+
+    def write_report(self, path: str):
+        """
+        Write the report of the metrics as JSON.
+
+        Parameters
+        ----------
+        path: str
+            The path of the JSON file.
+        """
+        with open(path, "w") as report_file:
+            json.dump(self.report(), report_file, indent=2)
+        log.info(f"Wrote the load metrics report to {path}.")
@@ -2,26 +2,64 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from bson.objectid import ObjectId
-from pymongo import DeleteMany, MongoClient, ReturnDocument, UpdateMany, UpdateOne
+from pymongo import (
+    ASCENDING,
+    DeleteMany,
+    MongoClient,
+    ReturnDocument,
+    UpdateMany,
+    UpdateOne,
+)
+from pymongo.client_session import ClientSession
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+from pymongo.write_concern import WriteConcern
 
 from ..institution_extracters import exceptions
 from ..institution_extracters.constants import GoogleSheetsFormat as gs_format
 from ..institution_extracters.constants import GoogleSheetsInfoField, MetaDataField
-from ..institution_extracters.utils import FormattedSheetData
-from ..utils.exceptions import ErrorInfo
+from ..institution_extracters.utils import FormattedSheetData, SheetData
+from ..utils.exceptions import BaseError, ErrorInfo
 from .constants import CompositeVariableField
 from .constants import DatabaseCollection as db_collection
 from .constants import (
     DatabaseField,
+    DeferredSheetField,
+    DocumentField,
+    FingerprintField,
     InstitutionField,
     SiglaAnswerField,
     VariableField,
     VariableType,
 )
-from .exceptions import UnableToFindDocument
+from .exceptions import (
+    UnableToFindDocument,
+    UnableToReloadSpreadsheet,
+    UnableToWriteDocuments,
+)
+from .metrics import LoadMetrics, get_request_size, get_size
+from .utils import create_generation, get_hosts, hash_document
+from .write_buffer import (
+    BULK_WRITE_BATCH_SIZE,
+    BulkWriteBuffer,
+    PendingWrite,
+    SheetLoadResult,
+)
 
 ###############################################################################
 
@@ -33,82 +71,386 @@ log = logging.getLogger(__name__)
 
 ###############################################################################
 
+SHADOW_COLLECTION_SUFFIX = "_shadow"
+FIND_BATCH_SIZE = 1000
+# The collection methods that return a cursor, read into a list when called by a loader
+CURSOR_METHODS = ["find", "aggregate"]
+# The BSON size of the rows of a deferred composite sheet stored in one document, well under the 16 MB limit
+DEFERRED_SHEET_CHUNK_BYTES = 8 * 1024 * 1024
+# The number of times a spreadsheet reload transaction is tried, when it fails with a transient error
+TRANSACTION_MAX_ATTEMPTS = 3
+# The formats of the sheets to load before the composite variable sheets that refer to them
+INSTITUTION_FORMATS = [
+    gs_format.standard_institution,
+    gs_format.multiple_sigla_answer_variable,
+]
+
+# The indexes each collection needs to serve the loaders' upsert filters, spreadsheet deletes
+# and generation prunes.
+COLLECTION_INDEXES = {
+    db_collection.institutions: [
+        [
+            (InstitutionField.name, ASCENDING),
+            (InstitutionField.category, ASCENDING),
+            (InstitutionField.country, ASCENDING),
+        ],
+        [
+            (InstitutionField.spreadsheet_id, ASCENDING),
+            (DocumentField.generation, ASCENDING),
+        ],
+    ],
+    db_collection.variables: [
+        [
+            (VariableField.institution, ASCENDING),
+            (VariableField.heading, ASCENDING),
+            (VariableField.name, ASCENDING),
+            (VariableField.variable_index, ASCENDING),
+        ],
+        [
+            (DocumentField.spreadsheet_id, ASCENDING),
+            (DocumentField.generation, ASCENDING),
+        ],
+    ],
+    db_collection.rights: [
+        [
+            (CompositeVariableField.variable, ASCENDING),
+            (CompositeVariableField.index, ASCENDING),
+        ],
+        [
+            (DocumentField.spreadsheet_id, ASCENDING),
+            (DocumentField.generation, ASCENDING),
+        ],
+    ],
+    db_collection.amendments: [
+        [
+            (CompositeVariableField.variable, ASCENDING),
+            (CompositeVariableField.index, ASCENDING),
+        ],
+        [
+            (DocumentField.spreadsheet_id, ASCENDING),
+            (DocumentField.generation, ASCENDING),
+        ],
+    ],
+    db_collection.body_of_law: [
+        [
+            (CompositeVariableField.variables, ASCENDING),
+            (CompositeVariableField.index, ASCENDING),
+        ],
+        [
+            (DocumentField.spreadsheet_id, ASCENDING),
+            (DocumentField.generation, ASCENDING),
+        ],
+    ],
+}
+
+# The field of each composite variable collection that refers to the rows' variables
+COMPOSITE_VARIABLE_FIELDS = {
+    db_collection.rights: CompositeVariableField.variable,
+    db_collection.amendments: CompositeVariableField.variable,
+    db_collection.body_of_law: CompositeVariableField.variables,
+}
+
+# The order the shadow collections are renamed over the live collections in. The site reads the institutions,
+# then their variables, then the composite variable rows of the variables, so each collection is renamed
+# before the collections that refer to it: a reader that finds the new institutions finds their new variables
+# and composite variable rows.
+RENAME_ORDER = [
+    db_collection.rights,
+    db_collection.amendments,
+    db_collection.body_of_law,
+    db_collection.variables,
+    db_collection.institutions,
+]
+
+# The indexes of the collections built from the loaded collections, to serve the site's reads.
+MATERIALIZED_COLLECTION_INDEXES = {
+    db_collection.institution_pages: [
+        [
+            (InstitutionField.country, ASCENDING),
+            (InstitutionField.category, ASCENDING),
+            (InstitutionField.name, ASCENDING),
+        ],
+    ],
+}
+# The collections copied to the target database of a promotion
+PROMOTED_COLLECTIONS = [
+    *COLLECTION_INDEXES,
+    *MATERIALIZED_COLLECTION_INDEXES,
+    db_collection.spreadsheet_fingerprints,
+]
+
+###############################################################################
+
+
+def _get_index_options(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the options to create an index with from its index information.
+
+    Parameters
+    ----------
+    info: Dict[str, Any]
+        The index information, as returned by Collection.index_information.
+
+    Returns
+    -------
+    options: Dict[str, Any]
+        The options of the index, e.g. unique.
+    """
+    return {key: value for key, value in info.items() if key not in ["key", "v", "ns"]}
+
+
+def _chunk_rows(rows: List[List[str]]) -> List[List[List[str]]]:
+    """
+    Split the rows of a sheet into chunks of at most DEFERRED_SHEET_CHUNK_BYTES, one per document.
+
+    Parameters
+    ----------
+    rows: List[List[str]]
+        The rows of the sheet.
+
+    Returns
+    -------
+    chunks: List[List[List[str]]]
+        The consecutive chunks of rows. A row larger than the limit is a chunk of its own.
+    """
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for row in rows:
+        row_size = get_size(row)
+        if chunk and chunk_size + row_size > DEFERRED_SHEET_CHUNK_BYTES:
+            chunks.append(chunk)
+            chunk = []
+            chunk_size = 0
+        chunk.append(row)
+        chunk_size += row_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class DocumentsWrite(NamedTuple):
+    """
+    The upserts of documents of a sheet, buffered in the write buffer. See MongoDBDatabase._write_documents.
+
+    Attributes:
+        collection: str
+            The collection written to.
+        formatted_sheet_data: FormattedSheetData
+            The sheet the documents come from.
+        document_count: int
+            The number of documents of the sheet.
+        document_ids: Dict[int, ObjectId]
+            The ids of the unchanged or upserted documents, by their position in the sheet's documents.
+            The ids of the upserted documents are added once the buffer is flushed.
+        deleted_ids: List[ObjectId]
+            The ids of the documents deleted because they are no longer in the sheet.
+        upserted_document_indexes: Dict[int, int]
+            The position of the document of each upsert request, by the index of the request.
+        pending_write: Optional[PendingWrite]
+            The buffered requests. None if nothing changed.
+    """
+
+    collection: str
+    formatted_sheet_data: FormattedSheetData
+    document_count: int
+    document_ids: Dict[int, ObjectId]
+    deleted_ids: List[ObjectId]
+    upserted_document_indexes: Dict[int, int]
+    pending_write: Optional[PendingWrite]
+
+
+# A step of the load of a sheet: it buffers writes, given the flushed writes of the step before it
+LoadStep = Callable[[FormattedSheetData, List[DocumentsWrite]], List[DocumentsWrite]]
+
 
 class MongoDBDatabase:
-    def __init__(self, db_connection_url: str):
-        self._client = MongoClient(db_connection_url, connect=False)
+    def __init__(
+        self,
+        db_connection_url: str,
+        shadow: bool = False,
+        skip_unchanged: bool = False,
+        bulk_write_batch_size: int = BULK_WRITE_BATCH_SIZE,
+        write_concern: Optional[int] = None,
+        generation: Optional[str] = None,
+        client: Optional[MongoClient] = None,
+    ):
+        if write_concern is not None and write_concern < 1:
+            raise ValueError(
+                f"write_concern must be at least 1 acknowledgment, got {write_concern}."
+            )
+        # Connect to the database, unless given a client, e.g. an in-memory client for tests and benchmarks
+        self._client = (
+            client if client is not None else self._create_client(db_connection_url)
+        )
+        # A given client is closed by whoever created it
+        self._owns_client = client is None
         self._db_connection_url = db_connection_url
-        self._db = self._client.get_default_database()
+        # Relax the write concern to w acknowledgments without journaling, for bulk loads
+        self._db = self._client.get_default_database(
+            write_concern=WriteConcern(w=write_concern, j=False)
+            if write_concern is not None
+            else None
+        )
+        # Read and write the shadow collections instead of the live ones
+        self._collection_suffix = SHADOW_COLLECTION_SUFFIX if shadow else ""
+        # Write only new or changed documents and delete stale ones
+        self._skip_unchanged = skip_unchanged
+        # Stamp the run's generation on every written document, see prune_generations
+        self._generation_fields = (
+            {DocumentField.generation: generation} if generation else {}
+        )
+        # Composite variable references by (spreadsheet_id, sheet_id)
+        self._variable_references = {}
+        # The round trips of the load, by collection and by sheet
+        self._metrics = LoadMetrics()
+        # The key of the sheet whose loader is running, see _run_loaders
+        self._current_sheet: Optional[Tuple[str, str]] = None
+        # Write requests of the sheets being loaded, flushed together
+        self._bulk_write_batch_size = bulk_write_batch_size
+        self._write_buffer = BulkWriteBuffer(bulk_write_batch_size, self._metrics)
+        # The session of the transaction the loaders run in, see reload_spreadsheet
+        self._session: Optional[ClientSession] = None
+        # The load steps of each sheet format. The writes of a step are flushed before the next step runs.
         self._load_function_dict = {
-            gs_format.standard_institution: self._load_institutions,
-            gs_format.institution_and_composite_variable: self._load_institution_and_composite_variable,
-            gs_format.composite_variable: self._load_composite_variable,
-            gs_format.multiple_sigla_answer_variable: self._load_institutions,
+            gs_format.standard_institution: [
+                self._load_institutions,
+                self._load_variables,
+            ],
+            gs_format.institution_and_composite_variable: [
+                self._load_institution_and_composite_variable
+            ],
+            gs_format.composite_variable: [self._load_composite_variable],
+            gs_format.multiple_sigla_answer_variable: [
+                self._load_institutions,
+                self._load_variables,
+            ],
         }
 
-    def _create_variable_reference(self, sheet_title: str, meta_data: Dict[str, str]):
-        institution_names = [
-            name.strip() for name in meta_data.get(InstitutionField.name).split(";")
-        ]
+    def _create_client(self, db_connection_url: str) -> MongoClient:
+        """Create the client connected to the database."""
+        return MongoClient(db_connection_url, connect=False)
 
-        institution = {
-            InstitutionField.name: {"$in": institution_names},
-            InstitutionField.country: meta_data.get(InstitutionField.country),
-            InstitutionField.category: meta_data.get(InstitutionField.category),
-        }
-        institution_docs = self.find(db_collection.institutions, institution)
-        institution_docs_id = [
-            doc.get(InstitutionField._id) for doc in institution_docs
-        ]
+    def _get_collection_name(self, collection: str) -> str:
+        """Get the name of the collection this database reads and writes."""
+        return f"{collection}{self._collection_suffix}"
 
-        variable = {
-            VariableField.institution: {"$in": institution_docs_id},
-            VariableField.heading: meta_data.get(MetaDataField.variable_heading),
-            VariableField.name: meta_data.get(MetaDataField.variable_name),
-        }
-        variable_docs = self.find(db_collection.variables, variable)
-        variable_docs_id = [doc.get(VariableField._id) for doc in variable_docs]
+    def _get_collection(self, collection: str) -> Collection:
+        """Get the collection this database reads and writes."""
+        return self._db.get_collection(self._get_collection_name(collection))
 
-        if len(variable_docs_id) != len(institution_names):
-            raise UnableToFindDocument(
-                ErrorInfo(
-                    {
-                        InstitutionField.country: meta_data.get(InstitutionField.country),
-                        GoogleSheetsInfoField.sheet_title: sheet_title,
-                        DatabaseField.collection: db_collection.variables,
-                        DatabaseField.primary_keys: str(variable),
-                    }
-                )
-            )
+    def _call(self, collection: str, method: str, *args, **kwargs) -> Any:
+        """
+        Call a collection method for a loader, in the session of the loaders' transaction if there is one,
+        and record its round trip in the load metrics.
 
-        # update the variables to have type composite and the right hyperlink
-        update_variables_request = UpdateMany(
-            {VariableField._id: {"$in": variable_docs_id}},
-            {
-                "$set": {
-                    VariableField.type: VariableType.composite,
-                    VariableField.hyperlink: meta_data.get(MetaDataField.data_type),
-                }
-            },
-        )
-        update_variables_request_result = self._db.get_collection(
-            db_collection.variables
-        ).bulk_write([update_variables_request])
-        log.info(
-            f"Update {update_variables_request_result.modified_count}/{len(variable_docs_id)} variables"
-        )
+        Parameters
+        ----------
+        collection: str
+            The collection to call the method of.
+        method: str
+            The name of the collection method, e.g. find_one.
+        args:
+            The positional arguments of the method.
+        kwargs:
+            The keyword arguments of the method.
+
+        Returns
+        -------
+        result: Any
+            The result of the method. A cursor is read into a list.
+        """
+        if self._session is not None:
+            kwargs["session"] = self._session
+        start = time.perf_counter()
+        result = getattr(self._get_collection(collection), method)(*args, **kwargs)
+        if method in CURSOR_METHODS:
+            result = list(result)
+        self._record_call(collection, method, args, result, time.perf_counter() - start)
+        return result
+
+    def _record_call(
+        self,
+        collection: str,
+        method: str,
+        args: Tuple,
+        result: Any,
+        latency: float,
+    ):
+        """
+        Record the round trip of a collection method called by a loader in the load metrics.
 
-        if meta_data.get(MetaDataField.data_type) == db_collection.body_of_law:
-            return {CompositeVariableField.variables: variable_docs_id}
+        Parameters
+        ----------
+        collection: str
+            The collection the method was called on.
+        method: str
+            The name of the collection method.
+        args: Tuple
+            The positional arguments of the method.
+        result: Any
+            The result of the method.
+        latency: float
+            The duration of the call, in seconds.
+        """
+        if method == "bulk_write":
+            requests = args[0]
+            bulk_api_result = result.bulk_api_result
+            counts = {
+                "requests": len(requests),
+                "matched": bulk_api_result.get("nMatched", 0),
+                "modified": bulk_api_result.get("nModified", 0),
+                "upserted": bulk_api_result.get("nUpserted", 0),
+                "deleted": bulk_api_result.get("nRemoved", 0),
+                "bytes_sent": sum(get_request_size(request) for request in requests),
+            }
         else:
-            return {CompositeVariableField.variable: variable_docs_id[0]}
+            counts = {"requests": 1, "bytes_sent": get_size(list(args))}
+        if isinstance(result, list):
+            counts["documents"] = len(result)
+        elif isinstance(result, dict):
+            counts["documents"] = 1
+        elif hasattr(result, "deleted_count"):
+            counts["deleted"] = result.deleted_count
+        self._metrics.record(
+            collection,
+            method,
+            latency,
+            counts,
+            {self._current_sheet: counts} if self._current_sheet else None,
+        )
+
+    def _create_variable_reference(
+        self, formatted_sheet_data: FormattedSheetData
+    ) -> Dict[str, Any]:
+        """
+        Get the reference of a composite variable's rows to their variables.
+        Use the reference resolved ahead of time if there is one, else resolve it.
+
+        Parameters
+        ----------
+        formatted_sheet_data: FormattedSheetData
+            The composite variable sheet data.
+
+        Returns
+        -------
+        variable_reference: Dict[str, Any]
+            The variable or variables field of the composite variable rows.
+        """
+        sheet_key = (formatted_sheet_data.spreadsheet_id, formatted_sheet_data.sheet_id)
+        if sheet_key not in self._variable_references:
+            self.resolve_variable_references(
+                [formatted_sheet_data], raise_on_missing=True
+            )
+        return self._variable_references.get(sheet_key)
 
     def _find_one(
         self, collection: str, primary_keys: Dict[str, str]
-    ) -> Dict[str, str]:
+    ) -> Dict[str, Any]:
         """
         Find a document in given collection with the given primary keys.
         If it doesn't exist, insert the document into the database.
+        The document is stamped with the run's generation.
 
         Parameters
         ----------
@@ -124,17 +466,216 @@ class MongoDBDatabase:
 
         """
         # Find the document
-        document = self._db.get_collection(collection).find_one_and_update(
+        return self._call(
+            collection,
+            "find_one_and_update",
             primary_keys,
-            {"$set": primary_keys},
+            {"$set": {**primary_keys, **self._generation_fields}},
             return_document=ReturnDocument.AFTER,
             upsert=True,
         )
-        return document
 
-    def _load_institution_and_composite_variable(
-        self, formatted_sheet_data: FormattedSheetData
+    def _write_documents(
+        self,
+        collection: str,
+        primary_keys: List[str],
+        documents: List[Dict[str, Any]],
+        formatted_sheet_data: FormattedSheetData,
+        scope: Dict[str, Any],
+    ) -> DocumentsWrite:
+        """
+        Buffer the upserts of documents into a collection, one for each set of primary keys.
+        Every document is stamped with the spreadsheet_id and sheet_id of its sheet,
+        and with the run's generation if there is one.
+        When skipping unchanged documents, the content hashes of the documents in scope are fetched in one query,
+        only new or changed documents are written, and documents in scope that are no longer
+        loaded are deleted.
+        The ids of the upserted documents are known once the buffer is flushed, see _finish_documents_write.
+
+        Parameters
+        ----------
+        collection: str
+            The collection to write to.
+        primary_keys: List[str]
+            The fields that specify a unique document in the collection.
+        documents: List[Dict[str, Any]]
+            The documents to upsert.
+        formatted_sheet_data: FormattedSheetData
+            The sheet the documents come from.
+        scope: Dict[str, Any]
+            A filter matching every document previously loaded from the same source.
+
+        Returns
+        -------
+        documents_write: DocumentsWrite
+            The buffered write of the documents.
+        """
+        existing_docs = {}
+        if self._skip_unchanged:
+            docs_in_scope = self._call(
+                collection, "find", scope, [*primary_keys, DocumentField.content_hash]
+            )
+            existing_docs = {
+                hash_document([doc.get(pk) for pk in primary_keys]): doc
+                for doc in docs_in_scope
+            }
+
+        document_ids = {}
+        upserted_document_indexes = {}
+        requests = []
+        for i, document in enumerate(documents):
+            # Stamp the source sheet, so a spreadsheet's documents can be deleted in one query
+            document = {
+                **document,
+                DocumentField.spreadsheet_id: formatted_sheet_data.spreadsheet_id,
+                DocumentField.sheet_id: formatted_sheet_data.sheet_id,
+                **self._generation_fields,
+            }
+            content_hash = hash_document(document)
+            existing_doc = existing_docs.pop(
+                hash_document([document.get(pk) for pk in primary_keys]), None
+            )
+            if existing_doc is not None:
+                document_ids[i] = existing_doc.get("_id")
+                if existing_doc.get(DocumentField.content_hash) == content_hash:
+                    # The document didn't change
+                    continue
+            else:
+                upserted_document_indexes[len(requests)] = i
+            requests.append(
+                UpdateOne(
+                    {pk: document.get(pk) for pk in primary_keys},
+                    {"$set": {**document, DocumentField.content_hash: content_hash}},
+                    upsert=True,
+                )
+            )
+        # Whatever is left in scope is no longer loaded
+        deleted_ids = [doc.get("_id") for doc in existing_docs.values()]
+        if deleted_ids:
+            requests.append(DeleteMany({"_id": {"$in": deleted_ids}}))
+
+        pending_write = None
+        if requests:
+            pending_write = self._buffer_requests(
+                collection, requests, formatted_sheet_data
+            )
+        else:
+            log.info(
+                f"No changes to {collection} from sheet: {formatted_sheet_data.sheet_title}"
+            )
+        return DocumentsWrite(
+            collection,
+            formatted_sheet_data,
+            len(documents),
+            document_ids,
+            deleted_ids,
+            upserted_document_indexes,
+            pending_write,
+        )
+
+    def _finish_documents_write(self, documents_write: DocumentsWrite):
+        """
+        Once the write buffer is flushed, add the ids of the upserted documents to the ids of the documents
+        of a write, or raise if any of its requests failed.
+
+        Parameters
+        ----------
+        documents_write: DocumentsWrite
+            The flushed write of the documents.
+        """
+        pending_write = documents_write.pending_write
+        if pending_write is None:
+            return
+        collection = documents_write.collection
+        sheet_title = documents_write.formatted_sheet_data.sheet_title
+        if pending_write.write_errors:
+            raise UnableToWriteDocuments(
+                ErrorInfo(
+                    {
+                        GoogleSheetsInfoField.sheet_title: sheet_title,
+                        DatabaseField.collection: collection,
+                        "errors": "; ".join(pending_write.write_errors),
+                    }
+                )
+            )
+        for request_index, upserted_id in pending_write.upserted_ids.items():
+            documents_write.document_ids[
+                documents_write.upserted_document_indexes[request_index]
+            ] = upserted_id
+        log.info(
+            f"Loaded {len(pending_write.upserted_ids)} {collection} "
+            f"from sheet: {sheet_title}"
+        )
+        if self._skip_unchanged:
+            updated_count = len(pending_write.requests) - len(
+                pending_write.upserted_ids
+            )
+            if documents_write.deleted_ids:
+                updated_count -= 1
+            log.info(
+                f"Updated {updated_count} "
+                f"and deleted {len(documents_write.deleted_ids)} {collection} "
+                f"of {documents_write.document_count} from sheet: {sheet_title}"
+            )
+
+    def _buffer_requests(
+        self,
+        collection: str,
+        requests: List,
+        formatted_sheet_data: FormattedSheetData,
+    ) -> PendingWrite:
+        """
+        Add write requests of a sheet to the write buffer.
+
+        Parameters
+        ----------
+        collection: str
+            The collection to write to.
+        requests: List
+            The pymongo write requests.
+        formatted_sheet_data: FormattedSheetData
+            The sheet the requests are written for.
+
+        Returns
+        -------
+        pending_write: PendingWrite
+            The requests, with their results filled in once flushed.
+        """
+        return self._write_buffer.add(
+            self._get_collection(collection),
+            requests,
+            (formatted_sheet_data.spreadsheet_id, formatted_sheet_data.sheet_id),
+        )
+
+    def _delete_composite_variable_rows(
+        self, variable_ids: List[ObjectId], formatted_sheet_data: FormattedSheetData
     ):
+        """
+        Buffer the deletion of the composite variable rows that refer to the given variables.
+
+        Parameters
+        ----------
+        variable_ids: List[ObjectId]
+            The ids of the deleted variables.
+        formatted_sheet_data: FormattedSheetData
+            The sheet the variables were loaded from.
+        """
+        for collection, variable_field in COMPOSITE_VARIABLE_FIELDS.items():
+            self._buffer_requests(
+                collection,
+                [DeleteMany({variable_field: {"$in": variable_ids}})],
+                formatted_sheet_data,
+            )
+        log.info(
+            f"Deleting the composite variable rows of {len(variable_ids)} {db_collection.variables} "
+            f"from sheet: {formatted_sheet_data.sheet_title}"
+        )
+
+    def _load_institution_and_composite_variable(
+        self,
+        formatted_sheet_data: FormattedSheetData,
+        documents_writes: List[DocumentsWrite],
+    ) -> List[DocumentsWrite]:
         """
         Load the special institution that is also a composite variable in to the db.
         Load the composite variable into the db.
@@ -143,13 +684,26 @@ class MongoDBDatabase:
         ----------
         formatted_sheet_data: FormattedSheetData
             The data to be loaded into the database. Please see the FormattedSheetData class to view its attributes.
+        documents_writes: List[DocumentsWrite]
+            The flushed writes of the previous load step of the sheet. Empty for the first step.
+
+        Returns
+        -------
+        documents_writes: List[DocumentsWrite]
+            The buffered writes of the step.
         """
-        self._load_composite_variable(formatted_sheet_data)
-        self._load_institution_with_aggregate_variable(formatted_sheet_data)
+        return [
+            *self._load_composite_variable(formatted_sheet_data, documents_writes),
+            *self._load_institution_with_aggregate_variable(
+                formatted_sheet_data, documents_writes
+            ),
+        ]
 
     def _load_institution_with_aggregate_variable(
-        self, formatted_sheet_data: FormattedSheetData
-    ):
+        self,
+        formatted_sheet_data: FormattedSheetData,
+        documents_writes: List[DocumentsWrite],
+    ) -> List[DocumentsWrite]:
         """
         Load the special institution that is also a composite variable in to the db.
 
@@ -157,6 +711,13 @@ class MongoDBDatabase:
         ----------
         formatted_sheet_data: FormattedSheetData
             The data to be loaded into the database. Please see the FormattedSheetData class to view its attributes.
+        documents_writes: List[DocumentsWrite]
+            The flushed writes of the previous load step of the sheet. Empty for the first step.
+
+        Returns
+        -------
+        documents_writes: List[DocumentsWrite]
+            The buffered writes of the step.
         """
         # Create the institution primary keys
         institution = {
@@ -204,32 +765,28 @@ class MongoDBDatabase:
             }
             for i, variable_heading in enumerate(variable_heading_list)
         ]
-        # Create the list of update requests into the db, one for each variable
-        update_requests = [
-            UpdateOne(
-                {
-                    VariableField.institution: variable.get(VariableField.institution),
-                    VariableField.name: variable.get(VariableField.name),
-                    VariableField.variable_index: variable.get(
-                        VariableField.variable_index
-                    ),
+        # Upsert the variables into the db
+        return [
+            self._write_documents(
+                db_collection.variables,
+                [
+                    VariableField.institution,
+                    VariableField.name,
+                    VariableField.variable_index,
+                ],
+                variables,
+                formatted_sheet_data,
+                scope={
+                    VariableField.institution: institution_doc.get(InstitutionField._id)
                 },
-                {"$set": variable},
-                upsert=True,
             )
-            for i, variable in enumerate(variables)
         ]
-        # Bulk write the variables into the db
-        update_requests_results = self._db.get_collection(
-            db_collection.variables
-        ).bulk_write(update_requests)
-
-        log.info(
-            f"Loaded {update_requests_results.upserted_count} {db_collection.variables} "
-            f"from sheet: {formatted_sheet_data.sheet_title}"
-        )
 
-    def _load_composite_variable(self, formatted_sheet_data: FormattedSheetData):
+    def _load_composite_variable(
+        self,
+        formatted_sheet_data: FormattedSheetData,
+        documents_writes: List[DocumentsWrite],
+    ) -> List[DocumentsWrite]:
         """
         Load composite variable into the database.
 
@@ -237,158 +794,818 @@ class MongoDBDatabase:
         ----------
         formatted_sheet_data: FormattedSheetData
             The data to be loaded into the database. Please see the FormattedSheetData class to view its attributes.
+        documents_writes: List[DocumentsWrite]
+            The flushed writes of the previous load step of the sheet. Empty for the first step.
+
+        Returns
+        -------
+        documents_writes: List[DocumentsWrite]
+            The buffered writes of the step.
         """
         data_type = formatted_sheet_data.meta_data.get(MetaDataField.data_type)
         # Get the composite variable reference
-        variable_reference = self._create_variable_reference(
-            formatted_sheet_data.sheet_title, formatted_sheet_data.meta_data
-        )
-        # Create the list of update requests into the db, one for each row of the composite variable
-        update_requests = [
-            UpdateOne(
-                {
-                    **variable_reference,
-                    CompositeVariableField.index: datum.get(
-                        CompositeVariableField.index
-                    ),
+        variable_reference = self._create_variable_reference(formatted_sheet_data)
+        # Upsert the rows of the composite variable into the db
+        return [
+            self._write_documents(
+                data_type,
+                [*variable_reference.keys(), CompositeVariableField.index],
+                [
+                    {**variable_reference, **datum}
+                    for datum in formatted_sheet_data.formatted_data
+                ],
+                formatted_sheet_data,
+                scope={
+                    key: {"$in": value} if isinstance(value, list) else value
+                    for key, value in variable_reference.items()
                 },
-                {"$set": {**variable_reference, **datum}},
-                upsert=True,
             )
-            for datum in formatted_sheet_data.formatted_data
         ]
-        # Bulk write the composite variable into the db
-        update_requests_results = self._db.get_collection(data_type).bulk_write(
-            update_requests
-        )
-        log.info(
-            f"Loaded {update_requests_results.upserted_count} {data_type} "
-            f"from sheet: {formatted_sheet_data.sheet_title}"
-        )
+
+    @staticmethod
+    def _get_institution_primary_keys(
+        formatted_sheet_data: FormattedSheetData,
+    ) -> List[str]:
+        """Get the fields that specify a unique institution of an institution sheet."""
+        institution_primary_keys = [InstitutionField.name, InstitutionField.category]
+        if InstitutionField.country in formatted_sheet_data.meta_data:
+            institution_primary_keys.append(InstitutionField.country)
+        return institution_primary_keys
 
     def _load_institutions(
         self,
         formatted_sheet_data: FormattedSheetData,
-    ):
+        documents_writes: List[DocumentsWrite],
+    ) -> List[DocumentsWrite]:
         """
-        Load institutions and their variables in to the database.
+        Load institutions in to the database. Their variables are loaded by the next step, see _load_variables.
 
         Parameters
         ----------
         formatted_sheet_data: FormattedSheetData
             The data to be loaded into the database. Please see the FormattedSheetData class to view its attributes.
+        documents_writes: List[DocumentsWrite]
+            The flushed writes of the previous load step of the sheet. Empty for the first step.
+
+        Returns
+        -------
+        documents_writes: List[DocumentsWrite]
+            The buffered write of the institutions.
         """
-        institution_primary_keys = [InstitutionField.name, InstitutionField.category]
-        if InstitutionField.country in formatted_sheet_data.meta_data:
-            institution_primary_keys.append(InstitutionField.country)
-        # Create the list of update requests into the db, one for each institution
-        institution_requests = [
-            UpdateOne(
-                {pk: institution.get(pk) for pk in institution_primary_keys},
-                {
-                    "$set": {
+        # Upsert the institutions into the db
+        return [
+            self._write_documents(
+                db_collection.institutions,
+                self._get_institution_primary_keys(formatted_sheet_data),
+                [
+                    {
                         key: institution.get(key)
                         for key in institution.keys()
                         if key != "childs"
                     }
+                    for institution in formatted_sheet_data.formatted_data
+                ],
+                formatted_sheet_data,
+                scope={
+                    InstitutionField.spreadsheet_id: formatted_sheet_data.spreadsheet_id,
+                    InstitutionField.sheet_id: formatted_sheet_data.sheet_id,
                 },
-                upsert=True,
             )
-            for institution in formatted_sheet_data.formatted_data
         ]
-        # Bulk write the institutions in the db
-        institution_requests_results = self._db.get_collection(
-            db_collection.institutions
-        ).bulk_write(institution_requests)
-        log.info(
-            f"Loaded {institution_requests_results.upserted_count} {db_collection.institutions} "
-            f"from sheet: {formatted_sheet_data.sheet_title}"
+
+    def _load_variables(
+        self,
+        formatted_sheet_data: FormattedSheetData,
+        documents_writes: List[DocumentsWrite],
+    ) -> List[DocumentsWrite]:
+        """
+        Load the variables of the institutions written by the previous step in to the database.
+
+        Parameters
+        ----------
+        formatted_sheet_data: FormattedSheetData
+            The data to be loaded into the database. Please see the FormattedSheetData class to view its attributes.
+        documents_writes: List[DocumentsWrite]
+            The flushed write of the institutions, see _load_institutions.
+
+        Returns
+        -------
+        documents_writes: List[DocumentsWrite]
+            The buffered write of the variables.
+        """
+        institutions_write = documents_writes[0]
+        institution_primary_keys = self._get_institution_primary_keys(
+            formatted_sheet_data
         )
         # Get doc id for each institution
-        institution_doc_id_dict = {}
+        institution_doc_id_dict = institutions_write.document_ids
         for i, institution in enumerate(formatted_sheet_data.formatted_data):
-            upserted_id = institution_requests_results.upserted_ids.get(i)
-            if upserted_id is None:
+            if i not in institution_doc_id_dict:
                 # The institution wasn't upserted
                 # Find the doc
-                institution_doc = self._db.get_collection(
-                    db_collection.institutions
-                ).find_one({pk: institution.get(pk) for pk in institution_primary_keys})
+                institution_doc = self._call(
+                    db_collection.institutions,
+                    "find_one",
+                    {pk: institution.get(pk) for pk in institution_primary_keys},
+                )
                 institution_doc_id_dict[i] = institution_doc.get(InstitutionField._id)
-            else:
-                institution_doc_id_dict[i] = upserted_id
-
-        # Create the list of update requests into the db, one for each variable
-        variable_requests = [
-            UpdateOne(
-                {
-                    VariableField.institution: institution_doc_id_dict.get(i),
-                    VariableField.heading: child.get(VariableField.heading),
-                    VariableField.name: child.get(VariableField.name),
-                    VariableField.variable_index: child.get(
-                        VariableField.variable_index
-                    ),
-                },
-                {
-                    "$set": {
-                        VariableField.institution: institution_doc_id_dict.get(i),
-                        **child,
-                    }
-                },
-                upsert=True,
+        if institutions_write.deleted_ids:
+            # Remove the variables of the institutions that are no longer in the sheet
+            deleted_variable_ids = self._call(
+                db_collection.variables,
+                "distinct",
+                VariableField._id,
+                {VariableField.institution: {"$in": institutions_write.deleted_ids}},
             )
-            for i, institution in enumerate(formatted_sheet_data.formatted_data)
-            for child in institution.get("childs")
-        ]
-        # Bulk write the variables in the db
-        variable_requests_results = self._db.get_collection(
-            db_collection.variables
-        ).bulk_write(variable_requests)
-        log.info(
-            f"Loaded {variable_requests_results.upserted_count} {db_collection.variables} "
-            f"from sheet: {formatted_sheet_data.sheet_title}"
+            self._buffer_requests(
+                db_collection.variables,
+                [DeleteMany({VariableField._id: {"$in": deleted_variable_ids}})],
+                formatted_sheet_data,
+            )
+            log.info(
+                f"Deleting {len(deleted_variable_ids)} {db_collection.variables} "
+                f"from sheet: {formatted_sheet_data.sheet_title}"
+            )
+            self._delete_composite_variable_rows(
+                deleted_variable_ids, formatted_sheet_data
+            )
+
+        # Upsert the variables into the db
+        variables_write = self._write_documents(
+            db_collection.variables,
+            [
+                VariableField.institution,
+                VariableField.heading,
+                VariableField.name,
+                VariableField.variable_index,
+            ],
+            [
+                {VariableField.institution: institution_doc_id_dict.get(i), **child}
+                for i, institution in enumerate(formatted_sheet_data.formatted_data)
+                for child in institution.get("childs")
+            ],
+            formatted_sheet_data,
+            scope={
+                VariableField.institution: {
+                    "$in": list(institution_doc_id_dict.values())
+                }
+            },
         )
+        if variables_write.deleted_ids:
+            # Remove the composite variable rows of the deleted variables
+            self._delete_composite_variable_rows(
+                variables_write.deleted_ids, formatted_sheet_data
+            )
+        return [variables_write]
+
+    @property
+    def metrics(self) -> LoadMetrics:
+        """The round trips made by this database, by collection and by sheet."""
+        return self._metrics
+
+    def flush(self):
+        """
+        Write the buffered requests to the database.
+        """
+        self._write_buffer.flush(self._session)
 
     def close_connection(self):
         """
-        Cleanup client resources and disconnect from MongoDB.
+        Flush the buffered requests, cleanup client resources and disconnect from MongoDB.
         """
-        self._client.close()
+        self._write_buffer.close()
+        if self._owns_client:
+            self._client.close()
 
     def clean_up(self):
         """
         Delete all documents from the database.
-
+        The materialized collections are kept, until they are rebuilt from the new documents.
         """
 
         for collection in self._db.list_collection_names():
+            if collection in MATERIALIZED_COLLECTION_INDEXES:
+                continue
             delete_result = self._db.get_collection(collection).delete_many({})
             log.info(
                 f"Deleted {delete_result.deleted_count} old documents from {collection}."
             )
 
-    def load(self, formatted_sheet_data: FormattedSheetData):
+    def create_indexes(self):
         """
-        Load the formatted sheet data into the database.
+        Create the indexes of every collection.
+        The indexes of the live collections are copied along with the ones the loaders need,
+        so that building the shadow collections keeps any index created outside of siglatools.
+        """
+        for collection in COLLECTION_INDEXES:
+            target = self._get_collection(collection)
+            index_keys = []
+            if collection in self._db.list_collection_names():
+                for name, info in (
+                    self._db.get_collection(collection).index_information().items()
+                ):
+                    if name == "_id_":
+                        continue
+                    target.create_index(
+                        info.get("key"), name=name, **_get_index_options(info)
+                    )
+                    index_keys.append(list(info.get("key")))
+            for keys in COLLECTION_INDEXES.get(collection):
+                if keys not in index_keys:
+                    target.create_index(keys)
+            log.info(f"Created indexes for {target.name}.")
 
-        Parameters
-        ----------
-        formatted_sheet_data: FormattedSheetData
-            The formatted sheet data. Please see the class FormattedSheetData to view its attributes.
+    def drop_secondary_indexes(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         """
-        load_function_key = formatted_sheet_data.meta_data.get(MetaDataField.format)
-        if load_function_key in self._load_function_dict:
-            self._load_function_dict[load_function_key](formatted_sheet_data)
-        else:
-            raise exceptions.UnrecognizedGoogleSheetsFormat(
-                ErrorInfo(
-                    {
-                        GoogleSheetsInfoField.spreadsheet_title: formatted_sheet_data.spreadsheet_title,
-                        GoogleSheetsInfoField.sheet_title: formatted_sheet_data.sheet_title,
-                        MetaDataField.format: load_function_key,
+        Drop the secondary indexes the loaders don't need, so that bulk loads don't maintain them.
+        The indexes the loaders' upsert filters need are kept.
+        If a drop fails, the indexes dropped before it are rebuilt, so none is lost.
+
+        Returns
+        -------
+        index_specs: Dict[str, Dict[str, Dict[str, Any]]]
+            The index information of the dropped indexes, by collection and index name.
+            See create_secondary_indexes.
+        """
+        index_specs = {}
+        try:
+            for collection in COLLECTION_INDEXES:
+                target = self._get_collection(collection)
+                for name, info in target.index_information().items():
+                    if name == "_id_" or list(
+                        info.get("key")
+                    ) in COLLECTION_INDEXES.get(collection):
+                        continue
+                    target.drop_index(name)
+                    index_specs.setdefault(collection, {})[name] = info
+                log.info(
+                    f"Dropped {len(index_specs.get(collection, {}))} secondary indexes of {target.name}."
+                )
+        except PyMongoError:
+            self.create_secondary_indexes(index_specs)
+            raise
+        return index_specs
+
+    def create_secondary_indexes(
+        self, index_specs: Dict[str, Dict[str, Dict[str, Any]]]
+    ):
+        """
+        Rebuild the secondary indexes dropped by drop_secondary_indexes.
+
+        Parameters
+        ----------
+        index_specs: Dict[str, Dict[str, Dict[str, Any]]]
+            The index information of the dropped indexes, by collection and index name.
+        """
+        for collection, indexes in index_specs.items():
+            target = self._get_collection(collection)
+            for name, info in indexes.items():
+                target.create_index(
+                    info.get("key"), name=name, **_get_index_options(info)
+                )
+            log.info(f"Created {len(indexes)} secondary indexes of {target.name}.")
+
+    def write_barrier(self):
+        """
+        Wait for every write made to the database so far to be acknowledged by a majority
+        of the replica set, journaled.
+        Even a write that changes nothing waits for the latest operation of the primary to be
+        majority committed, so one no-op write covers the writes of every client before it.
+        """
+        self._get_collection(db_collection.institutions).with_options(
+            write_concern=WriteConcern(w="majority", j=True)
+        ).delete_one({InstitutionField._id: ObjectId()})
+        log.info("Writes acknowledged by the majority of the replica set.")
+
+    def prepare_shadow_collections(self):
+        """
+        Drop any shadow collection left over from a previous failed load.
+        """
+        for collection in COLLECTION_INDEXES:
+            shadow_collection = f"{collection}{SHADOW_COLLECTION_SUFFIX}"
+            self._db.drop_collection(shadow_collection)
+            log.info(f"Dropped {shadow_collection}.")
+
+    def swap_shadow_collections(self):
+        """
+        Build the indexes of the shadow collections and rename them over the live collections.
+        Each rename atomically replaces its live collection, so readers never see a partially loaded collection.
+        See _rename_shadow_collections for the window between the renames.
+        """
+        shadow_database = MongoDBDatabase(
+            self._db_connection_url, shadow=True, client=self._client
+        )
+        shadow_database.create_indexes()
+        shadow_database.close_connection()
+        self._rename_shadow_collections(list(COLLECTION_INDEXES))
+
+    def _rename_shadow_collections(self, collections: List[str]):
+        """
+        Rename shadow collections over their live collections, in RENAME_ORDER, and then the other collections.
+        Each rename is atomic, but the renames of the collections are not atomic together: until the
+        institutions are renamed, readers of the old institutions find no variables, and readers of
+        the old variables find no composite variable rows, for their ids aren't in the new collections.
+
+        Parameters
+        ----------
+        collections: List[str]
+            The live collections to replace with their shadow collections.
+        """
+        for collection in sorted(
+            collections,
+            key=lambda collection: RENAME_ORDER.index(collection)
+            if collection in RENAME_ORDER
+            else len(RENAME_ORDER),
+        ):
+            self._client.admin.command(
+                "renameCollection",
+                f"{self._db.name}.{collection}{SHADOW_COLLECTION_SUFFIX}",
+                to=f"{self._db.name}.{collection}",
+                dropTarget=True,
+            )
+            log.info(f"Swapped {collection}{SHADOW_COLLECTION_SUFFIX} to {collection}.")
+
+    def promote(
+        self,
+        target_db_connection_url: str,
+        target_client: Optional[MongoClient] = None,
+    ):
+        """
+        Copy the collections of this database, with their indexes, to the target database.
+        The collections are copied into shadow collections of the target in parallel,
+        and renamed over the target's live collections once they are all copied, so the target
+        serves exactly the documents of this database, and never a partial copy.
+        The fingerprints of the spreadsheets are copied too, for the incremental loads of the target.
+        The target's collections that aren't in this database are dropped.
+        On the same cluster, each collection is copied server-side with $out.
+        Otherwise, its documents are streamed from this database to the target in batches.
+
+        Parameters
+        ----------
+        target_db_connection_url: str
+            The connection url of the database to copy the collections to.
+        target_client: Optional[MongoClient] = None
+            The client connected to the target database. A new client if None.
+        """
+        target = MongoDBDatabase(target_db_connection_url, client=target_client)
+        source_collections = self._db.list_collection_names()
+        collections = [
+            collection
+            for collection in PROMOTED_COLLECTIONS
+            if collection in source_collections
+        ]
+        same_cluster = get_hosts(self._db_connection_url) == get_hosts(
+            target_db_connection_url
+        )
+        with ThreadPoolExecutor(max_workers=len(collections) or 1) as executor:
+            # Raise the first error of the copies
+            list(
+                executor.map(
+                    lambda collection: self._copy_collection(
+                        collection, target, same_cluster
+                    ),
+                    collections,
+                )
+            )
+        target._rename_shadow_collections(collections)
+        # The collections that are no longer in this database, e.g. the institution pages, would be stale
+        for collection in PROMOTED_COLLECTIONS:
+            if collection not in source_collections:
+                target._db.drop_collection(collection)
+                log.info(f"Dropped {collection} from {target._db.name}.")
+        target.close_connection()
+
+    def _copy_collection(
+        self, collection: str, target: "MongoDBDatabase", same_cluster: bool
+    ):
+        """
+        Copy a collection, with its indexes, to the shadow collection of a target database.
+
+        Parameters
+        ----------
+        collection: str
+            The collection to copy.
+        target: MongoDBDatabase
+            The database to copy the collection to.
+        same_cluster: bool
+            Whether the target is on the same cluster, to copy the collection server-side.
+        """
+        source = self._db.get_collection(collection)
+        shadow_collection = f"{collection}{SHADOW_COLLECTION_SUFFIX}"
+        target._db.drop_collection(shadow_collection)
+        if same_cluster:
+            source.aggregate(
+                [{"$out": {"db": target._db.name, "coll": shadow_collection}}]
+            )
+        else:
+            destination = target._db.create_collection(shadow_collection)
+            batch = []
+            for document in source.find({}, batch_size=FIND_BATCH_SIZE):
+                batch.append(document)
+                if len(batch) == FIND_BATCH_SIZE:
+                    destination.insert_many(batch, ordered=False)
+                    batch = []
+            if batch:
+                destination.insert_many(batch, ordered=False)
+        destination = target._db.get_collection(shadow_collection)
+        for name, info in source.index_information().items():
+            if name == "_id_":
+                continue
+            destination.create_index(
+                info.get("key"), name=name, **_get_index_options(info)
+            )
+        log.info(
+            f"Copied {destination.count_documents({})} {collection} to {target._db.name}."
+        )
+
+    def resolve_variable_references(
+        self,
+        composite_sheets_data: List[FormattedSheetData],
+        raise_on_missing: bool = False,
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Resolve the variables referred to by composite variable sheets.
+        The institutions and variables of every sheet are found in one aggregation, and every found
+        variable is updated to type composite with the right hyperlink in one bulk write.
+
+        Parameters
+        ----------
+        composite_sheets_data: List[FormattedSheetData]
+            The composite variable sheets data.
+        raise_on_missing: bool = False
+            Whether to raise for a sheet whose variables can't all be found,
+            instead of leaving it out of the result.
+
+        Returns
+        -------
+        variable_references: Dict[Tuple[str, str], Dict[str, Any]]
+            The variable or variables field of each sheet's rows, by (spreadsheet_id, sheet_id).
+        """
+        if not composite_sheets_data:
+            return {}
+        sheets_institution_names = [
+            [
+                name.strip()
+                for name in formatted_sheet_data.meta_data.get(
+                    InstitutionField.name
+                ).split(";")
+            ]
+            for formatted_sheet_data in composite_sheets_data
+        ]
+        institution_filters = [
+            {
+                InstitutionField.name: {"$in": institution_names},
+                InstitutionField.country: formatted_sheet_data.meta_data.get(
+                    InstitutionField.country
+                ),
+                InstitutionField.category: formatted_sheet_data.meta_data.get(
+                    InstitutionField.category
+                ),
+            }
+            for formatted_sheet_data, institution_names in zip(
+                composite_sheets_data, sheets_institution_names
+            )
+        ]
+        variable_filters = [
+            {
+                VariableField.heading: formatted_sheet_data.meta_data.get(
+                    MetaDataField.variable_heading
+                ),
+                VariableField.name: formatted_sheet_data.meta_data.get(
+                    MetaDataField.variable_name
+                ),
+            }
+            for formatted_sheet_data in composite_sheets_data
+        ]
+        # Find the institutions and their referred variables
+        institution_docs = self._call(
+            db_collection.institutions,
+            "aggregate",
+            [
+                {"$match": {"$or": institution_filters}},
+                {
+                    "$project": {
+                        InstitutionField.name: 1,
+                        InstitutionField.country: 1,
+                        InstitutionField.category: 1,
+                    }
+                },
+                {
+                    "$lookup": {
+                        "from": self._get_collection_name(db_collection.variables),
+                        "let": {"institution_id": f"${InstitutionField._id}"},
+                        "pipeline": [
+                            {
+                                "$match": {
+                                    "$expr": {
+                                        "$eq": [
+                                            f"${VariableField.institution}",
+                                            "$$institution_id",
+                                        ]
+                                    },
+                                    "$or": variable_filters,
+                                }
+                            },
+                            {
+                                "$project": {
+                                    VariableField.heading: 1,
+                                    VariableField.name: 1,
+                                }
+                            },
+                        ],
+                        "as": "childs",
                     }
+                },
+            ],
+        )
+        institution_docs_dict = {}
+        for institution_doc in institution_docs:
+            institution_key = (
+                institution_doc.get(InstitutionField.country),
+                institution_doc.get(InstitutionField.category),
+                institution_doc.get(InstitutionField.name),
+            )
+            institution_docs_dict.setdefault(institution_key, []).append(
+                institution_doc
+            )
+
+        variable_references = {}
+        update_variables_requests = []
+        for formatted_sheet_data, institution_names, variable_filter in zip(
+            composite_sheets_data, sheets_institution_names, variable_filters
+        ):
+            meta_data = formatted_sheet_data.meta_data
+            variable_docs_id = [
+                variable_doc.get(VariableField._id)
+                for name in institution_names
+                for institution_doc in institution_docs_dict.get(
+                    (
+                        meta_data.get(InstitutionField.country),
+                        meta_data.get(InstitutionField.category),
+                        name,
+                    ),
+                    [],
+                )
+                for variable_doc in institution_doc.get("childs")
+                if variable_doc.get(VariableField.heading)
+                == variable_filter.get(VariableField.heading)
+                and variable_doc.get(VariableField.name)
+                == variable_filter.get(VariableField.name)
+            ]
+
+            if len(variable_docs_id) != len(institution_names):
+                error = UnableToFindDocument(
+                    ErrorInfo(
+                        {
+                            InstitutionField.country: meta_data.get(
+                                InstitutionField.country
+                            ),
+                            GoogleSheetsInfoField.sheet_title: formatted_sheet_data.sheet_title,
+                            DatabaseField.collection: db_collection.variables,
+                            DatabaseField.primary_keys: str(
+                                {
+                                    VariableField.institution: institution_names,
+                                    **variable_filter,
+                                }
+                            ),
+                        }
+                    )
                 )
+                if raise_on_missing:
+                    raise error
+                log.error(str(error))
+                continue
+
+            # update the variables to have type composite and the right hyperlink
+            update_variables_requests.append(
+                UpdateMany(
+                    {VariableField._id: {"$in": variable_docs_id}},
+                    {
+                        "$set": {
+                            VariableField.type: VariableType.composite,
+                            VariableField.hyperlink: meta_data.get(
+                                MetaDataField.data_type
+                            ),
+                        }
+                    },
+                )
+            )
+            sheet_key = (
+                formatted_sheet_data.spreadsheet_id,
+                formatted_sheet_data.sheet_id,
+            )
+            if meta_data.get(MetaDataField.data_type) == db_collection.body_of_law:
+                variable_references[sheet_key] = {
+                    CompositeVariableField.variables: variable_docs_id
+                }
+            else:
+                variable_references[sheet_key] = {
+                    CompositeVariableField.variable: variable_docs_id[0]
+                }
+
+        if update_variables_requests:
+            update_variables_request_result = self._call(
+                db_collection.variables,
+                "bulk_write",
+                update_variables_requests,
+                ordered=False,
+            )
+            log.info(
+                f"Update {update_variables_request_result.modified_count} variables "
+                f"of {len(variable_references)} composite variable sheets"
             )
+        self._variable_references.update(variable_references)
+        return variable_references
+
+    def load(
+        self,
+        formatted_sheet_data: FormattedSheetData,
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+    ):
+        """
+        Load the formatted sheet data into the database.
+
+        Parameters
+        ----------
+        formatted_sheet_data: FormattedSheetData
+            The formatted sheet data. Please see the class FormattedSheetData to view its attributes.
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+            The composite variable references resolved ahead of time. See resolve_variable_references.
+        """
+        _, errors = self._run_loaders([formatted_sheet_data], variable_references)
+        if errors:
+            raise errors[0]
+
+    def load_many(
+        self,
+        formatted_sheets_data: List[FormattedSheetData],
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+    ) -> List[SheetLoadResult]:
+        """
+        Load many formatted sheet data into the database.
+        The sheets are loaded side by side, so the requests of every sheet to a collection are
+        sent together in unordered bulk writes. A sheet that fails, e.g. on a database error,
+        doesn't stop the others.
+        Composite variable sheets must be loaded after the institutions they refer to.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted sheets data. Please see the class FormattedSheetData to view its attributes.
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+            The composite variable references resolved ahead of time. See resolve_variable_references.
+
+        Returns
+        -------
+        results: List[SheetLoadResult]
+            The result of loading each sheet.
+        """
+        results, _ = self._run_loaders(formatted_sheets_data, variable_references)
+        return results
+
+    def _create_loaders(
+        self, formatted_sheets_data: List[FormattedSheetData]
+    ) -> Tuple[Dict[int, List[LoadStep]], Dict[int, BaseError]]:
+        """
+        Create the load steps of every sheet, by the sheet's index.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted sheets data.
+
+        Returns
+        -------
+        loaders: Dict[int, List[LoadStep]]
+            The load steps of the sheets with a recognized format.
+        errors: Dict[int, BaseError]
+            The errors of the sheets with an unrecognized format.
+        """
+        loaders = {}
+        errors = {}
+        for i, formatted_sheet_data in enumerate(formatted_sheets_data):
+            load_function_key = formatted_sheet_data.meta_data.get(MetaDataField.format)
+            if load_function_key in self._load_function_dict:
+                loaders[i] = list(self._load_function_dict[load_function_key])
+            else:
+                errors[i] = exceptions.UnrecognizedGoogleSheetsFormat(
+                    ErrorInfo(
+                        {
+                            GoogleSheetsInfoField.spreadsheet_title: formatted_sheet_data.spreadsheet_title,
+                            GoogleSheetsInfoField.sheet_title: formatted_sheet_data.sheet_title,
+                            MetaDataField.format: load_function_key,
+                        }
+                    )
+                )
+        return loaders, errors
+
+    def _get_load_results(
+        self,
+        formatted_sheets_data: List[FormattedSheetData],
+        errors: Dict[int, Union[BaseError, PyMongoError]],
+    ) -> List[SheetLoadResult]:
+        """
+        Get the result of loading each sheet.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted sheets data.
+        errors: Dict[int, Union[BaseError, PyMongoError]]
+            The errors of the sheets that failed, by the sheet's index.
+
+        Returns
+        -------
+        results: List[SheetLoadResult]
+            The result of loading each sheet.
+        """
+        sheet_counts = {}
+        for formatted_sheet_data in formatted_sheets_data:
+            sheet_key = (
+                formatted_sheet_data.spreadsheet_id,
+                formatted_sheet_data.sheet_id,
+            )
+            if sheet_key not in sheet_counts:
+                sheet_counts[sheet_key] = self._write_buffer.pop_sheet_counts(sheet_key)
+        results = []
+        for i, formatted_sheet_data in enumerate(formatted_sheets_data):
+            request_count, upserted_count = sheet_counts.get(
+                (formatted_sheet_data.spreadsheet_id, formatted_sheet_data.sheet_id)
+            )
+            results.append(
+                SheetLoadResult(
+                    spreadsheet_id=formatted_sheet_data.spreadsheet_id,
+                    sheet_id=formatted_sheet_data.sheet_id,
+                    sheet_title=formatted_sheet_data.sheet_title,
+                    request_count=request_count,
+                    upserted_count=upserted_count,
+                    error=str(errors[i]) if i in errors else None,
+                )
+            )
+        return results
+
+    def _run_loaders(
+        self,
+        formatted_sheets_data: List[FormattedSheetData],
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+    ) -> Tuple[List[SheetLoadResult], List[Union[BaseError, PyMongoError]]]:
+        """
+        Run the load steps of every sheet: the next step of every sheet buffers its writes,
+        and the write buffer is flushed once they all have, until every sheet is loaded.
+        A sheet whose step fails, or whose writes fail, is not loaded further.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted sheets data.
+        variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+            The composite variable references resolved ahead of time.
+
+        Returns
+        -------
+        results: List[SheetLoadResult]
+            The result of loading each sheet.
+        errors: List[Union[BaseError, PyMongoError]]
+            The errors of the sheets that failed.
+        """
+        if variable_references:
+            self._variable_references.update(variable_references)
+        loaders, errors = self._create_loaders(formatted_sheets_data)
+        sheet_keys = {}
+        for i, formatted_sheet_data in enumerate(formatted_sheets_data):
+            sheet_keys[i] = (
+                formatted_sheet_data.spreadsheet_id,
+                formatted_sheet_data.sheet_id,
+            )
+            self._metrics.name_sheet(sheet_keys[i], formatted_sheet_data.sheet_title)
+        documents_writes = {i: [] for i in loaders}
+        while loaders:
+            for i, load_steps in list(loaders.items()):
+                self._current_sheet = sheet_keys[i]
+                try:
+                    documents_writes[i] = load_steps.pop(0)(
+                        formatted_sheets_data[i], documents_writes[i]
+                    )
+                except (BaseError, PyMongoError) as error:
+                    errors[i] = error
+                    del loaders[i]
+                finally:
+                    self._current_sheet = None
+            # Write the requests of every sheet together
+            self.flush()
+            for i, load_steps in list(loaders.items()):
+                try:
+                    for documents_write in documents_writes[i]:
+                        self._finish_documents_write(documents_write)
+                except BaseError as error:
+                    errors[i] = error
+                    load_steps.clear()
+                if not load_steps:
+                    del loaders[i]
+        return (
+            self._get_load_results(formatted_sheets_data, errors),
+            list(errors.values()),
+        )
 
     def find(
         self,
@@ -413,12 +1630,686 @@ class MongoDBDatabase:
         docs: List[Dict[str, Any]]
             The list of matched documents.
         """
-        cursor = self._db.get_collection(collection).find(filters)
-        if sort:
-            cursor.sort(sort)
-        docs = [doc for doc in cursor]
-        log.info(f"Found {len(docs)} {collection} with filters: {filters}.")
-        return docs
+        return list(self.iter_find(collection, filters, sort=sort))
+
+    def iter_find(
+        self,
+        collection: str,
+        filters: Dict[str, Any],
+        projection: Optional[List[str]] = None,
+        sort: Optional[List[Tuple[str, str]]] = None,
+        batch_size: int = FIND_BATCH_SIZE,
+        hint: Optional[Union[str, List[Tuple[str, str]]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily query the database for documents.
+        Documents are fetched from the server in batches as the iterator is consumed.
+
+        Parameters
+        ----------
+        collection: str
+            The db collection to query for documents.
+        filters: Dict[str, Any]
+            A prototype document that all results must match.
+        projection: Optional[List[str]]
+            The fields to return. The _id field is always returned. All fields are returned if None.
+        sort: Optional[List[Tuple[str, str]]]
+            A list of (key, direction) pairs specifying the sort order for this query.
+        batch_size: int = FIND_BATCH_SIZE
+            The number of documents to fetch per round trip.
+        hint: Optional[Union[str, List[Tuple[str, str]]]]
+            The index, by name or by (key, direction) pairs, the query should use.
+
+        Returns
+        -------
+        docs: Iterator[Dict[str, Any]]
+            The matched documents.
+        """
+        count = 0
+        with self._get_collection(collection).find(
+            filters, projection, batch_size=batch_size
+        ) as cursor:
+            if sort:
+                cursor.sort(sort)
+            if hint:
+                cursor.hint(hint)
+            for doc in cursor:
+                count += 1
+                yield doc
+        log.info(
+            f"Found {count} {collection} with filters on: {', '.join(filters.keys())}."
+        )
+
+    def _create_institutions_with_variables_pipeline(
+        self,
+        institution_filters: Dict[str, Any],
+        institution_projection: Optional[List[str]] = None,
+        variable_projection: Optional[List[str]] = None,
+        composite_variable_projection: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Create the aggregation pipeline that embeds the variables and composite variable rows
+        of institutions. See find_institutions_with_variables.
+
+        Parameters
+        ----------
+        institution_filters: Dict[str, Any]
+            The filter the institutions must match.
+        institution_projection: Optional[List[str]]
+            The institution fields to return. All fields are returned if None.
+        variable_projection: Optional[List[str]]
+            The variable fields to return. All fields are returned if None.
+        composite_variable_projection: Optional[List[str]]
+            The composite variable row fields to return. All fields are returned if None.
+
+        Returns
+        -------
+        pipeline: List[Dict[str, Any]]
+            The aggregation pipeline, run on the institutions collection.
+        """
+        composite_collections = [
+            db_collection.rights,
+            db_collection.amendments,
+            db_collection.body_of_law,
+        ]
+        # Look up the rows of a composite variable in each composite collection, on the indexed
+        # variable fields of the rows. Only the rows of the collection the variable links to are kept.
+        composite_lookups = []
+        for collection in composite_collections:
+            composite_pipeline = [
+                {
+                    "$match": {
+                        "$expr": {
+                            "$and": [
+                                {"$eq": ["$$type", VariableType.composite]},
+                                {"$eq": ["$$hyperlink", collection]},
+                            ]
+                        }
+                    }
+                },
+                {"$sort": {CompositeVariableField.index: ASCENDING}},
+            ]
+            if composite_variable_projection is not None:
+                composite_pipeline.append(
+                    {"$project": {field: 1 for field in composite_variable_projection}}
+                )
+            composite_lookups.append(
+                {
+                    "$lookup": {
+                        "from": self._get_collection_name(collection),
+                        "localField": VariableField._id,
+                        "foreignField": COMPOSITE_VARIABLE_FIELDS[collection],
+                        "let": {
+                            "type": f"${VariableField.type}",
+                            "hyperlink": f"${VariableField.hyperlink}",
+                        },
+                        "pipeline": composite_pipeline,
+                        "as": collection,
+                    }
+                }
+            )
+
+        if variable_projection is not None:
+            variable_fields = {
+                **{field: 1 for field in variable_projection},
+                "composite_variable_data": 1,
+            }
+        else:
+            # Drop the lookup results, composite_variable_data has them
+            variable_fields = {collection: 0 for collection in composite_collections}
+        variable_pipeline = [
+            {"$sort": {VariableField.variable_index: ASCENDING}},
+            *composite_lookups,
+            {
+                "$addFields": {
+                    "composite_variable_data": {
+                        "$cond": [
+                            {"$eq": [f"${VariableField.type}", VariableType.composite]},
+                            {
+                                "$concatArrays": [
+                                    f"${collection}"
+                                    for collection in composite_collections
+                                ]
+                            },
+                            "$$REMOVE",
+                        ]
+                    }
+                }
+            },
+            {"$project": variable_fields},
+        ]
+
+        pipeline = [{"$match": institution_filters}]
+        if institution_projection is not None:
+            pipeline.append(
+                {"$project": {field: 1 for field in institution_projection}}
+            )
+        pipeline.append(
+            {
+                "$lookup": {
+                    "from": self._get_collection_name(db_collection.variables),
+                    "localField": InstitutionField._id,
+                    "foreignField": VariableField.institution,
+                    "pipeline": variable_pipeline,
+                    "as": "childs",
+                }
+            }
+        )
+        return pipeline
+
+    def find_institutions_with_variables(
+        self,
+        spreadsheet_ids: List[str],
+        institution_projection: Optional[List[str]] = None,
+        variable_projection: Optional[List[str]] = None,
+        composite_variable_projection: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the database for the institutions of the given spreadsheets, with their variables
+        and composite variable rows, in a single aggregation.
+
+        Parameters
+        ----------
+        spreadsheet_ids: List[str]
+            The spreadsheet ids source of the institutions.
+        institution_projection: Optional[List[str]]
+            The institution fields to return. All fields are returned if None.
+        variable_projection: Optional[List[str]]
+            The variable fields to return. All fields are returned if None.
+        composite_variable_projection: Optional[List[str]]
+            The composite variable row fields to return. All fields are returned if None.
+
+        Returns
+        -------
+        institutions: List[Dict[str, Any]]
+            The list of institutions. Each institution has its variables, sorted by variable_index,
+            in the `childs` field. Each composite variable has its rows, sorted by index,
+            in the `composite_variable_data` field.
+        """
+        pipeline = self._create_institutions_with_variables_pipeline(
+            {InstitutionField.spreadsheet_id: {"$in": spreadsheet_ids}},
+            institution_projection,
+            variable_projection,
+            composite_variable_projection,
+        )
+        institutions = list(
+            self._get_collection(db_collection.institutions).aggregate(pipeline)
+        )
+        log.info(
+            f"Found {len(institutions)} {db_collection.institutions} "
+            f"with their variables from {len(spreadsheet_ids)} spreadsheets."
+        )
+        return institutions
+
+    def materialize_institutions(self):
+        """
+        Build the institution pages collection: one document per institution, with its variables
+        sorted by variable_index, and the rows of each composite variable sorted by index.
+        The collection is rebuilt with a single aggregation, from the live collections,
+        and replaces the previous one atomically, so the site can serve an institution
+        with one indexed read.
+        """
+        self._get_collection(db_collection.institutions).aggregate(
+            [
+                *self._create_institutions_with_variables_pipeline({}),
+                {"$out": self._get_collection_name(db_collection.institution_pages)},
+            ]
+        )
+        institution_pages = self._get_collection(db_collection.institution_pages)
+        for keys in MATERIALIZED_COLLECTION_INDEXES.get(
+            db_collection.institution_pages
+        ):
+            institution_pages.create_index(keys)
+        log.info(
+            f"Materialized {institution_pages.count_documents({})} {db_collection.institution_pages}."
+        )
+
+    def prune_generations(
+        self, generation: str, spreadsheet_ids: Optional[List[str]] = None
+    ):
+        """
+        Delete the documents of every generation older than the given one,
+        with one delete per collection.
+        Documents that are no longer in their sheet weren't written by the run, so they are pruned.
+
+        Parameters
+        ----------
+        generation: str
+            The generation of the run that loaded the current documents.
+        spreadsheet_ids: Optional[List[str]]
+            The ids of the spreadsheets loaded by the run. Documents of other spreadsheets are kept.
+            If None, the run loaded every spreadsheet, and the documents of every spreadsheet are pruned.
+        """
+        prune_filter = {DocumentField.generation: {"$ne": generation}}
+        if spreadsheet_ids is not None:
+            prune_filter[DocumentField.spreadsheet_id] = {"$in": spreadsheet_ids}
+        for collection in COLLECTION_INDEXES:
+            delete_result = self._call(collection, "delete_many", prune_filter)
+            log.info(
+                f"Pruned {delete_result.deleted_count} {collection} "
+                f"of generations older than {generation}."
+            )
+
+    def find_spreadsheet_fingerprints(self) -> Dict[str, str]:
+        """
+        Find the fingerprints of the spreadsheets' contents as of their last incremental load.
+
+        Returns
+        -------
+        fingerprints: Dict[str, str]
+            The fingerprint of each spreadsheet, by spreadsheet id.
+        """
+        return {
+            doc.get(FingerprintField._id): doc.get(FingerprintField.fingerprint)
+            for doc in self._db.get_collection(
+                db_collection.spreadsheet_fingerprints
+            ).find({})
+        }
+
+    def save_spreadsheet_fingerprints(self, fingerprints: Dict[str, str]):
+        """
+        Replace the stored fingerprints with the ones of the spreadsheets just loaded.
+        The fingerprints of the spreadsheets that are not given are deleted.
+
+        Parameters
+        ----------
+        fingerprints: Dict[str, str]
+            The fingerprint of each spreadsheet, by spreadsheet id.
+        """
+        requests = [
+            UpdateOne(
+                {FingerprintField._id: spreadsheet_id},
+                {"$set": {FingerprintField.fingerprint: fingerprint}},
+                upsert=True,
+            )
+            for spreadsheet_id, fingerprint in fingerprints.items()
+        ]
+        requests.append(
+            DeleteMany({FingerprintField._id: {"$nin": list(fingerprints.keys())}})
+        )
+        self._db.get_collection(db_collection.spreadsheet_fingerprints).bulk_write(
+            requests
+        )
+        log.info(f"Saved the fingerprints of {len(fingerprints)} spreadsheets.")
+
+    def defer_composite_sheets(
+        self,
+        run: str,
+        institution_keys: Optional[List[Tuple[str, str, str]]],
+        deferred_sheets: List[Tuple[SheetData, List[Tuple[str, str, str]]]],
+    ):
+        """
+        Record the institutions a spreadsheet loaded, and its composite sheets that refer to institutions
+        of other spreadsheets, for the streaming load of a run. See claim_deferred_composite_sheets.
+
+        Parameters
+        ----------
+        run: str
+            The id of the run.
+        institution_keys: Optional[List[Tuple[str, str, str]]]
+            The (name, country, category) of the institutions the spreadsheet loaded,
+            or None if its institution sheets failed to load.
+        deferred_sheets: List[Tuple[SheetData, List[Tuple[str, str, str]]]]
+            Each deferred composite sheet, with the (name, country, category) of the institutions it refers to.
+        """
+        # The rows of a sheet are stored in chunks, so that a large sheet doesn't exceed the document
+        # size limit. The chunks are recorded before their sheet, and the sheets before the institutions,
+        # so that a sheet is recorded in full by the time another spreadsheet finds its institutions loaded
+        chunk_docs = []
+        docs = []
+        for sheet_data, referred_institution_keys in deferred_sheets:
+            sheet_id = ObjectId()
+            chunk_docs += [
+                {
+                    DeferredSheetField.run: run,
+                    DeferredSheetField.sheet: sheet_id,
+                    DeferredSheetField.chunk: chunk_index,
+                    DeferredSheetField.rows: rows,
+                }
+                for chunk_index, rows in enumerate(_chunk_rows(sheet_data.data))
+            ]
+            docs.append(
+                {
+                    DeferredSheetField._id: sheet_id,
+                    DeferredSheetField.run: run,
+                    DeferredSheetField.referred_institutions: [
+                        list(institution_key)
+                        for institution_key in referred_institution_keys
+                    ],
+                    DeferredSheetField.sheet_data: sheet_data._replace(
+                        data=None
+                    )._asdict(),
+                    DeferredSheetField.claimed: False,
+                }
+            )
+        docs = chunk_docs + docs
+        if institution_keys is not None:
+            docs.append(
+                {
+                    DeferredSheetField.run: run,
+                    DeferredSheetField.institutions: [
+                        list(institution_key) for institution_key in institution_keys
+                    ],
+                }
+            )
+        if docs:
+            self._db.get_collection(
+                db_collection.deferred_composite_sheets
+            ).insert_many(docs)
+
+    def claim_deferred_composite_sheets(
+        self, run: str, claim_all: bool = False
+    ) -> List[SheetData]:
+        """
+        Claim the deferred composite sheets of a run whose referred institutions have all been loaded.
+        Every spreadsheet claims them once it has recorded its own, so a sheet is claimed by the
+        spreadsheet that loads its last referred institution, or by its own spreadsheet if that loads last.
+        A sheet is claimed once, by the first claim that finds it.
+
+        Parameters
+        ----------
+        run: str
+            The id of the run.
+        claim_all: bool = False
+            Whether to claim every deferred composite sheet left, once every spreadsheet has loaded.
+
+        Returns
+        -------
+        sheets_data: List[SheetData]
+            The claimed sheets, to load.
+        """
+        collection = self._db.get_collection(db_collection.deferred_composite_sheets)
+        loaded_institution_keys = {
+            tuple(institution_key)
+            for doc in collection.find(
+                {
+                    DeferredSheetField.run: run,
+                    DeferredSheetField.institutions: {"$exists": True},
+                },
+                [DeferredSheetField.institutions],
+            )
+            for institution_key in doc.get(DeferredSheetField.institutions)
+        }
+        sheets_data = []
+        for doc in collection.find(
+            {DeferredSheetField.run: run, DeferredSheetField.claimed: False},
+            [DeferredSheetField.referred_institutions],
+        ):
+            referred_institution_keys = {
+                tuple(institution_key)
+                for institution_key in doc.get(DeferredSheetField.referred_institutions)
+            }
+            if (
+                not claim_all
+                and not referred_institution_keys <= loaded_institution_keys
+            ):
+                continue
+            claimed_doc = collection.find_one_and_update(
+                {
+                    DeferredSheetField._id: doc.get(DeferredSheetField._id),
+                    DeferredSheetField.claimed: False,
+                },
+                {"$set": {DeferredSheetField.claimed: True}},
+            )
+            if claimed_doc is not None:
+                rows = [
+                    row
+                    for chunk_doc in collection.find(
+                        {
+                            DeferredSheetField.run: run,
+                            DeferredSheetField.sheet: claimed_doc.get(
+                                DeferredSheetField._id
+                            ),
+                        }
+                    ).sort([(DeferredSheetField.chunk, ASCENDING)])
+                    for row in chunk_doc.get(DeferredSheetField.rows)
+                ]
+                sheets_data.append(
+                    SheetData(
+                        **{
+                            **claimed_doc.get(DeferredSheetField.sheet_data),
+                            "data": rows,
+                        }
+                    )
+                )
+        log.info(f"Claimed {len(sheets_data)} deferred composite sheets of run {run}.")
+        return sheets_data
+
+    def delete_deferred_composite_sheets(self, run: str):
+        """
+        Delete the deferred composite sheets and loaded institutions recorded by a run,
+        leaving the records of the runs streaming at the same time.
+
+        Parameters
+        ----------
+        run: str
+            The id of the run.
+        """
+        delete_result = self._db.get_collection(
+            db_collection.deferred_composite_sheets
+        ).delete_many({DeferredSheetField.run: run})
+        log.info(
+            f"Deleted {delete_result.deleted_count} {db_collection.deferred_composite_sheets} of run {run}."
+        )
+
+    def reload_spreadsheet(
+        self,
+        formatted_sheets_data: List[FormattedSheetData],
+        max_attempts: int = TRANSACTION_MAX_ATTEMPTS,
+    ) -> List[SheetLoadResult]:
+        """
+        Reload the sheets of a spreadsheet in one transaction.
+        The documents of the sheets are upserted with a new generation, and the documents of
+        the spreadsheet from older generations are pruned, so the spreadsheet's documents in every
+        collection are replaced at once, or not at all.
+        Reloading the spreadsheet's variables sets their type back to standard, so the variables
+        that composite variable rows of other spreadsheets refer to are set back to composite in the
+        transaction. The reload is refused, with UnableToReloadSpreadsheet, if it would delete
+        such a variable: the other spreadsheet must be reloaded too, with a full load.
+        A transaction that fails with a transient error, e.g. a write conflict with the
+        reload of another spreadsheet, is tried again, up to max_attempts times.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted data of every sheet of the spreadsheet.
+        max_attempts: int = TRANSACTION_MAX_ATTEMPTS
+            The number of times to try the transaction.
+
+        Returns
+        -------
+        results: List[SheetLoadResult]
+            The result of loading each sheet.
+        """
+        if not formatted_sheets_data:
+            return []
+        spreadsheet_ids = list(
+            {
+                formatted_sheet_data.spreadsheet_id
+                for formatted_sheet_data in formatted_sheets_data
+            }
+        )
+        generation_fields = self._generation_fields
+        for attempt in range(1, max_attempts + 1):
+            with self._client.start_session() as session:
+                self._session = session
+                # Start over, without the references or requests of an aborted attempt
+                self._variable_references = {}
+                self._write_buffer = BulkWriteBuffer(
+                    self._bulk_write_batch_size, self._metrics
+                )
+                generation = create_generation()
+                self._generation_fields = {DocumentField.generation: generation}
+                try:
+                    session.start_transaction()
+                    results = self._reload_sheets(formatted_sheets_data)
+                    self._restore_referred_composite_variables(
+                        spreadsheet_ids, generation
+                    )
+                    self.prune_generations(generation, spreadsheet_ids)
+                    self._commit_transaction(session)
+                    log.info(
+                        f"Reloaded {len(formatted_sheets_data)} sheets "
+                        f"of spreadsheets {', '.join(spreadsheet_ids)} in attempt {attempt}."
+                    )
+                    return results
+                except PyMongoError as error:
+                    if (
+                        not error.has_error_label("TransientTransactionError")
+                        or attempt == max_attempts
+                    ):
+                        raise
+                    log.warning(
+                        f"Retrying the reload of spreadsheets {', '.join(spreadsheet_ids)} "
+                        f"after a transient error: {error}"
+                    )
+                finally:
+                    self._session = None
+                    self._generation_fields = generation_fields
+
+    def _reload_sheets(
+        self, formatted_sheets_data: List[FormattedSheetData]
+    ) -> List[SheetLoadResult]:
+        """
+        Load the institution sheets, then the composite variable sheets that refer to them,
+        and raise the first error so that the transaction is aborted.
+
+        Parameters
+        ----------
+        formatted_sheets_data: List[FormattedSheetData]
+            The formatted sheets data.
+
+        Returns
+        -------
+        results: List[SheetLoadResult]
+            The result of loading each sheet.
+        """
+        institution_sheets_data = [
+            formatted_sheet_data
+            for formatted_sheet_data in formatted_sheets_data
+            if formatted_sheet_data.meta_data.get(MetaDataField.format)
+            in INSTITUTION_FORMATS
+        ]
+        composite_sheets_data = [
+            formatted_sheet_data
+            for formatted_sheet_data in formatted_sheets_data
+            if formatted_sheet_data not in institution_sheets_data
+        ]
+        results, errors = self._run_loaders(institution_sheets_data)
+        if not errors:
+            variable_references = self.resolve_variable_references(
+                composite_sheets_data
+            )
+            composite_results, errors = self._run_loaders(
+                composite_sheets_data, variable_references
+            )
+            results += composite_results
+        if errors:
+            raise errors[0]
+        return results
+
+    def _restore_referred_composite_variables(
+        self, spreadsheet_ids: List[str], generation: str
+    ):
+        """
+        Set back to composite the variables of reloaded spreadsheets that composite variable rows
+        of other spreadsheets refer to, and raise if one of them wasn't reloaded, so that the
+        transaction is aborted instead of pruning the variable.
+
+        Parameters
+        ----------
+        spreadsheet_ids: List[str]
+            The ids of the reloaded spreadsheets.
+        generation: str
+            The generation of the reload.
+        """
+        variable_generations = {
+            variable_doc.get(VariableField._id): variable_doc.get(
+                DocumentField.generation
+            )
+            for variable_doc in self._call(
+                db_collection.variables,
+                "find",
+                {DocumentField.spreadsheet_id: {"$in": spreadsheet_ids}},
+                [DocumentField.generation],
+            )
+        }
+        update_variables_requests = []
+        for collection, variable_field in COMPOSITE_VARIABLE_FIELDS.items():
+            referred_variable_ids = set()
+            for row_doc in self._call(
+                collection,
+                "find",
+                {
+                    DocumentField.spreadsheet_id: {"$nin": spreadsheet_ids},
+                    variable_field: {"$in": list(variable_generations.keys())},
+                },
+                [variable_field],
+            ):
+                variable_ids = row_doc.get(variable_field)
+                referred_variable_ids.update(
+                    variable_ids if isinstance(variable_ids, list) else [variable_ids]
+                )
+            referred_variable_ids &= variable_generations.keys()
+            if not referred_variable_ids:
+                continue
+            removed_variable_ids = [
+                variable_id
+                for variable_id in referred_variable_ids
+                if variable_generations.get(variable_id) != generation
+            ]
+            if removed_variable_ids:
+                raise UnableToReloadSpreadsheet(
+                    ErrorInfo(
+                        {
+                            DocumentField.spreadsheet_id: ", ".join(spreadsheet_ids),
+                            DatabaseField.collection: collection,
+                            db_collection.variables: len(removed_variable_ids),
+                        }
+                    )
+                )
+            update_variables_requests.append(
+                UpdateMany(
+                    {VariableField._id: {"$in": list(referred_variable_ids)}},
+                    {
+                        "$set": {
+                            VariableField.type: VariableType.composite,
+                            VariableField.hyperlink: collection,
+                        }
+                    },
+                )
+            )
+        if update_variables_requests:
+            update_variables_result = self._call(
+                db_collection.variables,
+                "bulk_write",
+                update_variables_requests,
+                ordered=False,
+            )
+            log.info(
+                f"Update {update_variables_result.modified_count} variables "
+                f"referred to by composite variable rows of other spreadsheets"
+            )
+
+    def _commit_transaction(self, session: ClientSession):
+        """
+        Commit the transaction of a session, trying again while its result is unknown.
+
+        Parameters
+        ----------
+        session: ClientSession
+            The session of the transaction.
+        """
+        for attempt in range(1, TRANSACTION_MAX_ATTEMPTS + 1):
+            try:
+                session.commit_transaction()
+                return
+            except PyMongoError as error:
+                if (
+                    not error.has_error_label("UnknownTransactionCommitResult")
+                    or attempt == TRANSACTION_MAX_ATTEMPTS
+                ):
+                    raise
 
     def delete_many(self, collection: str, doc_ids: List[ObjectId]):
         """
@@ -432,7 +2323,7 @@ class MongoDBDatabase:
             The list of document ids to delete.
         """
         delete_request = DeleteMany({"_id": {"$in": doc_ids}})
-        delete_many_results = self._db.get_collection(collection).bulk_write(
+        delete_many_results = self._get_collection(collection).bulk_write(
             [delete_request]
         )
 
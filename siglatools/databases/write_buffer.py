@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo.client_session import ClientSession
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+from ..utils.exceptions import ErrorInfo
+from .exceptions import WriteBufferClosed
+from .metrics import LoadMetrics, get_request_size
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(levelname)4s: %(module)s:%(lineno)4s %(asctime)s] %(message)s",
+)
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+BULK_WRITE_BATCH_SIZE = 1000
+
+
+class SheetLoadResult(NamedTuple):
+    """
+    The result of loading a sheet into the database.
+
+    Attributes:
+        spreadsheet_id: str
+            The spreadsheet id of the sheet.
+        sheet_id: str
+            The sheet id.
+        sheet_title: str
+            The title of the sheet.
+        request_count: int
+            The number of write requests sent for the sheet.
+        upserted_count: int
+            The number of documents inserted for the sheet.
+        error: Optional[str] = None
+            Why the sheet failed to load. None if the sheet was loaded.
+    """
+
+    spreadsheet_id: str
+    sheet_id: str
+    sheet_title: str
+    request_count: int
+    upserted_count: int
+    error: Optional[str] = None
+
+
+class PendingWrite:
+    """
+    Write requests added to a BulkWriteBuffer, and their results once flushed.
+
+    Attributes:
+        requests: List
+            The pymongo write requests.
+        sheet_key: Hashable
+            The key of the sheet the requests are written for.
+        upserted_ids: Dict[int, ObjectId]
+            The ids of the upserted documents, by the index of their request.
+        write_errors: List[str]
+            The error messages of the requests that failed.
+        flushed: bool
+            Whether the requests were sent to the database.
+    """
+
+    def __init__(self, requests: List, sheet_key: Hashable = None):
+        self.requests = requests
+        self.sheet_key = sheet_key
+        self.upserted_ids: Dict[int, ObjectId] = {}
+        self.write_errors: List[str] = []
+        self.flushed = False
+
+
+class BulkWriteBuffer:
+    """
+    Accumulate write requests per collection, from any number of sheets, and send them
+    as unordered bulk writes of at most batch_size requests when flushed.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = BULK_WRITE_BATCH_SIZE,
+        metrics: Optional[LoadMetrics] = None,
+    ):
+        self._batch_size = batch_size
+        self._metrics = metrics
+        self._collections: Dict[str, Collection] = {}
+        self._pending_writes: Dict[str, List[PendingWrite]] = {}
+        self._sheet_writes: Dict[Hashable, List[PendingWrite]] = {}
+        self._closed = False
+
+    def add(
+        self, collection: Collection, requests: List, sheet_key: Hashable
+    ) -> PendingWrite:
+        """
+        Add write requests to the buffer.
+
+        Parameters
+        ----------
+        collection: Collection
+            The collection to write to.
+        requests: List
+            The pymongo write requests.
+        sheet_key: Hashable
+            The key of the sheet the requests are written for.
+
+        Returns
+        -------
+        pending_write: PendingWrite
+            The requests, with their results filled in once flushed.
+        """
+        if self._closed:
+            raise WriteBufferClosed(
+                ErrorInfo({"collection": collection.name, "requests": len(requests)})
+            )
+        pending_write = PendingWrite(requests, sheet_key)
+        self._collections[collection.full_name] = collection
+        self._pending_writes.setdefault(collection.full_name, []).append(pending_write)
+        self._sheet_writes.setdefault(sheet_key, []).append(pending_write)
+        return pending_write
+
+    def take_batches(self) -> List[Tuple[Collection, List[Tuple[PendingWrite, int]]]]:
+        """
+        Take the buffered requests out of the buffer, split into batches.
+        Each batch is the requests of a collection, at most batch_size of them, as
+        (pending write, request index) pairs.
+
+        Returns
+        -------
+        batches: List[Tuple[Collection, List[Tuple[PendingWrite, int]]]]
+            The collection and the requests of each batch.
+        """
+        batches = []
+        for full_name, pending_writes in self._pending_writes.items():
+            collection = self._collections.get(full_name)
+            requests = [
+                (pending_write, i)
+                for pending_write in pending_writes
+                for i in range(len(pending_write.requests))
+            ]
+            for start in range(0, len(requests), self._batch_size):
+                batches.append((collection, requests[start : start + self._batch_size]))
+            for pending_write in pending_writes:
+                pending_write.flushed = True
+            log.info(
+                f"Writing {len(requests)} requests to {collection.name} "
+                f"in {-(-len(requests) // self._batch_size)} bulk writes."
+            )
+        self._pending_writes = {}
+        return batches
+
+    @staticmethod
+    def record_batch_result(
+        batch: List[Tuple[PendingWrite, int]], bulk_api_result: Dict[str, Any]
+    ):
+        """
+        Map the upserted ids and write errors of a bulk write back to its pending writes.
+
+        Parameters
+        ----------
+        batch: List[Tuple[PendingWrite, int]]
+            The requests of the bulk write.
+        bulk_api_result: Dict[str, Any]
+            The raw result of the bulk write, or the details of its BulkWriteError.
+        """
+        for upserted_doc in bulk_api_result.get("upserted", []):
+            pending_write, i = batch[upserted_doc.get("index")]
+            pending_write.upserted_ids[i] = upserted_doc.get("_id")
+        for write_error in bulk_api_result.get("writeErrors", []):
+            pending_write, i = batch[write_error.get("index")]
+            pending_write.write_errors.append(write_error.get("errmsg"))
+
+    def flush(self, session: Optional[ClientSession] = None):
+        """
+        Send the buffered requests to the database, as unordered bulk writes of
+        at most batch_size requests.
+
+        Parameters
+        ----------
+        session: Optional[ClientSession] = None
+            The session of the transaction to write in, if any.
+        """
+        for collection, batch in self.take_batches():
+            start = time.perf_counter()
+            try:
+                result = collection.bulk_write(
+                    [pending_write.requests[i] for pending_write, i in batch],
+                    ordered=False,
+                    session=session,
+                )
+                bulk_api_result = result.bulk_api_result
+            except BulkWriteError as error:
+                if error.details.get("writeConcernErrors"):
+                    raise
+                bulk_api_result = error.details
+            self.record_batch_metrics(
+                collection.name, batch, bulk_api_result, time.perf_counter() - start
+            )
+            self.record_batch_result(batch, bulk_api_result)
+
+    def record_batch_metrics(
+        self,
+        collection: str,
+        batch: List[Tuple[PendingWrite, int]],
+        bulk_api_result: Dict[str, Any],
+        latency: float,
+    ):
+        """
+        Record the round trip of a bulk write in the metrics, if the buffer has any.
+        Each sheet of the batch is recorded with the size of its requests and its upserted documents.
+
+        Parameters
+        ----------
+        collection: str
+            The name of the collection written to.
+        batch: List[Tuple[PendingWrite, int]]
+            The requests of the bulk write.
+        bulk_api_result: Dict[str, Any]
+            The raw result of the bulk write, or the details of its BulkWriteError.
+        latency: float
+            The duration of the bulk write, in seconds.
+        """
+        if self._metrics is None:
+            return
+        sheet_counts = {}
+        upserted_indexes = {
+            upserted_doc.get("index")
+            for upserted_doc in bulk_api_result.get("upserted", [])
+        }
+        for index, (pending_write, i) in enumerate(batch):
+            counts = sheet_counts.setdefault(
+                pending_write.sheet_key,
+                {"requests": 0, "upserted": 0, "bytes_sent": 0},
+            )
+            counts["requests"] += 1
+            counts["upserted"] += int(index in upserted_indexes)
+            counts["bytes_sent"] += get_request_size(pending_write.requests[i])
+        self._metrics.record(
+            collection,
+            "bulk_write",
+            latency,
+            {
+                "requests": len(batch),
+                "matched": bulk_api_result.get("nMatched", 0),
+                "modified": bulk_api_result.get("nModified", 0),
+                "upserted": bulk_api_result.get("nUpserted", 0),
+                "deleted": bulk_api_result.get("nRemoved", 0),
+                "bytes_sent": sum(
+                    counts["bytes_sent"] for counts in sheet_counts.values()
+                ),
+            },
+            sheet_counts,
+        )
+
+    def pop_sheet_counts(self, sheet_key: Hashable) -> Tuple[int, int]:
+        """
+        Get the number of requests flushed, and of documents upserted, for a sheet,
+        and stop tracking the sheet.
+
+        Parameters
+        ----------
+        sheet_key: Hashable
+            The key of the sheet.
+
+        Returns
+        -------
+        counts: Tuple[int, int]
+            The request count and the upserted count.
+        """
+        flushed_writes = [
+            pending_write
+            for pending_write in self._sheet_writes.pop(sheet_key, [])
+            if pending_write.flushed
+        ]
+        return (
+            sum(len(pending_write.requests) for pending_write in flushed_writes),
+            sum(len(pending_write.upserted_ids) for pending_write in flushed_writes),
+        )
+
+    def close(self):
+        """
+        Flush the buffered requests and stop accepting new ones.
+        """
+        if not self._closed:
+            self.flush()
+            self._closed = True
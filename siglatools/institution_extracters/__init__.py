@@ -1,6 +1,20 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from .google_sheets_institution_extracter import (  # noqa: F401
-    GoogleSheetsInstitutionExtracter,
-)
+import importlib
+
+# The names exported by the package, by the module that defines them. The modules are imported
+# on first access (PEP 562), so that importing the constants of the package doesn't import the Google API client.
+_LAZY_EXPORTS = {
+    "GoogleSheetsInstitutionExtracter": ".google_sheets_institution_extracter"
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
@@ -23,6 +23,7 @@ from .constants import GoogleSheetsInfoField, MetaDataField
 from .utils import (
     FormattedSheetData,
     SheetData,
+    convert_name_to_col,
     create_institution_sub_category,
 )
 
@@ -292,7 +293,21 @@ class GoogleSheetsInstitutionExtracter:
         gs_format.multiple_sigla_answer_variable: _get_multilple_sigla_answer_variable,
     }
 
-    def __init__(self, credentials_path: str):
+    def __init__(
+        self, credentials_path: Optional[str] = None, spreadsheets: Optional[Any] = None
+    ):
+        # Store the spreadsheets service, unless given one, e.g. synthetic spreadsheets for tests and benchmarks
+        self._credentials_path = credentials_path
+        self.spreadsheets = (
+            spreadsheets
+            if spreadsheets is not None
+            else self._create_spreadsheets(credentials_path)
+        )
+
+    def _create_spreadsheets(self, credentials_path: str) -> Any:
+        """
+        Create the spreadsheets resource of the Google Sheets API.
+        """
         credentials_path = Path(credentials_path).resolve(strict=True)
         self._credentials_path = str(credentials_path)
         # Creates a Credentials instance from a service account json file.
@@ -309,8 +324,7 @@ class GoogleSheetsInstitutionExtracter:
             cache_discovery=False,
             num_retries=3,
         )
-        # Store the spreadsheets service
-        self.spreadsheets = service.spreadsheets()
+        return service.spreadsheets()
 
     def _get_spreadsheet(self, spreadsheet_id: str) -> Any:
         """
@@ -483,6 +497,8 @@ class GoogleSheetsInstitutionExtracter:
         spreadsheet_data: List[SheetData]
             The spreadsheet data. Please the SheetData class to view its attributes.
         """
+        # Refer to the spreadsheet by its id until its title is read
+        spreadsheet_title = spreadsheet_id
         try:
             spreadsheet = self._get_spreadsheet(spreadsheet_id=spreadsheet_id)
             # Get an A1Notation for each sheet's meta data
@@ -548,6 +564,52 @@ class GoogleSheetsInstitutionExtracter:
             for i, a1_notation in enumerate(meta_data_a1_notations)
         ]
 
+    def get_spreadsheet_size(self, spreadsheet_id: str) -> int:
+        """
+        Estimate the size of a spreadsheet from the meta data of its sheets, without reading their data.
+
+        Parameters
+        ----------
+        spreadsheet_id: str
+            The id of the spreadsheet.
+
+        Returns
+        -------
+        size: int
+            The number of cells within the bounding boxes of the data of the sheets.
+        """
+        try:
+            spreadsheet = self._get_spreadsheet(spreadsheet_id=spreadsheet_id)
+            meta_data_a1_notations = self._get_meta_data_a1_notations(
+                spreadsheet=spreadsheet
+            )
+            meta_data = self._get_meta_data(
+                spreadsheet_id=spreadsheet_id,
+                a1_notations=meta_data_a1_notations,
+            )
+        except HttpError as http_error:
+            raise exceptions.UnableToAccessSpreadsheet(
+                ErrorInfo(
+                    {
+                        GoogleSheetsInfoField.spreadsheet_title: spreadsheet_id,
+                        "reason": f"{http_error}",
+                    }
+                )
+            )
+        bounding_box_a1_notations = self._get_data_a1_notations(
+            a1_notations=meta_data_a1_notations,
+            meta_data=meta_data,
+        )
+        return sum(
+            (a1_notation.end_row - a1_notation.start_row + 1)
+            * (
+                convert_name_to_col(a1_notation.end_column)
+                - convert_name_to_col(a1_notation.start_column)
+                + 1
+            )
+            for a1_notation in bounding_box_a1_notations
+        )
+
     def get_spreadsheet_ids(self, master_spreadsheet_id: str) -> List[str]:
         """
         Get the list of spreadsheet ids from a master spreadsheet.
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from ..databases.constants import DatabaseCollection as db_collection
+from ..databases.constants import InstitutionField
+from .constants import GoogleSheetsFormat as gs_format
+from .constants import MetaDataField
+from .utils import convert_col_to_name, convert_name_to_col
+
+###############################################################################
+
+# The id of the master spreadsheet of a synthetic corpus
+MASTER_SPREADSHEET_ID = "synthetic-master"
+# The formats of the sheets of a synthetic spreadsheet, in turn. The first sheet holds the institutions
+# the composite variable sheets refer to.
+SHEET_FORMATS = [
+    gs_format.standard_institution,
+    gs_format.multiple_sigla_answer_variable,
+    gs_format.institution_and_composite_variable,
+    gs_format.composite_variable,
+]
+# The collections of the composite variable sheets, in turn
+COMPOSITE_DATA_TYPES = [
+    db_collection.amendments,
+    db_collection.body_of_law,
+    db_collection.rights,
+]
+# The first row of the data of a sheet, below its two rows of meta data
+DATA_START_ROW = 3
+FIRST_NEXT_UV_DATE = date(2030, 1, 1)
+
+A1_RANGE_PATTERN = re.compile(
+    r"^'(?P<title>.*)'!(?P<c1>[A-Z]*)(?P<r1>\d+):(?P<c2>[A-Z]*)(?P<r2>\d+)$"
+)
+
+###############################################################################
+
+
+class CorpusScale(NamedTuple):
+    """
+    The scale of a synthetic corpus of spreadsheets.
+
+    Attributes:
+        spreadsheets: int = 10
+            The number of spreadsheets listed in the master spreadsheet.
+        sheets: int = 4
+            The number of sheets of each spreadsheet. Their formats follow SHEET_FORMATS in turn.
+        rows: int = 20
+            The number of rows of data of each sheet, i.e. the variables of an institution sheet,
+            or the rows of a composite variable sheet.
+        institutions: int = 5
+            The number of institutions of each standard institution sheet.
+    """
+
+    spreadsheets: int = 10
+    sheets: int = 4
+    rows: int = 20
+    institutions: int = 5
+
+
+def _create_sheet(
+    meta_data: Dict[str, str],
+    data: List[List[str]],
+    next_uv_dates: Optional[List[str]] = None,
+) -> List[List[str]]:
+    """
+    Lay out a sheet: the meta data keys and values in the first two rows, then the data,
+    and the next uv dates in the column after the data.
+    """
+    width = max(len(row) for row in data)
+    meta_data = {
+        **meta_data,
+        MetaDataField.start_row: str(DATA_START_ROW),
+        MetaDataField.end_row: str(DATA_START_ROW + len(data) - 1),
+        MetaDataField.start_column: convert_col_to_name(0),
+        MetaDataField.end_column: convert_col_to_name(width - 1),
+    }
+    if next_uv_dates is not None:
+        meta_data[MetaDataField.date_of_next_uv_column] = convert_col_to_name(width)
+        data = [
+            row + [""] * (width - len(row)) + [next_uv_date]
+            for row, next_uv_date in zip(data, next_uv_dates)
+        ]
+    return [list(meta_data.keys()), list(meta_data.values()), *data]
+
+
+def _create_institution_names(
+    spreadsheet_index: int, sheet_index: int, scale: CorpusScale
+) -> List[str]:
+    """Create the names of the institutions of a standard institution sheet."""
+    return [
+        f"Institution {spreadsheet_index}.{sheet_index}.{i}"
+        for i in range(scale.institutions)
+    ]
+
+
+def _create_composite_meta_data(
+    spreadsheet_index: int, sheet_index: int, scale: CorpusScale, data_type: str
+) -> Dict[str, str]:
+    """
+    Create the meta data of a composite variable sheet, which refers to a variable of the institutions
+    of the first sheet of the spreadsheet.
+    """
+    institution_names = _create_institution_names(spreadsheet_index, 0, scale)
+    # A body of law refers to the variables of several institutions
+    names = (
+        institution_names[:2]
+        if data_type == db_collection.body_of_law
+        else institution_names[:1]
+    )
+    return {
+        MetaDataField.data_type: data_type,
+        InstitutionField.name: "; ".join(names),
+        InstitutionField.country: f"Country {spreadsheet_index}",
+        InstitutionField.category: "Category",
+        MetaDataField.variable_heading: f"Heading {sheet_index % scale.rows}",
+        MetaDataField.variable_name: f"Variable {sheet_index % scale.rows}",
+    }
+
+
+def generate_sheet(
+    spreadsheet_index: int, sheet_index: int, scale: CorpusScale
+) -> List[List[str]]:
+    """
+    Generate the cells of a sheet of a synthetic spreadsheet.
+
+    Parameters
+    ----------
+    spreadsheet_index: int
+        The index of the spreadsheet in the master spreadsheet.
+    sheet_index: int
+        The index of the sheet in the spreadsheet, which picks its format from SHEET_FORMATS.
+    scale: CorpusScale
+        The scale of the corpus.
+
+    Returns
+    -------
+    rows: List[List[str]]
+        The rows of cells of the sheet, starting with its two rows of meta data.
+    """
+    sheet_format = SHEET_FORMATS[sheet_index % len(SHEET_FORMATS)]
+    if sheet_format == gs_format.standard_institution:
+        institution_names = _create_institution_names(
+            spreadsheet_index, sheet_index, scale
+        )
+        # The name of each institution heads its three columns of answers
+        data = [
+            ["", ""] + [cell for name in institution_names for cell in [name, "", ""]],
+            ["Heading", "Variable"]
+            + ["Answer", "Original Text", "Source"] * len(institution_names),
+        ] + [
+            [f"Heading {j}", f"Variable {j}"]
+            + [
+                cell
+                for i in range(len(institution_names))
+                for cell in [
+                    f"Answer {(i + j) % 3}",
+                    f"Original text {i}.{j}",
+                    f"https://example.org/{spreadsheet_index}/{sheet_index}/{i}/{j}",
+                ]
+            ]
+            for j in range(scale.rows)
+        ]
+        meta_data = {
+            MetaDataField.format: sheet_format,
+            InstitutionField.country: f"Country {spreadsheet_index}",
+            InstitutionField.category: "Category",
+        }
+        next_uv_dates = [""] * 2 + [
+            (FIRST_NEXT_UV_DATE + timedelta(days=j)).isoformat()
+            for j in range(scale.rows)
+        ]
+        return _create_sheet(meta_data, data, next_uv_dates)
+    if sheet_format == gs_format.multiple_sigla_answer_variable:
+        data = [["Heading", "Variable", "Answer", "Original Text", "Source"]] + [
+            [
+                f"Heading {j}",
+                f"Variable {j}",
+                f"Answer {j % 3}",
+                f"Original text {j}",
+                f"https://example.org/{spreadsheet_index}/{sheet_index}/{j}",
+            ]
+            for j in range(scale.rows)
+        ]
+        meta_data = {
+            MetaDataField.format: sheet_format,
+            InstitutionField.name: f"Institution {spreadsheet_index}.{sheet_index}",
+            InstitutionField.country: f"Country {spreadsheet_index}",
+            InstitutionField.category: "Category",
+        }
+        return _create_sheet(meta_data, data)
+    # The composite variable sheets
+    data_type = (
+        db_collection.rights
+        if sheet_format == gs_format.institution_and_composite_variable
+        else COMPOSITE_DATA_TYPES[
+            (sheet_index // len(SHEET_FORMATS)) % len(COMPOSITE_DATA_TYPES)
+        ]
+    )
+    data = [["Category", "Text", "Article", "Source"]] + [
+        [
+            f"Category {j % 3}",
+            f"Text {j}",
+            f"Article {j}",
+            f"https://example.org/{spreadsheet_index}/{sheet_index}/{j}",
+        ]
+        for j in range(scale.rows)
+    ]
+    meta_data = {
+        MetaDataField.format: sheet_format,
+        **_create_composite_meta_data(spreadsheet_index, sheet_index, scale, data_type),
+    }
+    return _create_sheet(meta_data, data)
+
+
+def get_spreadsheet_ids(scale: CorpusScale) -> List[str]:
+    """
+    Get the ids of the spreadsheets of a synthetic corpus, as listed in its master spreadsheet.
+
+    Parameters
+    ----------
+    scale: CorpusScale
+        The scale of the corpus.
+
+    Returns
+    -------
+    spreadsheet_ids: List[str]
+        The spreadsheet ids.
+    """
+    return [f"synthetic-{i:05d}" for i in range(scale.spreadsheets)]
+
+
+@lru_cache(maxsize=64)
+def generate_spreadsheet(
+    spreadsheet_id: str, scale: CorpusScale
+) -> Optional[Tuple[str, List[List[List[str]]]]]:
+    """
+    Generate a spreadsheet of a synthetic corpus, or its master spreadsheet.
+    The spreadsheets are generated from their ids and the scale of the corpus,
+    so every process serves the same corpus.
+
+    Parameters
+    ----------
+    spreadsheet_id: str
+        The id of the spreadsheet.
+    scale: CorpusScale
+        The scale of the corpus.
+
+    Returns
+    -------
+    spreadsheet: Optional[Tuple[str, List[List[List[str]]]]]
+        The title of the spreadsheet and the cells of its sheets, or None if the corpus has no such spreadsheet.
+    """
+    if spreadsheet_id == MASTER_SPREADSHEET_ID:
+        master_sheet = _create_sheet(
+            {MetaDataField.format: "master"},
+            [[spreadsheet_id] for spreadsheet_id in get_spreadsheet_ids(scale)],
+        )
+        return "Synthetic master spreadsheet", [master_sheet]
+    spreadsheet_ids = get_spreadsheet_ids(scale)
+    if spreadsheet_id not in spreadsheet_ids:
+        return None
+    spreadsheet_index = spreadsheet_ids.index(spreadsheet_id)
+    return (
+        f"Synthetic spreadsheet {spreadsheet_index}",
+        [
+            generate_sheet(spreadsheet_index, sheet_index, scale)
+            for sheet_index in range(scale.sheets)
+        ],
+    )
+
+
+def get_corpus_size(scale: CorpusScale) -> Dict[str, int]:
+    """
+    Get the size of a synthetic corpus.
+
+    Parameters
+    ----------
+    scale: CorpusScale
+        The scale of the corpus.
+
+    Returns
+    -------
+    size: Dict[str, int]
+        The number of spreadsheets, sheets, and cells of data, meta data excluded.
+    """
+    sheets = [
+        sheet
+        for spreadsheet_id in get_spreadsheet_ids(scale)
+        for sheet in generate_spreadsheet(spreadsheet_id, scale)[1]
+    ]
+    return {
+        "spreadsheets": scale.spreadsheets,
+        "sheets": len(sheets),
+        "cells": sum(
+            len(row) for sheet in sheets for row in sheet[DATA_START_ROW - 1 :]
+        ),
+    }
+
+
+def _trim(values: List[List[str]]) -> List[List[str]]:
+    """Drop the trailing empty cells of each row and the trailing empty rows, as the Sheets API does."""
+    trimmed = []
+    for row in values:
+        row = list(row)
+        while row and row[-1] == "":
+            row = row[:-1]
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+class _Request(NamedTuple):
+    """A request to the synthetic spreadsheets, executed like a request of the Google API client."""
+
+    response: Dict[str, Any]
+
+    def execute(self, **kwargs) -> Dict[str, Any]:
+        return self.response
+
+
+class SyntheticSpreadsheets:
+    """
+    An offline stand-in for the spreadsheets resource of the Google Sheets API, for tests and benchmarks,
+    given to GoogleSheetsInstitutionExtracter in place of the API's resource. It serves the spreadsheets
+    of a synthetic corpus, generated at the given scale. Its master spreadsheet is MASTER_SPREADSHEET_ID.
+
+    Parameters
+    ----------
+    scale: CorpusScale
+        The scale of the corpus.
+    """
+
+    def __init__(self, scale: CorpusScale):
+        self.scale = scale
+
+    def _get_spreadsheet(
+        self, spreadsheet_id: str
+    ) -> Tuple[str, List[List[List[str]]]]:
+        """Get the title and the sheets of a spreadsheet, or raise an HttpError like the API if it doesn't exist."""
+        spreadsheet = generate_spreadsheet(spreadsheet_id, self.scale)
+        if spreadsheet is None:
+            # Imported here, so that the scripts can read the scale of a corpus without importing the API client
+            import httplib2
+            from googleapiclient.errors import HttpError
+
+            raise HttpError(
+                httplib2.Response({"status": 404}),
+                f"Requested entity was not found: {spreadsheet_id}".encode(),
+            )
+        return spreadsheet
+
+    def get(self, spreadsheetId: str, **kwargs) -> _Request:
+        title, sheets = self._get_spreadsheet(spreadsheetId)
+        return _Request(
+            {
+                "spreadsheetId": spreadsheetId,
+                "properties": {"title": title},
+                "sheets": [
+                    {"properties": {"sheetId": i, "title": f"Sheet {i}"}}
+                    for i in range(len(sheets))
+                ],
+            }
+        )
+
+    def values(self) -> "SyntheticSpreadsheets":
+        return self
+
+    def batchGet(
+        self,
+        spreadsheetId: str,
+        ranges: List[str],
+        majorDimension: str = "ROWS",
+        **kwargs,
+    ) -> _Request:
+        _, sheets = self._get_spreadsheet(spreadsheetId)
+        value_ranges = []
+        for a1_range in ranges:
+            match = A1_RANGE_PATTERN.match(a1_range)
+            sheet = sheets[int(match.group("title").split(" ")[-1])]
+            rows = sheet[int(match.group("r1")) - 1 : int(match.group("r2"))]
+            if match.group("c1"):
+                start_column = convert_name_to_col(match.group("c1"))
+                end_column = convert_name_to_col(match.group("c2"))
+                rows = [row[start_column : end_column + 1] for row in rows]
+            if majorDimension == "COLUMNS":
+                width = max([len(row) for row in rows], default=0)
+                rows = [
+                    [row[i] if i < len(row) else "" for row in rows]
+                    for i in range(width)
+                ]
+            value_range = {"range": a1_range, "majorDimension": majorDimension}
+            values = _trim(rows)
+            if values:
+                value_range["values"] = values
+            value_ranges.append(value_range)
+        return _Request({"spreadsheetId": spreadsheetId, "valueRanges": value_ranges})
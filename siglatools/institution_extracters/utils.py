@@ -120,6 +120,27 @@ def convert_col_to_name(col: int) -> str:
     return col_str
 
 
+def convert_name_to_col(col_str: str) -> int:
+    """
+    Convert a column style string to a zero indexed column cell reference.
+
+    Parameters
+    ----------
+    col_str: str
+        The column style string, e.g. A or AB.
+    Returns
+    -------
+    col: int
+        The cell column.
+    """
+    col_num = 0
+    for col_letter in col_str:
+        # Accumulate the column letters, left to right, in 1-index.
+        col_num = col_num * 26 + ord(col_letter) - ord("A") + 1
+
+    return col_num - 1  # Change to 0-index.
+
+
 def create_institution_sub_category(sub_categories: str) -> List[str]:
     """
     Create a list of institution sub categories.
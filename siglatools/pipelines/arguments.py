@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The arguments shared by the scripts. This module doesn't import Prefect, Dask or the database
+and Google API clients, so that a script parses its arguments, and fails on bad ones, right away.
+"""
+
+import argparse
+from typing import Dict, Optional
+
+from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+from .constants import DEFAULT_RESOURCE_LIMITS, RUN_REPORT_PATH, ExecutorType
+
+###############################################################################
+
+
+def add_executor_arguments(p: argparse.ArgumentParser):
+    """
+    Add the arguments of create_executor to the parser of a script.
+
+    Parameters
+    ----------
+    p: argparse.ArgumentParser
+        The parser of the script.
+    """
+    p.add_argument(
+        "-ex",
+        "--executor",
+        action="store",
+        dest="executor",
+        type=str,
+        choices=[
+            ExecutorType.local_cluster,
+            ExecutorType.threads,
+            ExecutorType.scheduler,
+        ],
+        default=ExecutorType.local_cluster,
+        help="Where to run the tasks: a new local Dask cluster, threads, or a running Dask scheduler",
+    )
+    p.add_argument(
+        "-sa",
+        "--scheduler_address",
+        action="store",
+        dest="scheduler_address",
+        type=str,
+        help="The address of the Dask scheduler to attach to, for the scheduler executor",
+    )
+    p.add_argument(
+        "-nw",
+        "--n_workers",
+        action="store",
+        dest="n_workers",
+        type=int,
+        help="The number of worker processes of the local cluster",
+    )
+    p.add_argument(
+        "-nt",
+        "--n_threads",
+        action="store",
+        dest="n_threads",
+        type=int,
+        help="The number of threads of each local cluster worker, or of the threaded executor",
+    )
+
+
+def add_run_report_argument(p: argparse.ArgumentParser):
+    """
+    Add the run report options, shared by the scripts, to an argument parser.
+
+    Parameters
+    ----------
+    p: argparse.ArgumentParser
+        The argument parser.
+    """
+    p.add_argument(
+        "-rr",
+        "--run_report",
+        action="store",
+        dest="run_report",
+        type=str,
+        default=RUN_REPORT_PATH,
+        help="The path of the JSON report of the flow's task runs",
+    )
+    p.add_argument(
+        "-mrb",
+        "--measure_result_bytes",
+        action="store_true",
+        dest="measure_result_bytes",
+        help="Measure the size of the results of the task runs in the run report, by pickling each result",
+    )
+
+
+def parse_resource_limits(resource_limits_str: Optional[str]) -> Dict[str, int]:
+    """
+    Parse resource limits, e.g. `sheets=8,mongo=16,http=64`, over the default limits.
+
+    Parameters
+    ----------
+    resource_limits_str: Optional[str]
+        The limits of the resources to change. A limit of 0 lifts the limit of a resource.
+
+    Returns
+    -------
+    resource_limits: Dict[str, int]
+        The limit of each resource.
+    """
+    resource_limits = dict(DEFAULT_RESOURCE_LIMITS)
+    for resource_limit in (resource_limits_str or "").split(","):
+        if not resource_limit.strip():
+            continue
+        resource, _, limit = resource_limit.partition("=")
+        resource = resource.strip()
+        if resource not in DEFAULT_RESOURCE_LIMITS or not limit.strip().isdigit():
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {
+                        "reason": "Incorrect resource limit specification. Use e.g. sheets=8,mongo=16,http=64.",
+                        "resource_limit": resource_limit,
+                    }
+                )
+            )
+        resource_limits[resource] = int(limit)
+    return resource_limits
+
+
+def add_resource_limits_argument(p: argparse.ArgumentParser):
+    """
+    Add the resource limits option, shared by the scripts, to an argument parser.
+
+    Parameters
+    ----------
+    p: argparse.ArgumentParser
+        The argument parser.
+    """
+    p.add_argument(
+        "-rl",
+        "--resource_limits",
+        action="store",
+        dest="resource_limits",
+        type=str,
+        help="The number of task runs that can use each resource at the same time, e.g. "
+        + ",".join(
+            f"{resource}={limit}" for resource, limit in DEFAULT_RESOURCE_LIMITS.items()
+        )
+        + " (the default). 0 lifts the limit of a resource",
+    )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from prefect.executors import Executor
+
+from siglatools import get_module_version
+
+from ..databases.constants import LoadMode
+from ..databases.memory_client import InMemoryClient
+from ..institution_extracters.synthetic_sheets import (
+    MASTER_SPREADSHEET_ID,
+    CorpusScale,
+    SyntheticSpreadsheets,
+    get_corpus_size,
+)
+from .constants import (
+    BENCHMARK_RESULTS_PATH,
+    DEFAULT_RESOURCE_LIMITS,
+    ExecutorType,
+)
+from .executors import create_executor
+from .sigla_pipeline import run_sigla_pipeline
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+RUN_REPORT_FILENAME = "run-report.json"
+LOAD_METRICS_REPORT_FILENAME = "load-metrics.json"
+
+
+def _get_stage(task_slug: str) -> str:
+    """Get the stage of a task of the flow, its name without the suffix that tells apart same-named tasks."""
+    return re.sub(r"-\d+$", "", task_slug)
+
+
+def _get_throughput(cells: int, seconds: float) -> Optional[float]:
+    """Get the cells processed per second, or None if no time was measured."""
+    return round(cells / seconds, 1) if seconds else None
+
+
+def _create_benchmark_result(
+    scale: CorpusScale,
+    options: Dict[str, Any],
+    run_report: Dict[str, Any],
+    load_metrics_report: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Create the result of a benchmark from the reports of its pipeline run.
+
+    Parameters
+    ----------
+    scale: CorpusScale
+        The scale of the synthetic corpus.
+    options: Dict[str, Any]
+        The options of the pipeline run, e.g. the load mode.
+    run_report: Dict[str, Any]
+        The report of the flow's task runs.
+    load_metrics_report: Dict[str, Any]
+        The report of the load's database operations.
+
+    Returns
+    -------
+    result: Dict[str, Any]
+        The throughput of the run, and of each stage of the flow over the time its task runs took,
+        in cells of the corpus per second.
+    """
+    corpus_size = get_corpus_size(scale)
+    stages: Dict[str, Dict[str, Any]] = {}
+    for task_summary in run_report.get("tasks"):
+        stage = stages.setdefault(
+            _get_stage(task_summary.get("task")), {"task_runs": 0, "wall_time_s": 0}
+        )
+        stage["task_runs"] += task_summary.get("task_runs")
+        stage["wall_time_s"] = round(
+            stage.get("wall_time_s") + task_summary.get("wall_time_s").get("total"), 3
+        )
+    for stage in stages.values():
+        stage["cells_per_s"] = _get_throughput(
+            corpus_size.get("cells"), stage.get("wall_time_s")
+        )
+    collections = load_metrics_report.get("collections").values()
+    return {
+        "version": get_module_version(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "scale": scale._asdict(),
+        "options": options,
+        "corpus": corpus_size,
+        "wall_time_s": run_report.get("wall_time_s"),
+        "cells_per_s": _get_throughput(
+            corpus_size.get("cells"), run_report.get("wall_time_s")
+        ),
+        "stages": dict(sorted(stages.items())),
+        "database": {
+            field: sum(
+                stats.get(field, 0)
+                for methods in collections
+                for stats in methods.values()
+            )
+            for field in ["round_trips", "requests", "bytes_sent"]
+        },
+    }
+
+
+def _compare_with_previous(result: Dict[str, Any], results: List[Dict[str, Any]]):
+    """
+    Log the throughput of a benchmark next to the one of the last stored benchmark of the same corpus and options.
+
+    Parameters
+    ----------
+    result: Dict[str, Any]
+        The result of the benchmark.
+    results: List[Dict[str, Any]]
+        The stored results of the earlier benchmarks, oldest first.
+    """
+    previous = next(
+        (
+            previous
+            for previous in reversed(results)
+            if previous.get("scale") == result.get("scale")
+            and previous.get("options") == result.get("options")
+        ),
+        None,
+    )
+    rows = [
+        ("flow", result.get("cells_per_s"), previous and previous.get("cells_per_s"))
+    ]
+    rows += [
+        (
+            stage,
+            stage_result.get("cells_per_s"),
+            previous and previous.get("stages").get(stage, {}).get("cells_per_s"),
+        )
+        for stage, stage_result in result.get("stages").items()
+    ]
+    log.info(
+        f"Benchmark of {result.get('corpus').get('cells')} cells in "
+        f"{result.get('corpus').get('sheets')} sheets, in cells per second"
+        + (f", against version {previous.get('version')}:" if previous else ":")
+    )
+    for stage, cells_per_s, previous_cells_per_s in rows:
+        change = (
+            f" ({(cells_per_s - previous_cells_per_s) / previous_cells_per_s:+.1%})"
+            if cells_per_s and previous_cells_per_s
+            else ""
+        )
+        log.info(f"{stage}: {cells_per_s}{change}")
+
+
+def run_benchmark(
+    scale: CorpusScale,
+    db_connection_url: Optional[str] = None,
+    load_mode: str = LoadMode.clean_up,
+    streaming: bool = False,
+    executor: Optional[Executor] = None,
+    results_path: str = BENCHMARK_RESULTS_PATH,
+    resource_limits: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Run the SIGLA pipeline on a synthetic corpus, served offline, and add the throughput
+    of the run and of each stage of its flow to the stored results.
+
+    Parameters
+    ----------
+    scale: CorpusScale
+        The scale of the synthetic corpus.
+    db_connection_url: Optional[str] = None
+        The DB's connection url str, e.g. of a local MongoDB. A new in-memory database if None.
+    load_mode: str = LoadMode.clean_up
+        How to replace the documents in the db. See run_sigla_pipeline.
+    streaming: bool = False
+        Whether to load each spreadsheet on its own as soon as it is extracted.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. Threads if None, which the in-memory database needs.
+    results_path: str = BENCHMARK_RESULTS_PATH
+        The path of the JSON file the result is added to, after the results of the earlier benchmarks.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+
+    Returns
+    -------
+    result: Dict[str, Any]
+        The result of the benchmark.
+    """
+    in_memory = db_connection_url is None
+    db_client = None
+    if in_memory:
+        db_connection_url = f"memory://benchmark-{uuid4().hex}/sigla"
+        db_client = InMemoryClient(db_connection_url)
+    executor = executor or create_executor(ExecutorType.threads)
+    with tempfile.TemporaryDirectory() as reports_dir:
+        run_report_path = Path(reports_dir) / RUN_REPORT_FILENAME
+        load_metrics_report_path = Path(reports_dir) / LOAD_METRICS_REPORT_FILENAME
+        try:
+            run_sigla_pipeline(
+                MASTER_SPREADSHEET_ID,
+                None,
+                db_connection_url,
+                load_mode=load_mode,
+                metrics_report_path=str(load_metrics_report_path),
+                executor=executor,
+                run_report_path=str(run_report_path),
+                streaming=streaming,
+                resource_limits=resource_limits,
+                db_client=db_client,
+                spreadsheets=SyntheticSpreadsheets(scale),
+            )
+        finally:
+            if in_memory:
+                InMemoryClient.drop_store(db_connection_url)
+        result = _create_benchmark_result(
+            scale,
+            {
+                "load_mode": load_mode,
+                "streaming": streaming,
+                "executor": type(executor).__name__,
+                "database": "memory" if in_memory else "mongodb",
+                "resource_limits": resource_limits or DEFAULT_RESOURCE_LIMITS,
+            },
+            json.loads(run_report_path.read_text()),
+            json.loads(load_metrics_report_path.read_text()),
+        )
+
+    results = []
+    if Path(results_path).exists():
+        results = json.loads(Path(results_path).read_text())
+    _compare_with_previous(result, results)
+    with open(results_path, "w") as results_file:
+        json.dump(results + [result], results_file, indent=2)
+    log.info(f"Added the benchmark result to {results_path}.")
+    return result
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from prefect.engine.results import LocalResult
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+
+class CheckpointStage:
+    spreadsheet_ids = "spreadsheet_ids"
+    extract = "extract/{spreadsheet_id}"
+    transform = "transform/{sheet_data.spreadsheet_id}/{sheet_data.sheet_id}"
+
+
+class Checkpoint(NamedTuple):
+    """
+    Where a run persists the outputs of its stages, so that a rerun can resume from them.
+
+    Attributes:
+        checkpoint_dir: str
+            The directory of the checkpoints of every run.
+        run_id: str
+            The id of the run, the subdirectory of its checkpoints.
+    """
+
+    checkpoint_dir: str
+    run_id: str
+
+
+def create_run_id() -> str:
+    """
+    Create the id of a checkpointed run.
+
+    Returns
+    -------
+    run_id: str
+        The time the run started, e.g. 20220314-153000.
+    """
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+def get_checkpoint_task_args(
+    checkpoint: Optional[Checkpoint], stage: str
+) -> Dict[str, Any]:
+    """
+    Get the task args that persist the outputs of a stage's task runs, and skip the task runs
+    whose outputs were persisted by an earlier attempt of the run.
+
+    Parameters
+    ----------
+    checkpoint: Optional[Checkpoint]
+        The checkpoint of the run. The task runs are not checkpointed if None.
+    stage: str
+        The stage, i.e. the location of each task run's output, formatted with the task's inputs.
+        See CheckpointStage.
+
+    Returns
+    -------
+    task_args: Dict[str, Any]
+        The task args, to pass to the task call.
+    """
+    if checkpoint is None:
+        return {}
+    return {
+        "checkpoint": True,
+        "result": LocalResult(
+            dir=os.path.abspath(
+                os.path.join(checkpoint.checkpoint_dir, checkpoint.run_id)
+            )
+        ),
+        "target": stage,
+    }
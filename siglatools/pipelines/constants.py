@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+class ExecutorType:
+    local_cluster = "local-cluster"
+    threads = "threads"
+    scheduler = "scheduler"
+
+
+class JobType:
+    sigla_pipeline = "sigla-pipeline"
+    qa_test = "qa-test"
+    external_link_checker = "external-link-checker"
+    next_uv_dates = "next-uv-dates"
+
+
+class SpreadsheetOrder:
+    master = "master"
+    size = "size"
+    previous_run = "previous-run"
+
+
+class ResourceType:
+    sheets = "sheets"
+    mongo = "mongo"
+    http = "http"
+
+
+# The defaults of the options shared by the scripts. They are kept here, apart from the modules
+# that use them, so that the scripts can parse their arguments without importing Prefect.
+
+# The path of the JSON report of the task runs of a flow
+RUN_REPORT_PATH = "run-report.json"
+# The path of the JSON report of the load metrics, written at the end of a run
+LOAD_METRICS_REPORT_PATH = "load-metrics.json"
+# The directory the runs checkpoint their stages' outputs to, if not given
+CHECKPOINT_DIR = ".checkpoints"
+# The write concern of a bulk load: acknowledged by the primary only, without journaling
+BULK_LOAD_WRITE_CONCERN = 1
+# The path of the JSON file the results of the benchmarks are added to
+BENCHMARK_RESULTS_PATH = "benchmark-results.json"
+# The number of task runs of every flow that can use each resource at the same time
+DEFAULT_RESOURCE_LIMITS = {
+    ResourceType.sheets: 8,
+    ResourceType.mongo: 16,
+    ResourceType.http: 64,
+}
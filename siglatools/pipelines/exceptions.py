@@ -7,3 +7,8 @@ from ..utils.exceptions import BaseError, ErrorInfo
 class PrefectFlowFailure(BaseError):
     def __init__(self, info: ErrorInfo):
         super().__init__("Prefect flow failed.", info)
+
+
+class SheetsLoadFailure(BaseError):
+    def __init__(self, info: ErrorInfo):
+        super().__init__("Failed to load sheets into the database.", info)
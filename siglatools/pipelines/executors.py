@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import logging
+from typing import Optional
+
+from prefect.executors import DaskExecutor, Executor, LocalDaskExecutor
+
+from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+from .constants import ExecutorType
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+# The number of threads of the threaded executor, if not given
+DEFAULT_THREAD_COUNT = 8
+
+
+class PrioritizedDaskExecutor(DaskExecutor):
+    """
+    A DaskExecutor that gives the runs of a mapped task decreasing priorities, in the order of the mapped inputs.
+    When more task runs are ready than the workers can take, the Dask scheduler starts the runs
+    of the first inputs first, e.g. of the spreadsheets ordered largest first.
+    """
+
+    def _prep_dask_kwargs(self, extra_context: dict = None) -> dict:
+        dask_kwargs = super()._prep_dask_kwargs(extra_context)
+        task_index = (extra_context or {}).get("task_index")
+        if task_index is not None:
+            dask_kwargs["priority"] = -task_index
+        return dask_kwargs
+
+
+def create_executor(
+    executor_type: str = ExecutorType.local_cluster,
+    scheduler_address: Optional[str] = None,
+    n_workers: Optional[int] = None,
+    n_threads: Optional[int] = None,
+) -> Executor:
+    """
+    Create the executor a flow runs its tasks on.
+
+    Parameters
+    ----------
+    executor_type: str = ExecutorType.local_cluster
+        `local-cluster` spawns a Dask LocalCluster for the run, and closes it at the end.
+        The runs of a mapped task are prioritized in the order of their inputs on the Dask executors.
+        `threads` runs the tasks on a pool of threads of the current process, without
+        pickling their results, which suits the I/O-bound tasks of the pipelines.
+        `scheduler` attaches to a running Dask scheduler.
+    scheduler_address: Optional[str] = None
+        The address of the Dask scheduler, for the scheduler executor.
+    n_workers: Optional[int] = None
+        The number of worker processes of the local cluster. Dask's default if None.
+    n_threads: Optional[int] = None
+        The number of threads of each worker of the local cluster, Dask's default if None,
+        or the number of threads of the threaded executor, DEFAULT_THREAD_COUNT if None.
+
+    Returns
+    -------
+    executor: Executor
+        The executor.
+    """
+    if executor_type == ExecutorType.local_cluster:
+        cluster_kwargs = {}
+        if n_workers:
+            cluster_kwargs["n_workers"] = n_workers
+        if n_threads:
+            cluster_kwargs["threads_per_worker"] = n_threads
+        return PrioritizedDaskExecutor(cluster_kwargs=cluster_kwargs)
+    if executor_type == ExecutorType.threads:
+        return LocalDaskExecutor(
+            scheduler="threads", num_workers=n_threads or DEFAULT_THREAD_COUNT
+        )
+    if executor_type == ExecutorType.scheduler:
+        if not scheduler_address:
+            raise InvalidWorkflowInputs(
+                ErrorInfo(
+                    {"reason": "The scheduler executor needs a scheduler address."}
+                )
+            )
+        return PrioritizedDaskExecutor(address=scheduler_address)
+    raise InvalidWorkflowInputs(
+        ErrorInfo({"reason": f"Unknown executor: {executor_type}."})
+    )
+
+
+def create_executor_from_args(args: argparse.Namespace) -> Executor:
+    """
+    Create the executor from the arguments added by add_executor_arguments.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        The parsed arguments of the script.
+
+    Returns
+    -------
+    executor: Executor
+        The executor.
+    """
+    executor = create_executor(
+        args.executor, args.scheduler_address, args.n_workers, args.n_threads
+    )
+    log.info(f"Running the tasks on the {args.executor} executor.")
+    return executor
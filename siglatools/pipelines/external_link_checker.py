@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+import logging
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import requests
+from prefect import Flow, Task, flatten, task, unmapped
+from prefect.executors import Executor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..institution_extracters.constants import MetaDataField
+from ..institution_extracters.utils import SheetData, convert_rowcol_to_A1_name
+from ..utils.exceptions import ErrorInfo
+from .constants import RUN_REPORT_PATH, ResourceType
+from .exceptions import PrefectFlowFailure
+from .executors import create_executor
+from .run_report import run_flow
+from .utils import _extract, _get_spreadsheet_ids
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+URL_REGEX = r"(https?://\S+)"
+
+
+class GoogleSheetCell(NamedTuple):
+    """
+    A GoogleSheet cell.
+
+    Attributes:
+        spreadsheet_title: str
+            The title of the spreadsheet the contains the URL.
+        sheet_title: str
+            The title of the sheet that contains the URL.
+        row_index: int
+            The row index of the cell.
+        col_index: int
+            The col index of the cell.
+        url: Optional[str] = None
+            The url in the cell.
+        msg: Optional[str] = None
+            The status of url.
+    """
+
+    spreadsheet_title: str
+    sheet_title: str
+    row_index: int
+    col_index: int
+    url: Optional[str] = None
+    msg: Optional[str] = None
+
+
+class URLData(NamedTuple):
+    """
+    The URL and its context.
+
+    Attributes:
+        cells: List[GoogleSheetCell]
+            The list of cells that has the URL.
+        url: str
+            The URL.
+    """
+
+    cells: List[GoogleSheetCell]
+    url: str
+
+    def get_key(self) -> str:
+        "Get the key."
+        return self.url
+
+    def add_cell(self, cell: GoogleSheetCell):
+        "Add a cell to the list of cells."
+        self.cells.append(cell)
+
+
+class CheckedURL(NamedTuple):
+    """
+    The status of an URL after checking.
+
+    Attributes:
+        has_error: bool
+            Whether the URL has an error.
+        url_data: URLData
+            The URL and its context. See URLData class.
+        msg: Optional[str] = None
+            The status of the URL after checking. None if has_error is False.
+    """
+
+    has_error: bool
+    url_data: URLData
+    msg: Optional[str] = None
+
+
+@task
+def _extract_external_links(sheet_data: SheetData) -> List[URLData]:
+    """
+    Prefect Task to extract external links from a sheet.
+
+    Parameters
+    ----------
+    sheet_data: SheetData
+        The sheet's data.
+
+    Returns
+    -------
+    urls_data: List[URLData]
+        The list of URLs and their context. See URLData class.
+    """
+    urls_data = []
+    for i, row in enumerate(sheet_data.data):
+        for j, cell in enumerate(row):
+            urls = re.findall(URL_REGEX, cell)
+            row_index = int(sheet_data.meta_data.get(MetaDataField.start_row)) + i - 1
+            # Assume bounding box always starts in the first column of a sheet
+            col_index = j
+            for url in urls:
+                urls_data.append(
+                    URLData(
+                        cells=[
+                            GoogleSheetCell(
+                                spreadsheet_title=sheet_data.spreadsheet_title,
+                                sheet_title=sheet_data.sheet_title,
+                                row_index=row_index,
+                                col_index=col_index,
+                            )
+                        ],
+                        url=url,
+                    )
+                )
+    return urls_data
+
+
+@task
+def _unique_external_links(urls_data: List[URLData]) -> List[URLData]:
+    """
+    Prefect Task to merge url data together by merging cells.
+
+    Parameters
+    ----------
+    urls_data: List[URLData]
+        The list of URLs and their contexts.
+
+    Returns
+    -------
+    urls_data: List[URLData]
+        The list of merged urls data.
+    """
+    external_links_group = {}
+    for url_data in urls_data:
+        if url_data.get_key() not in external_links_group:
+            external_links_group.update({url_data.get_key(): url_data})
+        else:
+            external_links_group.get(url_data.get_key()).add_cell(url_data.cells[0])
+    unique_urls_data = list(external_links_group.values())
+    log.info(f"Found {len(unique_urls_data)} unique links of {len(urls_data)}.")
+    return unique_urls_data
+
+
+@task(tags=[ResourceType.http])
+def _check_external_link(url_data: URLData) -> CheckedURL:
+    """
+    Prefect Task to check the status of the URL.
+
+    Parameters
+    ----------
+    url_data: URLData
+        The URL and its context. See URLData class.
+
+    Returns
+    -------
+        checked_url: CheckedURL
+        The status of the URL after checking. See CheckedURL class.
+    """
+    has_error = False
+    error_msg = None
+    response = None
+    try:
+        http = requests.Session()
+        retry_strategy = Retry(
+            total=2,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+        http.headers.update(
+            {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:85.0) Gecko/20100101 Firefox/85.0",
+            }
+        )
+        response = http.get(
+            url_data.url,
+            allow_redirects=True,
+            timeout=5.0,
+            verify=True,
+        )
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        has_error = True
+        error_msg = f"{response.status_code} - {response.reason}"
+    except requests.exceptions.SSLError:
+        has_error = True
+        error_msg = "Untrusted SSL Certificate"
+    except requests.exceptions.Timeout as error:
+        has_error = True
+        error_msg = f"Request timed out: {error}"
+    except requests.exceptions.ConnectionError as error:
+        has_error = True
+        error_msg = f"Error connecting: {error}"
+    except requests.exceptions.RequestException as error:
+        has_error = True
+        error_msg = f"Unknown error: {error}"
+    log.info(f"Finished checking {url_data.url}")
+    return CheckedURL(has_error=has_error, url_data=url_data, msg=error_msg)
+
+
+def add_external_link_checker_tasks(spreadsheets_data: Task) -> Task:
+    """
+    Add the tasks that check the external links of the extracted spreadsheets to the current flow.
+
+    Parameters
+    ----------
+    spreadsheets_data: Task
+        The task that extracts the sheets data of every spreadsheet.
+
+    Returns
+    -------
+    checked_links: Task
+        The task that checks the external links, and returns the list of CheckedURL.
+    """
+    # Extract links from list of SheetData
+    # Get back list of list of URLData
+    links_data = _extract_external_links.map(flatten(spreadsheets_data))
+    # Unique the url data
+    unique_links_data = _unique_external_links(flatten(links_data))
+    # Check external links
+    return _check_external_link.map(unique_links_data)
+
+
+def write_external_links(checked_links: List[CheckedURL]):
+    """
+    Write the external links that have an error to external_links.csv.
+
+    Parameters
+    ----------
+    checked_links: List[CheckedURL]
+        The checked external links.
+    """
+    # Get error links
+    error_links = [link for link in checked_links if link.has_error]
+    gs_cells = []
+    for error_link in error_links:
+        for cell in error_link.url_data.cells:
+            gs_cells.append(
+                GoogleSheetCell(
+                    spreadsheet_title=cell.spreadsheet_title,
+                    sheet_title=cell.sheet_title,
+                    row_index=cell.row_index,
+                    col_index=cell.col_index,
+                    url=error_link.url_data.url,
+                    msg=error_link.msg,
+                )
+            )
+
+    sorted_gs_cells = sorted(
+        gs_cells,
+        key=lambda x: (
+            x.spreadsheet_title,
+            x.sheet_title,
+            x.row_index,
+            x.col_index,
+            x.url,
+        ),
+    )
+    # Write error links to a csv file
+    with open("external_links.csv", mode="w") as csv_file:
+        fieldnames = ["spreadsheet_title", "sheet_title", "cell", "url", "reason"]
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames, delimiter="\t")
+        writer.writeheader()
+        for gs_cell in sorted_gs_cells:
+            writer.writerow(
+                {
+                    "spreadsheet_title": gs_cell.spreadsheet_title,
+                    "sheet_title": gs_cell.sheet_title,
+                    "cell": convert_rowcol_to_A1_name(
+                        gs_cell.row_index, gs_cell.col_index
+                    ),
+                    "url": gs_cell.url,
+                    "reason": f"{gs_cell.msg}",
+                }
+            )
+    log.info("Finished writing external links csv file")
+
+
+def run_external_link_checker(
+    google_api_credentials_path: str,
+    master_spreadsheet_id: Optional[str] = None,
+    spreadsheet_ids_str: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+):
+    """
+    Run the the external link checker.
+    If a list of spreadsheet ids are provided, run the external link checker
+    against the list of spreadsheet ids, instead of the spreadsheet ids gathered
+    from the master spreadsheet.
+
+    Parameters
+    ----------
+    master_spreadsheet_id: str
+        The master spreadsheet id.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    spreadsheet_ids_str: Optional[str]
+        The list spreadsheet ids, delimited by comma.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. A new local Dask cluster if None.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report of the flow's task runs. The report isn't written if None.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the results of the task runs in the run report.
+    """
+    log.info("Finished external link checker set up, start checking external link.")
+    log.info("=" * 80)
+    # Setup workflow
+    with Flow("Check external links") as flow:
+        # Get spreadsheet ids
+        spreadsheet_ids = _get_spreadsheet_ids(
+            master_spreadsheet_id, google_api_credentials_path, spreadsheet_ids_str
+        )
+
+        # Extract sheets data.
+        # Get back list of list of SheetData
+        spreadsheets_data = _extract.map(
+            spreadsheet_ids,
+            unmapped(google_api_credentials_path),
+        )
+        # Check the external links
+        checked_links = add_external_link_checker_tasks(spreadsheets_data)
+
+    # Run the flow
+    state = run_flow(
+        flow,
+        executor or create_executor(),
+        run_report_path,
+        resource_limits=resource_limits,
+        measure_result_bytes=measure_result_bytes,
+    )
+    if state.is_failed():
+        raise PrefectFlowFailure(ErrorInfo({"flow_name": flow.name}))
+    log.info("=" * 80)
+    # Write the list of CheckedURL
+    write_external_links(state.result[checked_links].result)
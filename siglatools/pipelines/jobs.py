@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from prefect import Flow, Task, unmapped
+from prefect.engine.state import State
+from prefect.executors import Executor
+
+from ..databases.constants import LoadMode
+from ..utils.exceptions import ErrorInfo
+from .constants import (
+    BULK_LOAD_WRITE_CONCERN,
+    LOAD_METRICS_REPORT_PATH,
+    RUN_REPORT_PATH,
+    JobType,
+    SpreadsheetOrder,
+)
+from .exceptions import PrefectFlowFailure
+from .executors import create_executor
+from .external_link_checker import (
+    add_external_link_checker_tasks,
+    write_external_links,
+)
+from .next_uv_dates import add_next_uv_dates_tasks, write_next_uv_dates
+from .qa_test import add_qa_test_tasks, write_qa_test_zip
+from .run_report import read_spreadsheet_wall_times, run_flow
+from .sigla_pipeline import add_sigla_pipeline_tasks
+from .utils import _extract, _get_spreadsheet_ids, add_spreadsheet_order_tasks
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+
+def _is_successful(state: State) -> bool:
+    """
+    Whether a task run, and every run of a mapped task, succeeded.
+
+    Parameters
+    ----------
+    state: State
+        The state of the task.
+
+    Returns
+    -------
+    is_successful: bool
+        Whether the task succeeded.
+    """
+    return state.is_successful() and all(
+        map_state.is_successful() for map_state in getattr(state, "map_states", [])
+    )
+
+
+def run_jobs(
+    jobs: List[str],
+    master_spreadsheet_id: str,
+    google_api_credentials_path: str,
+    db_connection_url: Optional[str] = None,
+    load_mode: str = LoadMode.clean_up,
+    bulk_load: bool = False,
+    write_concern: int = BULK_LOAD_WRITE_CONCERN,
+    materialize: bool = False,
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH,
+    streaming: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    executor: Optional[Executor] = None,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    spreadsheet_order: str = SpreadsheetOrder.master,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+):
+    """
+    Run several jobs in one flow, on one executor. The spreadsheets are extracted once,
+    and their sheets data is shared by every job. The QA test compares the spreadsheets
+    against the db once the SIGLA pipeline has loaded them.
+
+    Parameters
+    ----------
+    jobs: List[str]
+        The jobs to run. See JobType.
+    master_spreadsheet_id: str
+        The master spreadsheet id.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    db_connection_url: Optional[str] = None
+        The DB's connection url str, for the SIGLA pipeline and the QA test.
+    load_mode: str = LoadMode.clean_up
+        How the SIGLA pipeline replaces the documents in the db. See run_sigla_pipeline.
+    bulk_load: bool = False
+        Whether the SIGLA pipeline loads with the bulk-load profile.
+    write_concern: int = BULK_LOAD_WRITE_CONCERN
+        The number of acknowledgments each write of a bulk load waits for.
+    materialize: bool = False
+        Whether the SIGLA pipeline rebuilds the institution pages collection.
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH
+        The path of the JSON report of the database operations made by the load.
+    streaming: bool = False
+        Whether the SIGLA pipeline loads each spreadsheet on its own as soon as it is extracted.
+    start_date: Optional[date] = None
+        The start date of the next uv dates to report.
+    end_date: Optional[date] = None
+        The end date of the next uv dates to report.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. A new local Dask cluster if None.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report of the flow's task runs. The report isn't written if None.
+    spreadsheet_order: str = SpreadsheetOrder.master
+        The order the spreadsheets are extracted in. See run_sigla_pipeline.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the results of the task runs in the run report.
+    """
+    previous_wall_times = (
+        read_spreadsheet_wall_times(run_report_path)
+        if spreadsheet_order == SpreadsheetOrder.previous_run
+        else None
+    )
+    log.info(f"Finished set up, start running the jobs {', '.join(jobs)}.")
+    log.info("=" * 80)
+    # The tasks whose results each job reports
+    job_tasks: Dict[str, List[Task]] = {}
+    # Setup workflow
+    with Flow("SIGLA Jobs") as flow:
+        # Get spreadsheet ids
+        spreadsheet_ids = _get_spreadsheet_ids(
+            master_spreadsheet_id, google_api_credentials_path
+        )
+        # Order the spreadsheets, e.g. largest first
+        spreadsheet_ids = add_spreadsheet_order_tasks(
+            spreadsheet_ids,
+            google_api_credentials_path,
+            spreadsheet_order,
+            previous_wall_times,
+        )
+        # Extract sheets data once, for every job.
+        # Get back list of list of SheetData
+        spreadsheets_data = _extract.map(
+            spreadsheet_ids,
+            unmapped(google_api_credentials_path),
+        )
+        load_tasks = []
+        if JobType.sigla_pipeline in jobs:
+            load_tasks = add_sigla_pipeline_tasks(
+                spreadsheet_ids,
+                spreadsheets_data,
+                db_connection_url,
+                load_mode,
+                bulk_load,
+                write_concern,
+                materialize,
+                metrics_report_path,
+                streaming,
+            )
+            job_tasks[JobType.sigla_pipeline] = load_tasks
+        if JobType.qa_test in jobs:
+            # Compare against the db once it is loaded
+            (
+                write_comparison_tasks,
+                write_extra_db_institutions_task,
+            ) = add_qa_test_tasks(
+                spreadsheet_ids,
+                spreadsheets_data,
+                db_connection_url,
+                upstream_tasks=load_tasks,
+            )
+            job_tasks[JobType.qa_test] = [
+                *write_comparison_tasks,
+                write_extra_db_institutions_task,
+            ]
+        if JobType.external_link_checker in jobs:
+            job_tasks[JobType.external_link_checker] = [
+                add_external_link_checker_tasks(spreadsheets_data)
+            ]
+        if JobType.next_uv_dates in jobs:
+            job_tasks[JobType.next_uv_dates] = [
+                add_next_uv_dates_tasks(spreadsheets_data, start_date, end_date)
+            ]
+
+    # Run the flow
+    state = run_flow(
+        flow,
+        executor or create_executor(),
+        run_report_path,
+        resource_limits=resource_limits,
+        measure_result_bytes=measure_result_bytes,
+    )
+    log.info("=" * 80)
+    # Write the results of every job that succeeded
+    failed_jobs = []
+    for job, tasks in job_tasks.items():
+        task_states = [state.result[job_task] for job_task in tasks]
+        if not all(_is_successful(task_state) for task_state in task_states):
+            failed_jobs.append(job)
+            continue
+        results = [task_state.result for task_state in task_states]
+        if job == JobType.qa_test:
+            write_qa_test_zip(
+                [
+                    comparison
+                    for comparisons in results[:-1]
+                    for comparison in comparisons
+                ],
+                results[-1],
+            )
+        elif job == JobType.external_link_checker:
+            write_external_links(results[0])
+        elif job == JobType.next_uv_dates:
+            write_next_uv_dates(results[0])
+        log.info(f"Finished the job {job}.")
+    if failed_jobs or state.is_failed():
+        raise PrefectFlowFailure(
+            ErrorInfo({"flow_name": flow.name, "failed_jobs": ", ".join(failed_jobs)})
+        )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Dict, List, Optional
+
+from prefect import Flow, unmapped
+from prefect.executors import Executor
+
+from ..utils.exceptions import ErrorInfo
+from .constants import LOAD_METRICS_REPORT_PATH, RUN_REPORT_PATH
+from .exceptions import PrefectFlowFailure
+from .executors import create_executor
+from .run_report import run_flow
+from .utils import (
+    _create_generation,
+    _create_load_metrics_report_task,
+    _extract,
+    _load_spreadsheets_in_phases,
+    _log_spreadsheets,
+    _materialize_institutions,
+    _reload_spreadsheet,
+)
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+######################################################
+
+
+def load_spreadsheets(
+    spreadsheet_ids: List[str],
+    db_connection_url: str,
+    google_api_credentials_path: str,
+    materialize: bool = False,
+    transactional: bool = False,
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH,
+    executor: Optional[Executor] = None,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+):
+    """
+    Load spreadsheets to the database.
+    The documents of the spreadsheets are replaced in place: every loaded document is stamped with
+    the run's generation, and the documents of older generations are deleted at the end.
+
+    Parameters
+    ----------
+    spreadsheet_ids: List[str]
+        The list of spreadsheet ids.
+    db_connection_url: str
+        The DB's connection url str.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    materialize: bool = False
+        Whether to rebuild the institution pages collection once the documents are loaded.
+    transactional: bool = False
+        Whether to reload each spreadsheet in its own transaction, instead of loading all
+        the spreadsheets' sheets together and pruning their old documents at the end.
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH
+        The path of the JSON report of the database operations made by the load.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. A new local Dask cluster if None.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report of the flow's task runs. The report isn't written if None.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the results of the task runs in the run report.
+    """
+    # Setup workflow
+    with Flow("Load spreadsheets") as flow:
+        # extract list of list of sheet data
+        spreadsheets_data = _extract.map(
+            spreadsheet_ids, unmapped(google_api_credentials_path)
+        )
+        if transactional:
+            # reload each spreadsheet in one transaction
+            load_task = _reload_spreadsheet.map(
+                spreadsheets_data, unmapped(db_connection_url)
+            )
+            load_tasks = [load_task]
+        else:
+            # load the sheets of every spreadsheet together, and prune their older generations
+            load_task, load_tasks = _load_spreadsheets_in_phases(
+                spreadsheets_data,
+                db_connection_url,
+                shadow=False,
+                skip_unchanged=False,
+                write_concern=None,
+                generation=_create_generation(),
+                checkpoint=None,
+                pruned_spreadsheet_ids=spreadsheet_ids,
+            )
+        # report the database operations of the load
+        _create_load_metrics_report_task(load_tasks, metrics_report_path)
+        if materialize:
+            # rebuild the institution pages from the loaded documents
+            _materialize_institutions(db_connection_url, upstream_tasks=[load_task])
+        # log spreadsheets that were loaded
+        _log_spreadsheets(spreadsheets_data, upstream_tasks=[load_task])
+
+    # Run the flow
+    state = run_flow(
+        flow,
+        executor or create_executor(),
+        run_report_path,
+        resource_limits=resource_limits,
+        measure_result_bytes=measure_result_bytes,
+    )
+    # Check the flow's final state
+    if state.is_failed():
+        raise PrefectFlowFailure(ErrorInfo({"flow_name": flow.name}))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+import logging
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+
+from prefect import Flow, Task, flatten, task, unmapped
+from prefect.executors import Executor
+
+from ..institution_extracters.constants import MetaDataField
+from ..institution_extracters.utils import SheetData
+from ..utils.exceptions import ErrorInfo
+from .constants import RUN_REPORT_PATH
+from .exceptions import PrefectFlowFailure
+from .executors import create_executor
+from .run_report import run_flow
+from .utils import _extract, _get_spreadsheet_ids
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+
+class NextUVDateData(NamedTuple):
+    """
+    A next update and verify date and its context
+
+    Attributes:
+        spreadsheet_title: str
+            The title of the spreadsheet the contains the next uv date.
+        sheet_title: str
+            The title of the sheet that contains the next uv date.
+        column_name: str
+            The column location of the next uv date in the sheet.
+        row_index: int
+            The row location of the next uv date in the sheet.
+        next_uv_date: str
+            The next uv date.
+
+    """
+
+    spreadsheet_title: str
+    sheet_title: str
+    column_name: str
+    row_index: int
+    next_uv_date: date
+
+
+class NextUVDateStatus:
+    """
+    Possible status of a next uv date.
+    """
+
+    requires_uv = "Requires update and verify"
+    incorrect_date_format = "Incorrect date format"
+    irrelevant = "Irrelevant"
+
+
+class CheckedNextUVDate(NamedTuple):
+    """
+    The status of a next uv date after checking.
+
+    Attributes:
+        status: NextUVDateStatus
+            The status of a next uv date after checking.
+        next_uv_date_data: NextUVDateData
+            The next uv date and its context. See NextUVDateData class.
+    """
+
+    status: NextUVDateStatus
+    next_uv_date_data: NextUVDateData
+
+
+@task
+def _extract_next_uv_dates(sheet_data: SheetData) -> List[NextUVDateData]:
+    """
+    Prefect task to gather next uv dates.
+
+    Parameters
+    ----------
+    sheet_data: SheetData
+        The sheet's data.
+
+    Returns
+    -------
+    next_uv_dates_data: List[NextUVDateData]
+        The list of next uv dates.
+    """
+    column_name = sheet_data.meta_data.get(MetaDataField.date_of_next_uv_column)
+    next_uv_dates_data = [
+        NextUVDateData(
+            spreadsheet_title=sheet_data.spreadsheet_title,
+            sheet_title=sheet_data.sheet_title,
+            column_name=column_name,
+            row_index=int(sheet_data.meta_data.get(MetaDataField.start_row)) + i,
+            next_uv_date=next_uv_date,
+        )
+        for i, next_uv_date in enumerate(sheet_data.next_uv_dates)
+        # Ignore empty and `Date of Next U&V` cells"
+        if next_uv_date.strip() and "date" not in next_uv_date.strip().lower()
+    ]
+    return next_uv_dates_data
+
+
+@task
+def _check_next_uv_date(
+    next_uv_date_data: NextUVDateData, start_date: date, end_date: date
+) -> CheckedNextUVDate:
+    """
+    Prefect task to check if the next uv date falls within the given start_date and end_date.
+
+    Parameters
+    ----------
+    next_uv_date_data: NextUVDateData
+        The next uv date and its context. See NextUVDateData class.
+    start_date: date
+        The start date of the date range.
+    end_date: date
+        The end date of the date range.
+
+    Returns
+    -------
+    checked_next_uv_date: CheckedNextUVDate
+        The status of the next uv date.
+    """
+    status = None
+    try:
+        next_uv_date = date.fromisoformat(next_uv_date_data.next_uv_date)
+        if next_uv_date >= start_date and next_uv_date <= end_date:
+            status = NextUVDateStatus.requires_uv
+        else:
+            status = NextUVDateStatus.irrelevant
+    except ValueError:
+        status = NextUVDateStatus.incorrect_date_format
+    return CheckedNextUVDate(status=status, next_uv_date_data=next_uv_date_data)
+
+
+def add_next_uv_dates_tasks(
+    spreadsheets_data: Task, start_date: date, end_date: date
+) -> Task:
+    """
+    Add the tasks that check the next uv dates of the extracted spreadsheets to the current flow.
+
+    Parameters
+    ----------
+    spreadsheets_data: Task
+        The task that extracts the sheets data of every spreadsheet.
+    start_date: date
+        The start date.
+    end_date: date
+        The end date.
+
+    Returns
+    -------
+    checked_next_uv_dates: Task
+        The task that checks the next uv dates, and returns the list of CheckedNextUVDate.
+    """
+    # Extract next uv dates
+    next_uv_dates_data = _extract_next_uv_dates.map(flatten(spreadsheets_data))
+    # Check next uv dates
+    return _check_next_uv_date.map(
+        flatten(next_uv_dates_data), unmapped(start_date), unmapped(end_date)
+    )
+
+
+def write_next_uv_dates(checked_next_uv_dates: List[CheckedNextUVDate]):
+    """
+    Write the next uv dates that require an update and verify, or are incorrect,
+    to next_uv_dates.csv.
+
+    Parameters
+    ----------
+    checked_next_uv_dates: List[CheckedNextUVDate]
+        The checked next uv dates.
+    """
+    # Get next uv dates
+    next_uv_dates = [
+        next_uv_date
+        for next_uv_date in checked_next_uv_dates
+        if next_uv_date.status != NextUVDateStatus.irrelevant
+    ]
+    sorted_next_uv_dates = sorted(
+        next_uv_dates,
+        key=lambda x: (
+            x.next_uv_date_data.spreadsheet_title,
+            x.next_uv_date_data.sheet_title,
+            x.next_uv_date_data.row_index,
+        ),
+    )
+    # Write next uv dates to a csv file
+    with open("next_uv_dates.csv", mode="w") as csv_file:
+        fieldnames = ["spreadsheet_title", "sheet_title", "cell", "status"]
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames, delimiter="\t")
+        writer.writeheader()
+        for next_uv_date in sorted_next_uv_dates:
+            next_uv_date_data = next_uv_date.next_uv_date_data
+            writer.writerow(
+                {
+                    "spreadsheet_title": next_uv_date_data.spreadsheet_title,
+                    "sheet_title": next_uv_date_data.sheet_title,
+                    "cell": f"{next_uv_date_data.column_name}{next_uv_date_data.row_index}",
+                    "status": next_uv_date.status,
+                }
+            )
+    log.info("Finished writing next uv dates csv file")
+
+
+def get_next_uv_dates(
+    master_spreadsheet_id: str,
+    google_api_credentials_path: str,
+    start_date: date,
+    end_date: date,
+    executor: Optional[Executor] = None,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+):
+    """
+    Get next update and verify dates or uv dates that falls within the date range.
+
+    Parameters
+    ----------
+    master_spreadsheet_id: str
+        The master spreadsheet id
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    start_date: date
+        The start date.
+    end_date: date
+        The end date.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. A new local Dask cluster if None.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report of the flow's task runs. The report isn't written if None.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the results of the task runs in the run report.
+    """
+    log.info("Finished setup, start finding next uv dates.")
+    log.info("=" * 80)
+    # Setup workflow
+    with Flow("Get next update and verify dates") as flow:
+        # Get the list of spreadsheet ids from the master spreadsheet
+        spreadsheet_ids = _get_spreadsheet_ids(
+            master_spreadsheet_id, google_api_credentials_path
+        )
+        # Extract sheets data.
+        # Get back list of list of SheetData
+        spreadsheets_data = _extract.map(
+            spreadsheet_ids,
+            unmapped(google_api_credentials_path),
+        )
+        log.info("Finished extracting the spreadsheet data.")
+        # Extract and check next uv dates
+        checked_next_uv_dates = add_next_uv_dates_tasks(
+            spreadsheets_data, start_date, end_date
+        )
+        log.info("Finished checking next uv dates.")
+
+    # Run the flow
+    state = run_flow(
+        flow,
+        executor or create_executor(),
+        run_report_path,
+        resource_limits=resource_limits,
+        measure_result_bytes=measure_result_bytes,
+    )
+    # Check the flow's final state
+    if state.is_failed():
+        raise PrefectFlowFailure(ErrorInfo({"flow_name": flow.name}))
+    log.info("=" * 80)
+    # Write the list of CheckedNextUVDates
+    write_next_uv_dates(state.result[checked_next_uv_dates].result)
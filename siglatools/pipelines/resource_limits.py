@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, Hashable
+
+import prefect
+from distributed import Semaphore, get_worker
+from prefect.engine.result import Result
+from prefect.engine.state import State
+from prefect.engine.task_runner import TaskRunner
+
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+# The key of the resource limits in the context of a flow run
+RESOURCE_LIMITS_KEY = "resource_limits"
+# The prefix of the names of the Dask semaphores of the resources
+SEMAPHORE_NAME_PREFIX = "siglatools"
+
+# The semaphores of the resources in this process, by resource and limit, or by Dask semaphore name
+_semaphores: Dict[Hashable, Any] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _get_semaphore(resource: str, limit: int) -> Any:
+    """
+    Get the semaphore that limits the task runs using a resource.
+    In a Dask worker, the semaphore is a Dask semaphore, shared by every worker of the cluster.
+    Otherwise it is shared by the threads of the process.
+    """
+    try:
+        get_worker()
+        key = f"{SEMAPHORE_NAME_PREFIX}-{resource}-{limit}"
+    except ValueError:
+        key = (resource, limit)
+    with _semaphores_lock:
+        if key not in _semaphores:
+            _semaphores[key] = (
+                Semaphore(max_leases=limit, name=key)
+                if isinstance(key, str)
+                else threading.BoundedSemaphore(limit)
+            )
+        return _semaphores[key]
+
+
+class ResourceLimitedTaskRunner(TaskRunner):
+    """
+    A TaskRunner that runs a task only once it holds a lease on each limited resource in the tags of the task,
+    e.g. `@task(tags=[ResourceType.mongo])`. The limits of the resources are read from the context of the flow run.
+    A resource without a limit isn't limited.
+    """
+
+    resource_wait = 0.0
+
+    def get_task_run_state(self, state: State, inputs: Dict[str, Result]) -> State:
+        resource_limits = prefect.context.get(RESOURCE_LIMITS_KEY) or {}
+        semaphores = [
+            _get_semaphore(resource, resource_limits.get(resource))
+            for resource in sorted(self.task.tags)
+            if resource_limits.get(resource)
+        ]
+        with ExitStack() as stack:
+            started_at = time.time()
+            for semaphore in semaphores:
+                stack.enter_context(semaphore)
+            # The time the task run waited for the leases on its resources
+            self.resource_wait = time.time() - started_at
+            return super().get_task_run_state(state, inputs)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import pickle
+import resource
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from prefect import Flow
+from prefect.core.edge import Edge
+from prefect.engine.flow_runner import FlowRunner
+from prefect.engine.state import Retrying, State
+from prefect.executors import Executor
+
+from .constants import DEFAULT_RESOURCE_LIMITS, RUN_REPORT_PATH
+from .resource_limits import RESOURCE_LIMITS_KEY, ResourceLimitedTaskRunner
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+# The key of the stats of a task run in the context of its state
+RUN_STATS_KEY = "run_stats"
+# The key of whether to measure the size of the results of the task runs, in the context of a flow run
+MEASURE_RESULT_BYTES_KEY = "measure_result_bytes"
+# The final states of the task runs that didn't fail
+SUCCESSFUL_STATES = ["Success", "Cached", "Mapped", "Skipped"]
+
+
+def _get_run_stats(state: State) -> List[Dict[str, Any]]:
+    """Get the stats of a task run, or of every run of a mapped task."""
+    map_states = getattr(state, "map_states", None)
+    if map_states:
+        return [
+            run_stats
+            for map_state in map_states
+            for run_stats in _get_run_stats(map_state)
+        ]
+    run_stats = state.context.get(RUN_STATS_KEY)
+    return [run_stats] if run_stats else []
+
+
+def _get_spreadsheet_ids(value: Any) -> Set[str]:
+    """Get the ids of the spreadsheets an input of a task run comes from, e.g. of a list of SheetData."""
+    if isinstance(value, list):
+        return {
+            spreadsheet_id
+            for element in value
+            for spreadsheet_id in _get_spreadsheet_ids(element)
+        }
+    spreadsheet_id = getattr(value, "spreadsheet_id", None)
+    return {spreadsheet_id} if isinstance(spreadsheet_id, str) else set()
+
+
+def _get_result_bytes(state: State) -> int:
+    """
+    Get the pickled size of a task run's result, the bytes moved to a task run in another process.
+    It pickles the result once more, so it is only measured on demand, see run_flow.
+    """
+    if not state.is_successful() or state.is_mapped():
+        return 0
+    try:
+        return len(pickle.dumps(state.result))
+    except Exception:
+        return 0
+
+
+class ReportingTaskRunner(ResourceLimitedTaskRunner):
+    """
+    A ResourceLimitedTaskRunner that records the stats of each task run in the context of its final state,
+    which is sent back to the flow runner with the state.
+    """
+
+    def run(
+        self,
+        state: State = None,
+        upstream_states: Dict[Edge, State] = None,
+        context: Dict[str, Any] = None,
+        is_mapped_parent: bool = False,
+    ) -> State:
+        upstream_states = upstream_states or {}
+        # The task run is ready once the last of its upstream task runs has finished
+        upstream_run_stats = [
+            run_stats
+            for upstream_state in upstream_states.values()
+            for run_stats in _get_run_stats(upstream_state)
+        ]
+        last_upstream_run_stats = max(
+            upstream_run_stats,
+            key=lambda run_stats: run_stats.get("finished_at"),
+            default=None,
+        )
+        # The task run is made for a spreadsheet if all of its inputs come from that spreadsheet
+        spreadsheet_ids = set()
+        for edge, upstream_state in upstream_states.items():
+            if edge.key == "spreadsheet_id" and isinstance(upstream_state.result, str):
+                spreadsheet_ids.add(upstream_state.result)
+            elif edge.key is not None:
+                spreadsheet_ids.update(_get_spreadsheet_ids(upstream_state.result))
+        started_at = time.time()
+        new_state = super().run(
+            state=state,
+            upstream_states=upstream_states,
+            context=context,
+            is_mapped_parent=is_mapped_parent,
+        )
+        finished_at = time.time()
+        map_index = (context or {}).get("map_index")
+        task_slug = self.task.slug or self.task.name
+        new_state.context[RUN_STATS_KEY] = {
+            "task": task_slug,
+            "task_run": task_slug if map_index is None else f"{task_slug}[{map_index}]",
+            "state": type(new_state).__name__,
+            "spreadsheet_id": spreadsheet_ids.pop()
+            if len(spreadsheet_ids) == 1
+            else None,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "queue_wait": max(
+                started_at - last_upstream_run_stats.get("finished_at"), 0
+            )
+            if last_upstream_run_stats
+            else 0,
+            "waited_on": last_upstream_run_stats.get("task_run")
+            if last_upstream_run_stats
+            else None,
+            "resource_wait": self.resource_wait,
+            "retries": state.run_count if isinstance(state, Retrying) else 0,
+            "result_bytes": _get_result_bytes(new_state)
+            if (context or {}).get(MEASURE_RESULT_BYTES_KEY)
+            else None,
+            "worker": os.getpid(),
+            # The peak resident memory of the worker process so far. ru_maxrss is in kilobytes on Linux
+            "peak_worker_memory": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            * 1024,
+        }
+        return new_state
+
+
+class ReportingFlowRunner(FlowRunner):
+    """
+    A FlowRunner whose task runs hold leases on their limited resources, and record their stats.
+    See ReportingTaskRunner.
+    """
+
+    def __init__(self, flow: Flow, task_runner_cls: type = None, state_handlers=None):
+        super().__init__(
+            flow, task_runner_cls=ReportingTaskRunner, state_handlers=state_handlers
+        )
+        # Give the tasks their slugs, which tell apart the tasks of the flow that have the same name
+        for flow_task, slug in flow.slugs.items():
+            flow_task.slug = flow_task.slug or slug
+
+
+def _summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize the wall time, queue wait, resource wait, retries, bytes and memory of task runs."""
+    wall_times = [run.get("finished_at") - run.get("started_at") for run in runs]
+    return {
+        "task_runs": len(runs),
+        "failed": len(
+            [run for run in runs if run.get("state") not in SUCCESSFUL_STATES]
+        ),
+        "wall_time_s": {
+            "total": round(sum(wall_times), 3),
+            "mean": round(sum(wall_times) / len(wall_times), 3),
+            "max": round(max(wall_times), 3),
+        },
+        "queue_wait_s": {
+            "total": round(sum(run.get("queue_wait") for run in runs), 3),
+            "max": round(max(run.get("queue_wait") for run in runs), 3),
+        },
+        "resource_wait_s": {
+            "total": round(sum(run.get("resource_wait") for run in runs), 3),
+            "max": round(max(run.get("resource_wait") for run in runs), 3),
+        },
+        "retries": sum(run.get("retries") for run in runs),
+        "result_bytes": sum(run.get("result_bytes") for run in runs)
+        if all(run.get("result_bytes") is not None for run in runs)
+        else None,
+        "peak_worker_memory_bytes": max(run.get("peak_worker_memory") for run in runs),
+    }
+
+
+def _get_critical_path(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Get the critical path of a flow run: from the task run that finished last, the chain of
+    upstream task runs that each task run waited on.
+    """
+    if not runs:
+        return {"wall_time_s": 0, "task_runs": []}
+    runs_by_name = {run.get("task_run"): run for run in runs}
+    path = [max(runs, key=lambda run: run.get("finished_at"))]
+    while path[-1].get("waited_on") in runs_by_name and len(path) <= len(runs):
+        path.append(runs_by_name.get(path[-1].get("waited_on")))
+    path.reverse()
+    return {
+        "wall_time_s": round(
+            path[-1].get("finished_at") - path[0].get("started_at"), 3
+        ),
+        "task_runs": [
+            {
+                "task_run": run.get("task_run"),
+                "spreadsheet_id": run.get("spreadsheet_id"),
+                "wall_time_s": round(run.get("finished_at") - run.get("started_at"), 3),
+                "queue_wait_s": round(run.get("queue_wait"), 3),
+            }
+            for run in path
+        ],
+    }
+
+
+def create_run_report(flow: Flow, state: State, wall_time: float) -> Dict[str, Any]:
+    """
+    Create the report of a flow run from the stats its task runs recorded.
+
+    Parameters
+    ----------
+    flow: Flow
+        The flow.
+    state: State
+        The final state of the flow run, with the final state of every task.
+    wall_time: float
+        The duration of the flow run, in seconds.
+
+    Returns
+    -------
+    report: Dict[str, Any]
+        The summary of the task runs of each task and of each spreadsheet, slowest first,
+        the peak memory of each worker, and the critical path of the flow run.
+    """
+    # Skip the runs of the mapped parents, their children are reported
+    runs = [
+        run_stats
+        for task_state in (
+            state.result if isinstance(state.result, dict) else {}
+        ).values()
+        for run_stats in _get_run_stats(task_state)
+    ]
+    runs_by_task: Dict[str, List[Dict[str, Any]]] = {}
+    runs_by_spreadsheet: Dict[str, List[Dict[str, Any]]] = {}
+    workers: Dict[int, int] = {}
+    for run in runs:
+        runs_by_task.setdefault(run.get("task"), []).append(run)
+        if run.get("spreadsheet_id"):
+            runs_by_spreadsheet.setdefault(run.get("spreadsheet_id"), []).append(run)
+        workers[run.get("worker")] = max(
+            workers.get(run.get("worker"), 0), run.get("peak_worker_memory")
+        )
+    return {
+        "flow": flow.name,
+        "state": type(state).__name__,
+        "wall_time_s": round(wall_time, 3),
+        "tasks": sorted(
+            [
+                {"task": task, **_summarize_runs(task_runs)}
+                for task, task_runs in runs_by_task.items()
+            ],
+            key=lambda summary: summary.get("wall_time_s").get("total"),
+            reverse=True,
+        ),
+        "spreadsheets": sorted(
+            [
+                {"spreadsheet_id": spreadsheet_id, **_summarize_runs(spreadsheet_runs)}
+                for spreadsheet_id, spreadsheet_runs in runs_by_spreadsheet.items()
+            ],
+            key=lambda summary: summary.get("wall_time_s").get("total"),
+            reverse=True,
+        ),
+        "workers": [
+            {"worker": worker, "peak_memory_bytes": peak_memory}
+            for worker, peak_memory in sorted(workers.items())
+        ],
+        "critical_path": _get_critical_path(runs),
+    }
+
+
+def run_flow(
+    flow: Flow,
+    executor: Executor,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    context: Optional[Dict[str, Any]] = None,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+) -> State:
+    """
+    Run a flow, and write the report of its task runs as JSON, whether the flow run succeeded or not.
+
+    Parameters
+    ----------
+    flow: Flow
+        The flow.
+    executor: Executor
+        The executor to run the flow's tasks on.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report. The report isn't written if None.
+    context: Optional[Dict[str, Any]] = None
+        The prefect context of the flow run.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the result of each task run, by pickling it once more.
+        The sizes in the report are None otherwise.
+
+    Returns
+    -------
+    state: State
+        The final state of the flow run.
+    """
+    started_at = time.time()
+    state = flow.run(
+        executor=executor,
+        runner_cls=ReportingFlowRunner,
+        context={
+            **(context or {}),
+            RESOURCE_LIMITS_KEY: resource_limits or DEFAULT_RESOURCE_LIMITS,
+            MEASURE_RESULT_BYTES_KEY: measure_result_bytes,
+        },
+    )
+    if run_report_path:
+        with open(run_report_path, "w") as report_file:
+            json.dump(
+                create_run_report(flow, state, time.time() - started_at),
+                report_file,
+                indent=2,
+            )
+        log.info(f"Wrote the run report to {run_report_path}.")
+    return state
+
+
+def read_spreadsheet_wall_times(run_report_path: Optional[str]) -> Dict[str, float]:
+    """
+    Read the total wall time of the task runs of each spreadsheet from the report of an earlier flow run.
+
+    Parameters
+    ----------
+    run_report_path: Optional[str]
+        The path of the JSON report.
+
+    Returns
+    -------
+    wall_times: Dict[str, float]
+        The wall time of each spreadsheet in the report, in seconds. Empty if there is no report.
+    """
+    if not run_report_path or not os.path.exists(run_report_path):
+        log.warning(f"Found no run report at {run_report_path}.")
+        return {}
+    with open(run_report_path) as report_file:
+        report = json.load(report_file)
+    return {
+        spreadsheet.get("spreadsheet_id"): spreadsheet.get("wall_time_s").get("total")
+        for spreadsheet in report.get("spreadsheets", [])
+    }
@@ -0,0 +1,503 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from prefect import Flow, Task, task, unmapped
+from prefect.executors import Executor
+from prefect.triggers import always_run
+
+from ..databases.constants import LoadMode
+from ..utils.exceptions import ErrorInfo
+from .checkpoints import Checkpoint, CheckpointStage, get_checkpoint_task_args
+from .constants import (
+    BULK_LOAD_WRITE_CONCERN,
+    LOAD_METRICS_REPORT_PATH,
+    RUN_REPORT_PATH,
+    ResourceType,
+    SpreadsheetOrder,
+)
+from .exceptions import PrefectFlowFailure
+from .executors import create_executor
+from .run_report import read_spreadsheet_wall_times, run_flow
+from .utils import (
+    DB_CLIENT_KEY,
+    SPREADSHEETS_KEY,
+    _create_database,
+    _create_generation,
+    _create_load_metrics_report_task,
+    _extract,
+    _find_changed_spreadsheets,
+    _load_spreadsheets_in_phases,
+    _get_spreadsheet_ids,
+    _load_deferred_composites,
+    _log_spreadsheets,
+    _materialize_institutions,
+    _prune_generations,
+    _save_spreadsheet_fingerprints,
+    _stream_spreadsheet,
+    add_spreadsheet_order_tasks,
+)
+
+###############################################################################
+
+logging.basicConfig(
+    level=logging.INFO, format="[%(levelname)4s:%(lineno)4s %(asctime)s] %(message)s"
+)
+log = logging.getLogger()
+
+###############################################################################
+
+# Tasks
+
+
+@task(tags=[ResourceType.mongo])
+def _clean_up(db_connection_url: str):
+    """
+    Prefect Task to delete all documents from db.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    """
+    database = _create_database(db_connection_url)
+    database.clean_up()
+    database.close_connection()
+
+
+@task(tags=[ResourceType.mongo])
+def _prepare_shadow_collections(db_connection_url: str):
+    """
+    Prefect Task to drop the shadow collections left over from a previous run.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    """
+    database = _create_database(db_connection_url)
+    database.prepare_shadow_collections()
+    database.close_connection()
+
+
+@task(tags=[ResourceType.mongo])
+def _swap_shadow_collections(db_connection_url: str):
+    """
+    Prefect Task to index the shadow collections and rename them over the live collections.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    """
+    database = _create_database(db_connection_url)
+    database.swap_shadow_collections()
+    database.close_connection()
+
+
+@task(tags=[ResourceType.mongo])
+def _drop_secondary_indexes(
+    db_connection_url: str,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Prefect Task to drop the secondary indexes the loaders don't need before a bulk load,
+    and to create the ones they need.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+
+    Returns
+    -------
+    index_specs: Dict[str, Dict[str, Dict[str, Any]]]
+        The index information of the dropped indexes, by collection and index name.
+    """
+    database = _create_database(db_connection_url)
+    index_specs = database.drop_secondary_indexes()
+    database.create_indexes()
+    database.close_connection()
+    return index_specs
+
+
+@task(trigger=always_run, tags=[ResourceType.mongo])
+def _finish_bulk_load(
+    db_connection_url: str,
+    index_specs: Union[Dict[str, Dict[str, Dict[str, Any]]], Exception],
+):
+    """
+    Prefect Task to rebuild the secondary indexes dropped for a bulk load, and wait for
+    the loaded documents to be acknowledged by a majority of the replica set.
+    Runs even if the load failed, so that the indexes are always rebuilt.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    index_specs: Union[Dict[str, Dict[str, Dict[str, Any]]], Exception]
+        The index information of the dropped indexes, by collection and index name.
+        The error of _drop_secondary_indexes if it failed, having rebuilt what it dropped.
+    """
+    database = _create_database(db_connection_url)
+    if isinstance(index_specs, Exception):
+        log.warning("No secondary indexes to rebuild, dropping them failed.")
+    else:
+        database.create_secondary_indexes(index_specs)
+    database.write_barrier()
+    database.close_connection()
+
+
+def _stream_spreadsheets(
+    spreadsheets_data: Task,
+    db_connection_url: str,
+    shadow: bool,
+    skip_unchanged: bool,
+    write_concern: Optional[int],
+    generation: Optional[Task],
+) -> Tuple[Task, List[Task]]:
+    """
+    Add the tasks that load each spreadsheet on its own, as soon as it is extracted, to the
+    current flow. The composite sheets that refer to institutions of other spreadsheets
+    wait only for the spreadsheets of those institutions to load.
+    With a generation, the documents of older generations are pruned once every spreadsheet has loaded.
+
+    Parameters
+    ----------
+    spreadsheets_data: Task
+        The task that extracts the sheets data of every spreadsheet.
+    db_connection_url: str
+        The DB's connection url str.
+    shadow: bool
+        Whether to load into the shadow collections.
+    skip_unchanged: bool
+        Whether to write only new or changed documents.
+    write_concern: Optional[int]
+        The number of acknowledgments, without journaling, each write waits for.
+    generation: Optional[Task]
+        The task that creates the generation of the run, stamped on every written document.
+
+    Returns
+    -------
+    load_task: Task
+        The last task of the load.
+    load_tasks: List[Task]
+        The tasks that load the sheets, and return their load metrics.
+    """
+    # The id the spreadsheets record their deferred composite sheets under
+    run = _create_generation()
+    # Transform and load each spreadsheet, institutions first
+    spreadsheet_loads = _stream_spreadsheet.map(
+        spreadsheets_data,
+        unmapped(db_connection_url),
+        unmapped(run),
+        unmapped(shadow),
+        unmapped(skip_unchanged),
+        unmapped(write_concern),
+        unmapped(generation),
+    )
+    # Load the deferred composite sheets no spreadsheet loaded, e.g. with a missing institution
+    load_deferred_composites_task = _load_deferred_composites(
+        db_connection_url,
+        run,
+        shadow,
+        skip_unchanged,
+        write_concern,
+        generation,
+        upstream_tasks=[spreadsheet_loads],
+    )
+    load_task = load_deferred_composites_task
+    if generation is not None:
+        # Delete the documents that weren't loaded by this run
+        load_task = _prune_generations(
+            db_connection_url,
+            generation,
+            upstream_tasks=[load_deferred_composites_task],
+        )
+    return load_task, [
+        spreadsheet_loads,
+        load_deferred_composites_task,
+    ]
+
+
+def add_sigla_pipeline_tasks(
+    spreadsheet_ids: Task,
+    spreadsheets_data: Task,
+    db_connection_url: str,
+    load_mode: str = LoadMode.clean_up,
+    bulk_load: bool = False,
+    write_concern: int = BULK_LOAD_WRITE_CONCERN,
+    materialize: bool = False,
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH,
+    streaming: bool = False,
+    checkpoint: Optional[Checkpoint] = None,
+) -> List[Task]:
+    """
+    Add the tasks that load the extracted spreadsheets into the db to the current flow.
+    The db is set up, e.g. cleaned up, before the spreadsheets are extracted.
+
+    Parameters
+    ----------
+    spreadsheet_ids: Task
+        The task that gets the spreadsheet ids.
+    spreadsheets_data: Task
+        The task that extracts the sheets data of every spreadsheet.
+    db_connection_url: str
+        The DB's connection url str.
+    load_mode: str = LoadMode.clean_up
+        How to replace the documents in the db. See run_sigla_pipeline.
+    bulk_load: bool = False
+        Whether to load with the bulk-load profile, for the clean-up load mode.
+    write_concern: int = BULK_LOAD_WRITE_CONCERN
+        The number of acknowledgments, without journaling, each write of a bulk load waits for.
+    materialize: bool = False
+        Whether to rebuild the institution pages collection once the documents are loaded.
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH
+        The path of the JSON report of the database operations made by the load.
+    streaming: bool = False
+        Whether to load each spreadsheet on its own as soon as it is extracted.
+    checkpoint: Optional[Checkpoint] = None
+        Where to persist the transformed sheets, if anywhere.
+
+    Returns
+    -------
+    finalize_tasks: List[Task]
+        The last tasks that write to the db.
+    """
+    shadow = load_mode == LoadMode.swap
+    skip_unchanged = load_mode == LoadMode.diff
+    incremental = load_mode == LoadMode.incremental
+    load_write_concern = write_concern if bulk_load else None
+    generation = (
+        _create_generation()
+        if load_mode in [LoadMode.generation, LoadMode.incremental]
+        else None
+    )
+    set_up_tasks = []
+    if shadow:
+        # Drop leftover shadow collections
+        set_up_tasks.append(_prepare_shadow_collections(db_connection_url))
+    elif load_mode == LoadMode.clean_up:
+        clean_up_upstream_tasks = []
+        if bulk_load:
+            # Drop the secondary indexes, before deleting the documents they index
+            index_specs = _drop_secondary_indexes(db_connection_url)
+            clean_up_upstream_tasks.append(index_specs)
+        # Delete all documents from db
+        set_up_tasks.append(
+            _clean_up(db_connection_url, upstream_tasks=clean_up_upstream_tasks)
+        )
+    # Extract the sheets data once the db is set up
+    for set_up_task in set_up_tasks:
+        spreadsheets_data.set_upstream(set_up_task)
+
+    if streaming:
+        # Load each spreadsheet as soon as it is extracted
+        load_task, load_tasks = _stream_spreadsheets(
+            spreadsheets_data,
+            db_connection_url,
+            shadow,
+            skip_unchanged,
+            load_write_concern,
+            generation,
+        )
+    else:
+        loaded_spreadsheets_data = spreadsheets_data
+        pruned_spreadsheet_ids = None
+        if incremental:
+            # Load only the new, changed and dependent spreadsheets, and prune the removed ones
+            (
+                loaded_spreadsheets_data,
+                pruned_spreadsheet_ids,
+            ) = _find_changed_spreadsheets(
+                spreadsheet_ids, spreadsheets_data, db_connection_url
+            )
+        # Load every spreadsheet's institutions, then every spreadsheet's composites
+        load_task, load_tasks = _load_spreadsheets_in_phases(
+            loaded_spreadsheets_data,
+            db_connection_url,
+            shadow,
+            skip_unchanged,
+            load_write_concern,
+            generation,
+            checkpoint,
+            pruned_spreadsheet_ids,
+        )
+    # Report the database operations of the load
+    _create_load_metrics_report_task(load_tasks, metrics_report_path)
+    finalize_tasks = [load_task]
+    if shadow:
+        # Replace the live collections with the loaded shadow collections
+        finalize_tasks.append(
+            _swap_shadow_collections(db_connection_url, upstream_tasks=[load_task])
+        )
+    # Store the fingerprints of the loaded spreadsheets, for the next incremental run
+    finalize_tasks.append(
+        _save_spreadsheet_fingerprints(
+            db_connection_url,
+            spreadsheet_ids,
+            spreadsheets_data,
+            upstream_tasks=finalize_tasks.copy(),
+        )
+    )
+    if materialize:
+        # Rebuild the institution pages from the live collections
+        finalize_tasks.append(
+            _materialize_institutions(
+                db_connection_url, upstream_tasks=finalize_tasks.copy()
+            )
+        )
+    if bulk_load:
+        # Rebuild the dropped indexes and make the load durable
+        finalize_tasks.append(
+            _finish_bulk_load(
+                db_connection_url,
+                index_specs,
+                upstream_tasks=[load_task],
+            )
+        )
+    # Log spreadsheets that were loaded
+    _log_spreadsheets(spreadsheets_data, upstream_tasks=[load_task])
+    return finalize_tasks
+
+
+def run_sigla_pipeline(
+    master_spreadsheet_id: str,
+    google_api_credentials_path: str,
+    db_connection_url: str,
+    load_mode: str = LoadMode.clean_up,
+    bulk_load: bool = False,
+    write_concern: int = BULK_LOAD_WRITE_CONCERN,
+    materialize: bool = False,
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH,
+    executor: Optional[Executor] = None,
+    run_report_path: Optional[str] = RUN_REPORT_PATH,
+    streaming: bool = False,
+    checkpoint: Optional[Checkpoint] = None,
+    spreadsheet_order: str = SpreadsheetOrder.master,
+    resource_limits: Optional[Dict[str, int]] = None,
+    measure_result_bytes: bool = False,
+    db_client: Optional[Any] = None,
+    spreadsheets: Optional[Any] = None,
+):
+    """
+    Run the SIGLA ETL pipeline
+
+    Parameters
+    ----------
+    master_spreadsheet_id:
+        The master spreadsheet id.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    db_connection_url: str
+        The DB's connection url str.
+    load_mode: str = LoadMode.clean_up
+        How to replace the documents in the db. `clean-up` deletes all documents before loading.
+        `swap` loads into shadow collections and renames them over the live collections at the end.
+        `diff` writes only new or changed documents and deletes the stale ones of each loaded sheet.
+        `generation` stamps the run's generation on every loaded document, and deletes the documents
+        of older generations once every spreadsheet has loaded.
+        `incremental` loads only the spreadsheets whose contents changed since the last run,
+        and the spreadsheets with composite sheets that refer to their institutions, and deletes
+        the documents of the spreadsheets that were removed from the master spreadsheet.
+    bulk_load: bool = False
+        Whether to load with the bulk-load profile, for the clean-up load mode. The secondary indexes
+        the loaders don't need are dropped before loading and rebuilt at the end, the documents are
+        written with a relaxed write concern, and the load ends with a majority-acknowledged write.
+    write_concern: int = BULK_LOAD_WRITE_CONCERN
+        The number of acknowledgments, without journaling, each write of a bulk load waits for.
+    materialize: bool = False
+        Whether to rebuild the institution pages collection once the documents are loaded.
+    metrics_report_path: str = LOAD_METRICS_REPORT_PATH
+        The path of the JSON report of the database operations made by the load.
+    executor: Optional[Executor] = None
+        The executor to run the flow's tasks on. A new local Dask cluster if None.
+    run_report_path: Optional[str] = RUN_REPORT_PATH
+        The path of the JSON report of the flow's task runs. The report isn't written if None.
+    streaming: bool = False
+        Whether to load each spreadsheet on its own as soon as it is extracted, instead of
+        loading the institution sheets of every spreadsheet before any composite sheet.
+    checkpoint: Optional[Checkpoint] = None
+        Where to persist the spreadsheet ids, the extracted spreadsheets and the transformed sheets.
+        The stages whose outputs were persisted by an earlier attempt of the run are skipped.
+    spreadsheet_order: str = SpreadsheetOrder.master
+        The order the spreadsheets are extracted and loaded in. `master` keeps the order of the master spreadsheet.
+        `size` orders them largest first, by the cells of data their meta data bound, read in a pre-pass.
+        `previous-run` orders them longest first, by their wall time in the run report of the previous run.
+    resource_limits: Optional[Dict[str, int]] = None
+        The number of task runs that can use each resource at the same time. DEFAULT_RESOURCE_LIMITS if None.
+    measure_result_bytes: bool = False
+        Whether to measure the size of the results of the task runs in the run report.
+    db_client: Optional[Any] = None
+        The client the tasks use in place of connecting to the db, e.g. an InMemoryClient.
+        The tasks share it, so it needs the threads executor.
+    spreadsheets: Optional[Any] = None
+        The spreadsheets resource the tasks use in place of the Google Sheets API's, e.g. SyntheticSpreadsheets.
+        The tasks share it, so it needs the threads executor.
+    """
+    previous_wall_times = (
+        read_spreadsheet_wall_times(run_report_path)
+        if spreadsheet_order == SpreadsheetOrder.previous_run
+        else None
+    )
+    if checkpoint:
+        log.info(
+            f"Checkpointing run {checkpoint.run_id} to {checkpoint.checkpoint_dir}. "
+            f"Rerun with --resume {checkpoint.run_id} to resume it."
+        )
+    log.info("Finished pipeline set up, start running pipeline")
+    log.info("=" * 80)
+    # Setup workflow
+    with Flow("SIGLA Data Pipeline") as flow:
+        # Get spreadsheet ids
+        spreadsheet_ids = _get_spreadsheet_ids(
+            master_spreadsheet_id,
+            google_api_credentials_path,
+            task_args=get_checkpoint_task_args(
+                checkpoint, CheckpointStage.spreadsheet_ids
+            ),
+        )
+        # Order the spreadsheets, e.g. largest first
+        spreadsheet_ids = add_spreadsheet_order_tasks(
+            spreadsheet_ids,
+            google_api_credentials_path,
+            spreadsheet_order,
+            previous_wall_times,
+        )
+        # Extract sheets data.
+        # Get back list of list of SheetData
+        spreadsheets_data = _extract.map(
+            spreadsheet_ids,
+            unmapped(google_api_credentials_path),
+            task_args=get_checkpoint_task_args(checkpoint, CheckpointStage.extract),
+        )
+        # Load the sheets data
+        add_sigla_pipeline_tasks(
+            spreadsheet_ids,
+            spreadsheets_data,
+            db_connection_url,
+            load_mode,
+            bulk_load,
+            write_concern,
+            materialize,
+            metrics_report_path,
+            streaming,
+            checkpoint,
+        )
+
+    # Run the flow
+    state = run_flow(
+        flow,
+        executor or create_executor(),
+        run_report_path,
+        context={
+            "checkpointing": checkpoint is not None,
+            DB_CLIENT_KEY: db_client,
+            SPREADSHEETS_KEY: spreadsheets,
+        },
+        resource_limits=resource_limits,
+        measure_result_bytes=measure_result_bytes,
+    )
+    if state.is_failed():
+        raise PrefectFlowFailure(ErrorInfo({"flow_name": flow.name}))
@@ -3,16 +3,29 @@
 
 import logging
 from datetime import timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from prefect import task
+import prefect
+from prefect import Task, flatten, task, unmapped
 from prefect.tasks.control_flow import FilterTask
+from prefect.tasks.core.collections import List as ListTask
+from prefect.triggers import always_run
 
 from ..databases import MongoDBDatabase
+from ..databases.constants import DatabaseCollection as db_collection
+from ..databases.constants import DocumentField, InstitutionField
+from ..databases.metrics import LoadMetrics
+from ..databases.mongodb_database import INSTITUTION_FORMATS
+from ..databases.utils import create_generation, hash_document
+from ..databases.write_buffer import SheetLoadResult
 from ..institution_extracters import GoogleSheetsInstitutionExtracter
-from ..institution_extracters.constants import MetaDataField
+from ..institution_extracters.constants import GoogleSheetsFormat as gs_format
+from ..institution_extracters.constants import GoogleSheetsInfoField, MetaDataField
 from ..institution_extracters.utils import FormattedSheetData, SheetData
-from ..utils.exceptions import ErrorInfo, InvalidWorkflowInputs
+from ..utils.exceptions import BaseError, ErrorInfo, InvalidWorkflowInputs
+from .checkpoints import Checkpoint, CheckpointStage, get_checkpoint_task_args
+from .constants import ResourceType, SpreadsheetOrder
+from .exceptions import SheetsLoadFailure
 
 ###############################################################################
 
@@ -23,8 +36,57 @@ log = logging.getLogger()
 
 ######################################################
 
+# The number of sheets loaded together by a load task
+LOAD_BATCH_SIZE = 20
+# The keys of the clients, in the context of a flow run, the tasks use in place of connecting to
+# MongoDB and the Google Sheets API, e.g. an InMemoryClient and SyntheticSpreadsheets for tests and benchmarks
+DB_CLIENT_KEY = "db_client"
+SPREADSHEETS_KEY = "spreadsheets"
 
-@task
+
+def _create_database(db_connection_url: str, **kwargs) -> MongoDBDatabase:
+    """
+    Create the database of a task, with the client of the flow run's context if it has one.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    kwargs:
+        The other arguments of MongoDBDatabase.
+
+    Returns
+    -------
+    database: MongoDBDatabase
+        The database.
+    """
+    return MongoDBDatabase(
+        db_connection_url, client=prefect.context.get(DB_CLIENT_KEY), **kwargs
+    )
+
+
+def _create_extracter(
+    google_api_credentials_path: str,
+) -> GoogleSheetsInstitutionExtracter:
+    """
+    Create the extracter of a task, with the spreadsheets of the flow run's context if it has them.
+
+    Parameters
+    ----------
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+
+    Returns
+    -------
+    extracter: GoogleSheetsInstitutionExtracter
+        The extracter.
+    """
+    return GoogleSheetsInstitutionExtracter(
+        google_api_credentials_path, spreadsheets=prefect.context.get(SPREADSHEETS_KEY)
+    )
+
+
+@task(tags=[ResourceType.sheets])
 def _get_spreadsheet_ids(
     master_spreadsheet_id: str,
     google_api_credentials_path: str,
@@ -60,7 +122,7 @@ def _get_spreadsheet_ids(
     elif master_spreadsheet_id:
         # If spreadsheet ids are not provided
         # Create a connection to the google sheets reader
-        google_sheets_institution_extracter = GoogleSheetsInstitutionExtracter(
+        google_sheets_institution_extracter = _create_extracter(
             google_api_credentials_path
         )
         # Get the list of spreadsheets ids from the master spreadsheet
@@ -72,7 +134,7 @@ def _get_spreadsheet_ids(
     return spreadsheet_ids
 
 
-@task(max_retries=5, retry_delay=timedelta(seconds=100))
+@task(max_retries=5, retry_delay=timedelta(seconds=100), tags=[ResourceType.sheets])
 def _extract(spreadsheet_id: str, google_api_credentials_path: str) -> List[SheetData]:
     """
     Prefect Task to extract data from a spreadsheet.
@@ -91,10 +153,109 @@ def _extract(spreadsheet_id: str, google_api_credentials_path: str) -> List[Shee
         to view its attributes.
     """
     # Get the spreadsheet data.
-    extracter = GoogleSheetsInstitutionExtracter(google_api_credentials_path)
+    extracter = _create_extracter(google_api_credentials_path)
     return extracter.get_spreadsheet_data(spreadsheet_id)
 
 
+@task(max_retries=5, retry_delay=timedelta(seconds=100), tags=[ResourceType.sheets])
+def _estimate_spreadsheet_size(
+    spreadsheet_id: str, google_api_credentials_path: str
+) -> int:
+    """
+    Prefect Task to estimate the size of a spreadsheet from the meta data of its sheets.
+
+    Parameters
+    ----------
+    spreadsheet_id: str
+        The spreadsheet_id.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+
+    Returns
+    -------
+    size: int
+        The number of cells of data of the spreadsheet.
+    """
+    extracter = _create_extracter(google_api_credentials_path)
+    return extracter.get_spreadsheet_size(spreadsheet_id)
+
+
+@task
+def _order_spreadsheet_ids(
+    spreadsheet_ids: List[str],
+    spreadsheet_sizes: Union[List[float], Dict[str, float]],
+) -> List[str]:
+    """
+    Prefect Task to order the spreadsheet ids largest spreadsheet first,
+    so that the largest spreadsheets are extracted and loaded first instead of last.
+
+    Parameters
+    ----------
+    spreadsheet_ids: List[str]
+        The list of spreadsheet ids, in the order of the master spreadsheet.
+    spreadsheet_sizes: Union[List[float], Dict[str, float]]
+        The size of each spreadsheet, in the order of the ids, or by spreadsheet id.
+        The spreadsheets missing from the sizes by id are ordered first, since their size is unknown.
+
+    Returns
+    -------
+    spreadsheet_ids: List[str]
+        The list of spreadsheet ids, largest first. The spreadsheets of the same size keep their order.
+    """
+    if isinstance(spreadsheet_sizes, dict):
+        spreadsheet_sizes = [
+            spreadsheet_sizes.get(spreadsheet_id, float("inf"))
+            for spreadsheet_id in spreadsheet_ids
+        ]
+    ordered_spreadsheet_ids = [
+        spreadsheet_id
+        for _, spreadsheet_id in sorted(
+            zip(spreadsheet_sizes, spreadsheet_ids),
+            key=lambda size_and_id: size_and_id[0],
+            reverse=True,
+        )
+    ]
+    log.info(f"Ordered the spreadsheets largest first: {ordered_spreadsheet_ids}")
+    return ordered_spreadsheet_ids
+
+
+def add_spreadsheet_order_tasks(
+    spreadsheet_ids: Task,
+    google_api_credentials_path: str,
+    spreadsheet_order: str,
+    previous_wall_times: Optional[Dict[str, float]] = None,
+) -> Task:
+    """
+    Add the tasks that order the spreadsheets to extract and load to the current flow.
+
+    Parameters
+    ----------
+    spreadsheet_ids: Task
+        The task that gets the spreadsheet ids, in the order of the master spreadsheet.
+    google_api_credentials_path: str
+        The path to Google API credentials file needed to read Google Sheets.
+    spreadsheet_order: str
+        `master` keeps the order of the master spreadsheet. `size` orders the spreadsheets largest first,
+        by the cells of data their meta data bound. `previous-run` orders them longest first,
+        by the wall time of their task runs in the previous run.
+    previous_wall_times: Optional[Dict[str, float]] = None
+        The wall time of each spreadsheet in the previous run, for the previous-run order.
+
+    Returns
+    -------
+    spreadsheet_ids: Task
+        The task that gets the ordered spreadsheet ids.
+    """
+    if spreadsheet_order == SpreadsheetOrder.size:
+        spreadsheet_sizes = _estimate_spreadsheet_size.map(
+            spreadsheet_ids, unmapped(google_api_credentials_path)
+        )
+        return _order_spreadsheet_ids(spreadsheet_ids, spreadsheet_sizes)
+    if spreadsheet_order == SpreadsheetOrder.previous_run:
+        return _order_spreadsheet_ids(spreadsheet_ids, previous_wall_times or {})
+    return spreadsheet_ids
+
+
 @task
 def _transform(sheet_data: SheetData) -> FormattedSheetData:
     """
@@ -114,45 +275,612 @@ def _transform(sheet_data: SheetData) -> FormattedSheetData:
 
 
 @task
+def _batch_sheets_data(
+    formatted_sheets_data: List[FormattedSheetData],
+    batch_size: int = LOAD_BATCH_SIZE,
+) -> List[List[FormattedSheetData]]:
+    """
+    Prefect task to split formatted sheets data into batches, each loaded by one task.
+
+    Parameters
+    ----------
+    formatted_sheets_data: List[FormattedSheetData]
+        The list of formatted sheet data.
+    batch_size: int = LOAD_BATCH_SIZE
+        The maximum number of sheets in a batch.
+
+    Returns
+    -------
+    batches: List[List[FormattedSheetData]]
+        The batches of formatted sheet data.
+    """
+    return [
+        formatted_sheets_data[i : i + batch_size]
+        for i in range(0, len(formatted_sheets_data), batch_size)
+    ]
+
+
+def _load_sheets_data(
+    database: MongoDBDatabase,
+    formatted_sheets_data: List[FormattedSheetData],
+    variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+) -> LoadMetrics:
+    """
+    Load formatted sheets data into the database, log the result of each sheet,
+    and raise if any sheet failed to load.
+
+    Parameters
+    ----------
+    database: MongoDBDatabase
+        The database to load into.
+    formatted_sheets_data: List[FormattedSheetData]
+        The list of formatted sheet data.
+    variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+        The composite variable references resolved ahead of time.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the load.
+    """
+    results = database.load_many(formatted_sheets_data, variable_references)
+    database.close_connection()
+    _check_load_results(results)
+    return database.metrics
+
+
+def _check_load_results(results: List[SheetLoadResult]):
+    """
+    Log the result of each sheet, and raise if any sheet failed to load.
+
+    Parameters
+    ----------
+    results: List[SheetLoadResult]
+        The result of loading each sheet.
+    """
+    failed_results = [result for result in results if result.error]
+    for result in results:
+        if result.error:
+            log.error(f"Failed to load sheet: {result.sheet_title}. {result.error}")
+        else:
+            log.info(
+                f"Loaded sheet: {result.sheet_title} with {result.request_count} requests, "
+                f"{result.upserted_count} new documents."
+            )
+    if failed_results:
+        raise SheetsLoadFailure(
+            ErrorInfo(
+                {
+                    GoogleSheetsInfoField.sheet_title: ", ".join(
+                        result.sheet_title for result in failed_results
+                    )
+                }
+            )
+        )
+
+
+@task(tags=[ResourceType.mongo])
 def _load_institutions_data(
-    formatted_sheet_data: FormattedSheetData,
+    formatted_sheets_data: List[FormattedSheetData],
     db_connection_url: str,
-):
+    shadow: bool = False,
+    skip_unchanged: bool = False,
+    write_concern: Optional[int] = None,
+    generation: Optional[str] = None,
+) -> LoadMetrics:
     """
-    Prefect task to oad the institutional formatted sheet data into the database.
+    Prefect task to load a batch of institutional formatted sheet data into the database.
 
     Parameters
     ----------
-    formatted_sheet_data: FormattedSheetData
-        The sheet's formatted data.
+    formatted_sheets_data: List[FormattedSheetData]
+        The sheets' formatted data.
+    db_connection_url: str
+        The DB's connection url str.
+    shadow: bool = False
+        Whether to load into the shadow collections.
+    skip_unchanged: bool = False
+        Whether to write only new or changed documents.
+    write_concern: Optional[int] = None
+        The number of acknowledgments, without journaling, each write waits for.
+        The database's default write concern is used if None.
+    generation: Optional[str] = None
+        The generation of the run, stamped on every written document.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the load.
+    """
+    database = _create_database(
+        db_connection_url,
+        shadow=shadow,
+        skip_unchanged=skip_unchanged,
+        write_concern=write_concern,
+        generation=generation,
+    )
+    return _load_sheets_data(database, formatted_sheets_data)
+
+
+@task(tags=[ResourceType.mongo])
+def _resolve_variable_references(
+    composite_sheets_data: List[FormattedSheetData],
+    db_connection_url: str,
+    shadow: bool = False,
+    write_concern: Optional[int] = None,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Prefect task to resolve the variable references of all composite sheets in one batch.
+
+    Parameters
+    ----------
+    composite_sheets_data: List[FormattedSheetData]
+        The composite sheets' formatted data.
     db_connection_url: str
         The DB's connection url str.
+    shadow: bool = False
+        Whether to resolve against the shadow collections.
+    write_concern: Optional[int] = None
+        The number of acknowledgments, without journaling, each write waits for.
+        The database's default write concern is used if None.
+
+    Returns
+    -------
+    variable_references: Dict[Tuple[str, str], Dict[str, Any]]
+        The variable reference of each composite sheet, keyed by (spreadsheet_id, sheet_id).
     """
-    database = MongoDBDatabase(db_connection_url)
-    database.load(formatted_sheet_data)
+    database = _create_database(
+        db_connection_url, shadow=shadow, write_concern=write_concern
+    )
+    variable_references = database.resolve_variable_references(composite_sheets_data)
     database.close_connection()
+    return variable_references
 
 
-@task
+@task(tags=[ResourceType.mongo])
 def _load_composites_data(
-    formatted_sheet_data: FormattedSheetData,
+    formatted_sheets_data: List[FormattedSheetData],
+    db_connection_url: str,
+    shadow: bool = False,
+    skip_unchanged: bool = False,
+    variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None,
+    write_concern: Optional[int] = None,
+    generation: Optional[str] = None,
+) -> LoadMetrics:
+    """
+    Prefect task to load a batch of composite formatted sheet data into the database.
+
+    Parameters
+    ----------
+    formatted_sheets_data: List[FormattedSheetData]
+        The sheets' formatted data.
+    db_connection_url: str
+        The DB's connection url str.
+    shadow: bool = False
+        Whether to load into the shadow collections.
+    skip_unchanged: bool = False
+        Whether to write only new or changed documents.
+    variable_references: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+        The variable references resolved in batch by _resolve_variable_references.
+        The reference of a sheet is looked up on its own if missing.
+    write_concern: Optional[int] = None
+        The number of acknowledgments, without journaling, each write waits for.
+        The database's default write concern is used if None.
+    generation: Optional[str] = None
+        The generation of the run, stamped on every written document.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the load.
+    """
+    database = _create_database(
+        db_connection_url,
+        shadow=shadow,
+        skip_unchanged=skip_unchanged,
+        write_concern=write_concern,
+        generation=generation,
+    )
+    return _load_sheets_data(database, formatted_sheets_data, variable_references)
+
+
+def _get_institution_key(institution: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Get the (name, country, category) an institution is referred to by."""
+    return (
+        institution.get(InstitutionField.name),
+        institution.get(InstitutionField.country),
+        institution.get(InstitutionField.category),
+    )
+
+
+def _get_referred_institution_keys(
+    meta_data: Dict[str, Any]
+) -> Set[Tuple[str, str, str]]:
+    """Get the (name, country, category) of every institution a composite sheet refers to."""
+    return {
+        _get_institution_key({**meta_data, InstitutionField.name: name.strip()})
+        for name in meta_data.get(InstitutionField.name, "").split(";")
+    }
+
+
+def _split_composite_sheets_data(
+    institution_sheets_data: List[FormattedSheetData],
+    composite_sheets_data: List[FormattedSheetData],
+) -> Tuple[List[FormattedSheetData], List[FormattedSheetData]]:
+    """
+    Split the composite sheets of a spreadsheet by whether every institution they refer to
+    is in the spreadsheet's institution sheets.
+
+    Parameters
+    ----------
+    institution_sheets_data: List[FormattedSheetData]
+        The spreadsheet's institution sheets.
+    composite_sheets_data: List[FormattedSheetData]
+        The spreadsheet's composite sheets.
+
+    Returns
+    -------
+    local_sheets_data: List[FormattedSheetData]
+        The composite sheets that refer only to the spreadsheet's institutions.
+    deferred_sheets_data: List[FormattedSheetData]
+        The composite sheets that refer to institutions of other spreadsheets.
+    """
+    institution_keys = {
+        _get_institution_key(institution)
+        for formatted_sheet_data in institution_sheets_data
+        for institution in formatted_sheet_data.formatted_data
+    }
+    local_sheets_data = []
+    deferred_sheets_data = []
+    for formatted_sheet_data in composite_sheets_data:
+        if (
+            _get_referred_institution_keys(formatted_sheet_data.meta_data)
+            <= institution_keys
+        ):
+            local_sheets_data.append(formatted_sheet_data)
+        else:
+            deferred_sheets_data.append(formatted_sheet_data)
+    return local_sheets_data, deferred_sheets_data
+
+
+@task(tags=[ResourceType.mongo])
+def _stream_spreadsheet(
+    spreadsheet_data: List[SheetData],
+    db_connection_url: str,
+    run: str,
+    shadow: bool = False,
+    skip_unchanged: bool = False,
+    write_concern: Optional[int] = None,
+    generation: Optional[str] = None,
+) -> LoadMetrics:
+    """
+    Prefect task to transform and load the sheets of a spreadsheet on its own: the institution
+    sheets, then the composite sheets that refer to them. The composite sheets that refer to
+    institutions of other spreadsheets are deferred, and loaded by the spreadsheet that loads the last
+    of their institutions. This spreadsheet loads the deferred sheets its institutions complete.
+
+    Parameters
+    ----------
+    spreadsheet_data: List[SheetData]
+        The data of every sheet of the spreadsheet.
+    db_connection_url: str
+        The DB's connection url str.
+    run: str
+        The id of the run, that the deferred composite sheets are recorded under.
+    shadow: bool = False
+        Whether to load into the shadow collections.
+    skip_unchanged: bool = False
+        Whether to write only new or changed documents.
+    write_concern: Optional[int] = None
+        The number of acknowledgments, without journaling, each write waits for.
+        The database's default write concern is used if None.
+    generation: Optional[str] = None
+        The generation of the run, stamped on every written document.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the load.
+    """
+    formatted_sheets_data = [
+        GoogleSheetsInstitutionExtracter.process_sheet_data(sheet_data)
+        for sheet_data in spreadsheet_data
+    ]
+    institution_sheets_data = [
+        formatted_sheet_data
+        for formatted_sheet_data in formatted_sheets_data
+        if formatted_sheet_data.meta_data.get(MetaDataField.format)
+        in INSTITUTION_FORMATS
+    ]
+    local_sheets_data, deferred_sheets_data = _split_composite_sheets_data(
+        institution_sheets_data,
+        [
+            formatted_sheet_data
+            for formatted_sheet_data in formatted_sheets_data
+            if formatted_sheet_data not in institution_sheets_data
+        ],
+    )
+    sheets_data = {sheet_data.sheet_id: sheet_data for sheet_data in spreadsheet_data}
+    database = _create_database(
+        db_connection_url,
+        shadow=shadow,
+        skip_unchanged=skip_unchanged,
+        write_concern=write_concern,
+        generation=generation,
+    )
+    try:
+        results = database.load_many(institution_sheets_data)
+        loaded = not any(result.error for result in results)
+        if loaded:
+            variable_references = database.resolve_variable_references(
+                local_sheets_data
+            )
+            results += database.load_many(local_sheets_data, variable_references)
+        database.defer_composite_sheets(
+            run,
+            [
+                _get_institution_key(institution)
+                for formatted_sheet_data in institution_sheets_data
+                for institution in formatted_sheet_data.formatted_data
+            ]
+            if loaded
+            else None,
+            [
+                (
+                    sheets_data[formatted_sheet_data.sheet_id],
+                    list(
+                        _get_referred_institution_keys(formatted_sheet_data.meta_data)
+                    ),
+                )
+                for formatted_sheet_data in deferred_sheets_data
+            ],
+        )
+        # Load the deferred sheets, of any spreadsheet, whose institutions have all loaded by now
+        claimed_sheets_data = [
+            GoogleSheetsInstitutionExtracter.process_sheet_data(sheet_data)
+            for sheet_data in database.claim_deferred_composite_sheets(run)
+        ]
+        variable_references = database.resolve_variable_references(claimed_sheets_data)
+        results += database.load_many(claimed_sheets_data, variable_references)
+    finally:
+        database.close_connection()
+    _check_load_results(results)
+    return database.metrics
+
+
+@task(tags=[ResourceType.mongo])
+def _load_deferred_composites(
+    db_connection_url: str,
+    run: str,
+    shadow: bool = False,
+    skip_unchanged: bool = False,
+    write_concern: Optional[int] = None,
+    generation: Optional[str] = None,
+) -> LoadMetrics:
+    """
+    Prefect task to load the composite sheets deferred by _stream_spreadsheet that no spreadsheet
+    loaded, once every spreadsheet has loaded, e.g. the ones that refer to a missing institution,
+    so that their errors are reported. The deferred sheets are deleted.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    run: str
+        The id of the run, that the deferred composite sheets are recorded under.
+    shadow: bool = False
+        Whether to load into the shadow collections.
+    skip_unchanged: bool = False
+        Whether to write only new or changed documents.
+    write_concern: Optional[int] = None
+        The number of acknowledgments, without journaling, each write waits for.
+        The database's default write concern is used if None.
+    generation: Optional[str] = None
+        The generation of the run, stamped on every written document.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the load.
+    """
+    database = _create_database(
+        db_connection_url,
+        shadow=shadow,
+        skip_unchanged=skip_unchanged,
+        write_concern=write_concern,
+        generation=generation,
+    )
+    deferred_sheets_data = [
+        GoogleSheetsInstitutionExtracter.process_sheet_data(sheet_data)
+        for sheet_data in database.claim_deferred_composite_sheets(run, claim_all=True)
+    ]
+    database.delete_deferred_composite_sheets(run)
+    log.info(f"Loading {len(deferred_sheets_data)} deferred composite sheets left.")
+    return _load_sheets_data(
+        database,
+        deferred_sheets_data,
+        database.resolve_variable_references(deferred_sheets_data),
+    )
+
+
+@task
+def _create_generation() -> str:
+    """
+    Prefect task to create the generation of the run, when the flow runs.
+
+    Returns
+    -------
+    generation: str
+        The generation id.
+    """
+    return create_generation()
+
+
+@task(tags=[ResourceType.mongo])
+def _prune_generations(
     db_connection_url: str,
+    generation: str,
+    spreadsheet_ids: Optional[List[str]] = None,
 ):
     """
-    Prefect task to load the composite formatted sheet data into the database.
+    Prefect task to delete the documents of generations older than the run's.
 
     Parameters
     ----------
-    formatted_sheet_data: FormattedSheetData
-        The sheet's formatted data.
     db_connection_url: str
         The DB's connection url str.
+    generation: str
+        The generation of the run.
+    spreadsheet_ids: Optional[List[str]] = None
+        The ids of the spreadsheets loaded by the run. Every spreadsheet is pruned if None.
     """
-    database = MongoDBDatabase(db_connection_url)
-    database.load(formatted_sheet_data)
+    database = _create_database(db_connection_url)
+    database.prune_generations(generation, spreadsheet_ids)
     database.close_connection()
 
 
+@task(tags=[ResourceType.mongo])
+def _reload_spreadsheet(
+    spreadsheet_data: List[SheetData], db_connection_url: str
+) -> LoadMetrics:
+    """
+    Prefect task to transform the sheets of a spreadsheet and reload them into the database
+    in one transaction. The spreadsheet's documents are left as they were if any sheet fails.
+
+    Parameters
+    ----------
+    spreadsheet_data: List[SheetData]
+        The data of every sheet of the spreadsheet.
+    db_connection_url: str
+        The DB's connection url str.
+
+    Returns
+    -------
+    metrics: LoadMetrics
+        The round trips of the reload.
+    """
+    database = _create_database(db_connection_url)
+    try:
+        results = database.reload_spreadsheet(
+            [
+                GoogleSheetsInstitutionExtracter.process_sheet_data(sheet_data)
+                for sheet_data in spreadsheet_data
+            ]
+        )
+    finally:
+        database.close_connection()
+    for result in results:
+        log.info(
+            f"Loaded sheet: {result.sheet_title} with {result.request_count} requests, "
+            f"{result.upserted_count} new documents."
+        )
+    return database.metrics
+
+
+@task(trigger=always_run)
+def _write_load_metrics_report(load_metrics: List[Any], metrics_report_path: str):
+    """
+    Prefect task to merge the metrics of the load tasks and write their JSON report.
+    Runs even if the load failed, with the metrics of the load tasks that succeeded.
+
+    Parameters
+    ----------
+    load_metrics: List[Any]
+        The results of the load tasks, the list of results of a mapped task,
+        or the error of a failed task.
+    metrics_report_path: str
+        The path of the JSON report.
+    """
+    metrics = LoadMetrics()
+    results = list(load_metrics) if isinstance(load_metrics, list) else []
+    while results:
+        result = results.pop()
+        if isinstance(result, list):
+            results.extend(result)
+        elif isinstance(result, LoadMetrics):
+            metrics.merge(result)
+    metrics.write_report(metrics_report_path)
+
+
+def _create_load_metrics_report_task(
+    load_tasks: List[Task], metrics_report_path: str
+) -> Task:
+    """
+    Add the task that writes the load metrics report of the load tasks to the current flow.
+
+    Parameters
+    ----------
+    load_tasks: List[Task]
+        The tasks that return LoadMetrics, mapped or not.
+    metrics_report_path: str
+        The path of the JSON report.
+
+    Returns
+    -------
+    write_load_metrics_report_task: Task
+        The task that writes the report.
+    """
+    # Gather the results of the load tasks even if some of them failed
+    load_metrics = ListTask(trigger=always_run)(*load_tasks)
+    return _write_load_metrics_report(load_metrics, metrics_report_path)
+
+
+@task(tags=[ResourceType.mongo])
+def _materialize_institutions(db_connection_url: str):
+    """
+    Prefect task to rebuild the institution pages collection from the loaded documents.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    """
+    database = _create_database(db_connection_url)
+    database.materialize_institutions()
+    database.close_connection()
+
+
+@task(tags=[ResourceType.mongo])
+def _gather_db_institutions(
+    spreadsheet_ids: List[str],
+    db_connection_url: str,
+    institution_projection: Optional[List[str]] = None,
+    variable_projection: Optional[List[str]] = None,
+    composite_variable_projection: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Prefect task to gather institutions, with their variables and composite variable data,
+    from the database.
+
+    Parameters
+    ----------
+    spreadsheet_ids: List[str]
+        The spreadsheet ids source of the institutions.
+    db_connection_url: str
+        The DB's connection url str.
+    institution_projection: Optional[List[str]] = None
+        The institution fields to gather. All fields are gathered if None.
+    variable_projection: Optional[List[str]] = None
+        The variable fields to gather. All fields are gathered if None.
+    composite_variable_projection: Optional[List[str]] = None
+        The composite variable row fields to gather. All fields are gathered if None.
+
+    Returns
+    -------
+    institutions: List[Dict[str, Any]]
+        The list of institutions with their variables (and any composite variable data).
+    """
+    database = _create_database(db_connection_url)
+    institutions = database.find_institutions_with_variables(
+        spreadsheet_ids,
+        institution_projection=institution_projection,
+        variable_projection=variable_projection,
+        composite_variable_projection=composite_variable_projection,
+    )
+    database.close_connection()
+    return institutions
+
+
 @task
 def _log_spreadsheets(spreadsheets_data: List[List[SheetData]]):
     """
@@ -187,3 +915,324 @@ def _create_filter_task(gs_formats: List[str]) -> FilterTask:
     return FilterTask(
         filter_func=lambda x: x.meta_data.get(MetaDataField.format) in gs_formats
     )
+
+
+def _fingerprint_spreadsheet(spreadsheet_data: List[SheetData]) -> str:
+    """
+    Fingerprint the extracted contents of a spreadsheet.
+
+    Parameters
+    ----------
+    spreadsheet_data: List[SheetData]
+        The data of every sheet of the spreadsheet.
+
+    Returns
+    -------
+    fingerprint: str
+        The hash of the sheets' titles, meta data and data.
+    """
+    return hash_document([sheet_data._asdict() for sheet_data in spreadsheet_data])
+
+
+def _get_spreadsheet_institution_keys(
+    spreadsheet_data: List[SheetData],
+) -> Set[Tuple[str, str, str]]:
+    """
+    Get the (name, country, category) of every institution of a spreadsheet's institution sheets.
+    A sheet that can't be formatted is left out, its transform reports the error.
+    """
+    institution_keys = set()
+    for sheet_data in spreadsheet_data:
+        if sheet_data.meta_data.get(MetaDataField.format) not in INSTITUTION_FORMATS:
+            continue
+        try:
+            formatted_sheet_data = GoogleSheetsInstitutionExtracter.process_sheet_data(
+                sheet_data
+            )
+        except BaseError:
+            continue
+        institution_keys.update(
+            _get_institution_key(institution)
+            for institution in formatted_sheet_data.formatted_data
+        )
+    return institution_keys
+
+
+def _find_dependent_spreadsheet_ids(
+    spreadsheets_data: Dict[str, List[SheetData]],
+    reloaded_spreadsheet_ids: List[str],
+    reloaded_institution_keys: Set[Tuple[str, str, str]],
+) -> List[str]:
+    """
+    Find the other spreadsheets with composite sheets that refer to institutions of the reloaded spreadsheets.
+    Reloading an institution sets the type of its variables back to standard, so the composite sheets
+    that refer to them must be reloaded too. A dependent spreadsheet is reloaded whole, with its own
+    institutions, so the spreadsheets that depend on it are found as well.
+
+    Parameters
+    ----------
+    spreadsheets_data: Dict[str, List[SheetData]]
+        The sheets data of every spreadsheet, by spreadsheet id.
+    reloaded_spreadsheet_ids: List[str]
+        The ids of the new, changed and removed spreadsheets.
+    reloaded_institution_keys: Set[Tuple[str, str, str]]
+        The (name, country, category) of the stored and new institutions of those spreadsheets.
+
+    Returns
+    -------
+    dependent_spreadsheet_ids: List[str]
+        The ids of the unchanged spreadsheets to reload as well.
+    """
+    reloaded_spreadsheet_ids = set(reloaded_spreadsheet_ids)
+    reloaded_institution_keys = set(reloaded_institution_keys)
+    dependent_spreadsheet_ids = []
+    found_dependents = True
+    while found_dependents:
+        found_dependents = False
+        for spreadsheet_id, spreadsheet_data in spreadsheets_data.items():
+            if spreadsheet_id in reloaded_spreadsheet_ids or not any(
+                sheet_data.meta_data.get(MetaDataField.format)
+                not in INSTITUTION_FORMATS
+                and _get_referred_institution_keys(sheet_data.meta_data)
+                & reloaded_institution_keys
+                for sheet_data in spreadsheet_data
+            ):
+                continue
+            found_dependents = True
+            reloaded_spreadsheet_ids.add(spreadsheet_id)
+            dependent_spreadsheet_ids.append(spreadsheet_id)
+            reloaded_institution_keys.update(
+                _get_spreadsheet_institution_keys(spreadsheet_data)
+            )
+    return dependent_spreadsheet_ids
+
+
+@task(nout=2, tags=[ResourceType.mongo])
+def _find_changed_spreadsheets(
+    spreadsheet_ids: List[str],
+    spreadsheets_data: List[List[SheetData]],
+    db_connection_url: str,
+) -> Tuple[List[List[SheetData]], List[str]]:
+    """
+    Prefect task to find the spreadsheets whose contents changed since they were last loaded,
+    by comparing their fingerprints with the stored ones. The unchanged spreadsheets with composite
+    sheets that refer to institutions of the changed or removed spreadsheets are reloaded too.
+
+    Parameters
+    ----------
+    spreadsheet_ids: List[str]
+        The ids of every spreadsheet.
+    spreadsheets_data: List[List[SheetData]]
+        The sheets data of every spreadsheet, in the order of the spreadsheet ids.
+    db_connection_url: str
+        The DB's connection url str.
+
+    Returns
+    -------
+    changed_spreadsheets_data: List[List[SheetData]]
+        The sheets data of the new, changed and dependent spreadsheets, to load.
+    pruned_spreadsheet_ids: List[str]
+        The ids of the new, changed, dependent and removed spreadsheets, whose old documents are pruned.
+    """
+    database = _create_database(db_connection_url)
+    stored_fingerprints = database.find_spreadsheet_fingerprints()
+    spreadsheets_data_by_id = dict(zip(spreadsheet_ids, spreadsheets_data))
+    fingerprints = {
+        spreadsheet_id: _fingerprint_spreadsheet(spreadsheet_data)
+        for spreadsheet_id, spreadsheet_data in spreadsheets_data_by_id.items()
+    }
+    changed_spreadsheet_ids = [
+        spreadsheet_id
+        for spreadsheet_id in spreadsheets_data_by_id
+        if stored_fingerprints.get(spreadsheet_id) != fingerprints.get(spreadsheet_id)
+    ]
+    removed_spreadsheet_ids = [
+        spreadsheet_id
+        for spreadsheet_id in stored_fingerprints
+        if spreadsheet_id not in fingerprints
+    ]
+    # The institutions of the changed and removed spreadsheets, as stored and as they are now
+    reloaded_institution_keys = {
+        _get_institution_key(institution)
+        for institution in database.iter_find(
+            db_collection.institutions,
+            {
+                DocumentField.spreadsheet_id: {
+                    "$in": changed_spreadsheet_ids + removed_spreadsheet_ids
+                }
+            },
+            projection=[
+                InstitutionField.name,
+                InstitutionField.country,
+                InstitutionField.category,
+            ],
+        )
+    }
+    database.close_connection()
+    for spreadsheet_id in changed_spreadsheet_ids:
+        reloaded_institution_keys.update(
+            _get_spreadsheet_institution_keys(spreadsheets_data_by_id[spreadsheet_id])
+        )
+    dependent_spreadsheet_ids = _find_dependent_spreadsheet_ids(
+        spreadsheets_data_by_id,
+        changed_spreadsheet_ids + removed_spreadsheet_ids,
+        reloaded_institution_keys,
+    )
+    loaded_spreadsheet_ids = [
+        spreadsheet_id
+        for spreadsheet_id in spreadsheets_data_by_id
+        if spreadsheet_id in changed_spreadsheet_ids
+        or spreadsheet_id in dependent_spreadsheet_ids
+    ]
+    log.info(
+        f"Found {len(changed_spreadsheet_ids)} new or changed spreadsheets "
+        f"{changed_spreadsheet_ids}, {len(dependent_spreadsheet_ids)} spreadsheets that refer to "
+        f"their institutions {dependent_spreadsheet_ids}, and {len(removed_spreadsheet_ids)} "
+        f"removed spreadsheets {removed_spreadsheet_ids}."
+    )
+    return (
+        [
+            spreadsheets_data_by_id[spreadsheet_id]
+            for spreadsheet_id in loaded_spreadsheet_ids
+        ],
+        loaded_spreadsheet_ids + removed_spreadsheet_ids,
+    )
+
+
+@task(tags=[ResourceType.mongo])
+def _save_spreadsheet_fingerprints(
+    db_connection_url: str,
+    spreadsheet_ids: List[str],
+    spreadsheets_data: List[List[SheetData]],
+):
+    """
+    Prefect task to store the fingerprints of the spreadsheets once they are loaded,
+    that the next incremental run compares the spreadsheets with.
+
+    Parameters
+    ----------
+    db_connection_url: str
+        The DB's connection url str.
+    spreadsheet_ids: List[str]
+        The ids of every spreadsheet.
+    spreadsheets_data: List[List[SheetData]]
+        The sheets data of every spreadsheet, in the order of the spreadsheet ids.
+    """
+    database = _create_database(db_connection_url)
+    database.save_spreadsheet_fingerprints(
+        {
+            spreadsheet_id: _fingerprint_spreadsheet(spreadsheet_data)
+            for spreadsheet_id, spreadsheet_data in zip(
+                spreadsheet_ids, spreadsheets_data
+            )
+        }
+    )
+    database.close_connection()
+
+
+def _load_spreadsheets_in_phases(
+    spreadsheets_data: Task,
+    db_connection_url: str,
+    shadow: bool,
+    skip_unchanged: bool,
+    write_concern: Optional[int],
+    generation: Optional[Task],
+    checkpoint: Optional[Checkpoint],
+    pruned_spreadsheet_ids: Optional[Union[List[str], Task]] = None,
+) -> Tuple[Task, List[Task]]:
+    """
+    Add the tasks that load the institution sheets of every spreadsheet, in batches, then
+    the composite sheets of every spreadsheet, in batches, to the current flow.
+    With a generation, the documents of older generations are pruned once the sheets have loaded.
+
+    Parameters
+    ----------
+    spreadsheets_data: Task
+        The task that extracts the sheets data of every spreadsheet.
+    db_connection_url: str
+        The DB's connection url str.
+    shadow: bool
+        Whether to load into the shadow collections.
+    skip_unchanged: bool
+        Whether to write only new or changed documents.
+    write_concern: Optional[int]
+        The number of acknowledgments, without journaling, each write waits for.
+    generation: Optional[Task]
+        The task that creates the generation of the run, stamped on every written document.
+    checkpoint: Optional[Checkpoint]
+        Where the run checkpoints the transformed sheets, if anywhere.
+    pruned_spreadsheet_ids: Optional[Union[List[str], Task]] = None
+        The ids of the spreadsheets to prune the older generations of, or the task that returns them.
+        Every spreadsheet is pruned if None.
+
+    Returns
+    -------
+    load_task: Task
+        The last task of the load.
+    load_tasks: List[Task]
+        The tasks that load the sheets, and return their load metrics.
+    """
+    # Transform list of SheetData into FormattedSheetData
+    formatted_spreadsheets_data = _transform.map(
+        flatten(spreadsheets_data),
+        task_args=get_checkpoint_task_args(checkpoint, CheckpointStage.transform),
+    )
+    # Create instituton filter
+    gs_institution_filter = _create_filter_task(
+        [
+            gs_format.standard_institution,
+            gs_format.multiple_sigla_answer_variable,
+        ]
+    )
+    # Filter to list of institutional formatted sheet data
+    gs_institutions_data = gs_institution_filter(formatted_spreadsheets_data)
+    # Create composite filter
+    gs_composite_filter = _create_filter_task(
+        [
+            gs_format.composite_variable,
+            gs_format.institution_and_composite_variable,
+        ]
+    )
+    # Filter to list of composite formatted sheet data
+    gs_composites_data = gs_composite_filter(formatted_spreadsheets_data)
+
+    # Load instutional data
+    load_institutions_data_task = _load_institutions_data.map(
+        _batch_sheets_data(gs_institutions_data),
+        unmapped(db_connection_url),
+        unmapped(shadow),
+        unmapped(skip_unchanged),
+        unmapped(write_concern),
+        unmapped(generation),
+    )
+    # Resolve the variable references of all composite sheets in one batch
+    variable_references = _resolve_variable_references(
+        gs_composites_data,
+        db_connection_url,
+        shadow,
+        write_concern,
+        upstream_tasks=[load_institutions_data_task],
+    )
+    # Load composite data
+    load_composites_data_task = _load_composites_data.map(
+        _batch_sheets_data(gs_composites_data),
+        unmapped(db_connection_url),
+        unmapped(shadow),
+        unmapped(skip_unchanged),
+        unmapped(variable_references),
+        unmapped(write_concern),
+        unmapped(generation),
+    )
+    load_task = load_composites_data_task
+    if generation is not None:
+        # Delete the documents that weren't loaded by this run
+        load_task = _prune_generations(
+            db_connection_url,
+            generation,
+            pruned_spreadsheet_ids,
+            upstream_tasks=[load_composites_data_task],
+        )
+    return load_task, [
+        load_institutions_data_task,
+        load_composites_data_task,
+    ]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import siglatools
+
+# The modules of the console scripts
+ENTRY_POINT_MODULES = [
+    "siglatools.bin.run_sigla_pipeline",
+    "siglatools.bin.run_external_link_checker",
+    "siglatools.bin.get_next_uv_dates",
+    "siglatools.bin.run_qa_test",
+    "siglatools.bin.load_spreadsheets",
+    "siglatools.bin.promote",
+    "siglatools.bin.run_jobs",
+    "siglatools.bin.run_benchmark",
+]
+# The packages a script only needs once its arguments are checked
+HEAVY_MODULES = ["prefect", "dask", "distributed", "googleapiclient", "pymongo"]
+# The scripts are run from the directory of the package, to import it without installing it
+PACKAGE_ROOT = Path(siglatools.__file__).parent.parent
+
+_IMPORT_SCRIPT = """
+import json, sys
+import {module}
+print(json.dumps([module for module in {heavy_modules!r} if module in sys.modules]))
+"""
+
+
+@pytest.mark.parametrize("module", ENTRY_POINT_MODULES)
+def test_entry_point_imports(module):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _IMPORT_SCRIPT.format(module=module, heavy_modules=HEAVY_MODULES),
+        ],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    assert json.loads(output.splitlines()[-1]) == []
+
+
+def test_version_without_heavy_imports():
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-m",
+            "siglatools.bin.run_sigla_pipeline",
+            "--version",
+        ],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert output.stdout.strip().startswith("run_sigla_pipeline")
+    imported = {
+        line.split("|")[-1].strip()
+        for line in output.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert not imported.intersection(HEAVY_MODULES)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+
+from siglatools.bin.run_sigla_pipeline import check_pipeline_options
+from siglatools.databases.constants import LoadMode
+from siglatools.utils.exceptions import InvalidWorkflowInputs
+
+
+def test_check_pipeline_options_rejects_streaming_checkpoints():
+    check_pipeline_options(LoadMode.clean_up, False, 1, True)
+    check_pipeline_options(LoadMode.clean_up, False, 1, False, True)
+    with pytest.raises(InvalidWorkflowInputs):
+        check_pipeline_options(LoadMode.clean_up, False, 1, True, True)
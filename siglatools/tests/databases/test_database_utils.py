@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+from bson.objectid import ObjectId
+
+from siglatools.databases.utils import get_hosts, hash_document
+
+OBJECT_ID = ObjectId("5f50c31e8a7d4b1c9c2e8a11")
+
+
+@pytest.mark.parametrize(
+    "document, other_document, expected",
+    [
+        ({"name": "a", "index": 0}, {"index": 0, "name": "a"}, True),
+        ({"name": "a", "index": 0}, {"name": "a", "index": 1}, False),
+        ({"variable": OBJECT_ID}, {"variable": ObjectId(str(OBJECT_ID))}, True),
+        ({"variables": [OBJECT_ID]}, {"variables": [ObjectId()]}, False),
+        (
+            {"sigla_answers": [{"name": "a", "answer": "b"}]},
+            {"sigla_answers": [{"answer": "b", "name": "a"}]},
+            True,
+        ),
+        ([0, 1], [1, 0], False),
+    ],
+)
+def test_hash_document(document, other_document, expected):
+    assert (hash_document(document) == hash_document(other_document)) == expected
+
+
+@pytest.mark.parametrize(
+    "db_connection_url, other_db_connection_url, expected",
+    [
+        ("mongodb://a:27017/sigla", "mongodb://user:password@A/production", True),
+        ("mongodb://a,b:27018/sigla", "mongodb://b:27018,a:27017/sigla", True),
+        ("mongodb://a,b/sigla", "mongodb://a/sigla", False),
+        ("mongodb://a:27017/sigla", "mongodb://a:27018/sigla", False),
+    ],
+)
+def test_get_hosts(db_connection_url, other_db_connection_url, expected):
+    assert (
+        get_hosts(db_connection_url) == get_hosts(other_db_connection_url)
+    ) == expected
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+from uuid import uuid4
+
+import pytest
+
+from siglatools.databases.exceptions import UnsupportedOperation
+from siglatools.databases.memory_client import InMemoryClient
+
+
+@pytest.fixture
+def collection():
+    db_connection_url = f"memory://{uuid4().hex}/sigla"
+    collection = (
+        InMemoryClient(db_connection_url)
+        .get_default_database()
+        .get_collection("institutions")
+    )
+    collection.insert_many([{"name": "A"}])
+    yield collection
+    InMemoryClient.drop_store(db_connection_url)
+
+
+@pytest.mark.parametrize(
+    "pipeline, operator, stage",
+    [
+        ([{"$match": {"name": {"$regex": "A"}}}], "$regex", "$match"),
+        ([{"$addFields": {"size": {"$size": "$name"}}}], "$size", "$addFields"),
+        ([{"$group": {"_id": "$name"}}], "$group", "aggregate"),
+    ],
+)
+def test_unsupported_operation(collection, pipeline, operator, stage):
+    with pytest.raises(UnsupportedOperation) as error:
+        collection.aggregate(pipeline)
+    assert error.value.info.info == {"operator": operator, "stage": stage}
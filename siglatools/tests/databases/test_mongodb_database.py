@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+from uuid import uuid4
+
+import pytest
+from pymongo.errors import PyMongoError
+
+from siglatools.databases import MongoDBDatabase, mongodb_database
+from siglatools.databases.constants import DatabaseCollection as db_collection
+from siglatools.databases.constants import VariableType
+from siglatools.databases.exceptions import (
+    UnableToReloadSpreadsheet,
+    UnableToWriteDocuments,
+)
+from siglatools.databases.memory_client import (
+    InMemoryClient,
+    InMemoryCollection,
+    InMemorySession,
+    _InMemoryAdmin,
+)
+from siglatools.institution_extracters.google_sheets_institution_extracter import (
+    GoogleSheetsInstitutionExtracter,
+)
+from siglatools.institution_extracters.utils import FormattedSheetData, SheetData
+
+
+def _institutions_sheet(
+    spreadsheet_id: str = "ss1", names=("A", "B"), rows: int = 3
+) -> FormattedSheetData:
+    header = ["", ""]
+    for _ in names:
+        header += ["", "", ""]
+    data = [list(names), header]
+    for i in range(rows):
+        row = [f"heading{i}", f"variable{i}"]
+        for _ in names:
+            row += [f"answer{i}", "original", "source"]
+        data.append(row)
+    return GoogleSheetsInstitutionExtracter.process_sheet_data(
+        SheetData(
+            spreadsheet_id,
+            f"Spreadsheet {spreadsheet_id}",
+            "0",
+            "Institutions",
+            {"format": "standard-institution", "category": "Category", "country": "C"},
+            data,
+            None,
+        )
+    )
+
+
+def _rights_sheet(rows: int = 3, spreadsheet_id: str = "ss1") -> FormattedSheetData:
+    return GoogleSheetsInstitutionExtracter.process_sheet_data(
+        SheetData(
+            spreadsheet_id,
+            f"Spreadsheet {spreadsheet_id}",
+            "1",
+            "Rights",
+            {
+                "format": "composite-variable",
+                "category": "Category",
+                "country": "C",
+                "name": "A",
+                "data_type": db_collection.rights,
+                "variable_heading": "heading0",
+                "variable_name": "variable0",
+            },
+            [["right", "note"]] + [[f"right{i}", "note"] for i in range(rows)],
+            None,
+        )
+    )
+
+
+def _database(db_connection_url: str, **kwargs) -> MongoDBDatabase:
+    return MongoDBDatabase(
+        db_connection_url, client=InMemoryClient(db_connection_url), **kwargs
+    )
+
+
+@pytest.fixture
+def db_connection_url():
+    db_connection_url = f"memory://{uuid4().hex}/sigla"
+    yield db_connection_url
+    InMemoryClient.drop_store(db_connection_url)
+
+
+def _count_documents(db_connection_url: str):
+    db = InMemoryClient(db_connection_url).get_default_database()
+    return {
+        collection: db.get_collection(collection).count_documents({})
+        for collection in [
+            db_collection.institutions,
+            db_collection.variables,
+            db_collection.rights,
+        ]
+    }
+
+
+def test_load_many(db_connection_url):
+    database = _database(db_connection_url)
+    results = database.load_many([_institutions_sheet()])
+    references = database.resolve_variable_references([_rights_sheet()])
+    results += database.load_many([_rights_sheet()], references)
+    database.close_connection()
+
+    assert [(result.upserted_count, result.error) for result in results] == [
+        (8, None),
+        (3, None),
+    ]
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 2,
+        db_collection.variables: 6,
+        db_collection.rights: 3,
+    }
+    institutions = _database(db_connection_url).find_institutions_with_variables(
+        ["ss1"]
+    )
+    composite_rows = [
+        len(variable.get("composite_variable_data", []))
+        for institution in institutions
+        for variable in institution.get("childs")
+    ]
+    assert sorted(composite_rows) == [0, 0, 0, 0, 0, 3]
+
+
+def test_load_many_batches_writes(db_connection_url):
+    client = InMemoryClient(db_connection_url)
+    database = _database(db_connection_url)
+    database.load_many(
+        [_institutions_sheet("ss1"), _institutions_sheet("ss2", names=("C",))]
+    )
+
+    # One bulk write per collection for both sheets
+    assert client.operation_counts == {
+        (db_collection.institutions, "bulk_write"): 1,
+        (db_collection.variables, "bulk_write"): 1,
+    }
+
+
+def test_diff_load_skips_unchanged_documents(db_connection_url):
+    _database(db_connection_url).load(_institutions_sheet())
+    client = InMemoryClient(db_connection_url)
+    client.operation_counts.clear()
+
+    database = _database(db_connection_url, skip_unchanged=True)
+    results = database.load_many([_institutions_sheet()])
+    assert results[0].request_count == 0
+    assert client.operation_counts.get((db_collection.variables, "bulk_write")) is None
+
+    database.load_many([_institutions_sheet(names=("A",), rows=2)])
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 1,
+        db_collection.variables: 2,
+        db_collection.rights: 0,
+    }
+
+
+def test_prune_generations(db_connection_url):
+    _database(db_connection_url, generation="1").load_many(
+        [_institutions_sheet("ss1"), _institutions_sheet("ss2", names=("C",))]
+    )
+    _database(db_connection_url, generation="2").load(
+        _institutions_sheet("ss1", names=("A",))
+    )
+
+    database = _database(db_connection_url)
+    database.prune_generations("2", ["ss1"])
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 2,
+        db_collection.variables: 6,
+        db_collection.rights: 0,
+    }
+    database.prune_generations("2")
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 1,
+        db_collection.variables: 3,
+        db_collection.rights: 0,
+    }
+
+
+def test_load_many_reports_write_errors(db_connection_url):
+    InMemoryClient(db_connection_url).get_default_database().get_collection(
+        db_collection.rights
+    ).create_index("note", unique=True)
+    database = _database(db_connection_url)
+    database.load(_institutions_sheet())
+    results = database.load_many([_rights_sheet()])
+
+    assert "duplicate key" in results[0].error
+    assert _count_documents(db_connection_url).get(db_collection.rights) == 1
+
+
+def test_load_many_reports_database_errors(db_connection_url, monkeypatch):
+    find = InMemoryCollection.find
+
+    def _find(collection, filter=None, *args, **kwargs):
+        if (filter or {}).get("spreadsheet_id") == "ss2":
+            raise PyMongoError("Connection reset")
+        return find(collection, filter, *args, **kwargs)
+
+    monkeypatch.setattr(InMemoryCollection, "find", _find)
+    database = _database(db_connection_url, skip_unchanged=True)
+    results = database.load_many(
+        [_institutions_sheet("ss1"), _institutions_sheet("ss2", names=("C",))]
+    )
+
+    assert [result.error for result in results] == [None, "Connection reset"]
+    assert _count_documents(db_connection_url).get(db_collection.institutions) == 2
+
+
+def test_materialize_institutions(db_connection_url):
+    database = _database(db_connection_url)
+    database.load(_institutions_sheet())
+    database.load(_rights_sheet())
+    database.materialize_institutions()
+    database.clean_up()
+
+    institution_pages = database.find(
+        db_collection.institution_pages, {"country": "C", "category": "Category"}
+    )
+    assert sorted(page.get("name") for page in institution_pages) == ["A", "B"]
+    page = next(page for page in institution_pages if page.get("name") == "A")
+    assert [variable.get("variable_index") for variable in page.get("childs")] == [
+        0,
+        1,
+        2,
+    ]
+    assert [
+        row.get("index") for row in page.get("childs")[0].get("composite_variable_data")
+    ] == [0, 1, 2]
+
+
+def test_reload_spreadsheet(db_connection_url):
+    database = _database(db_connection_url)
+    database.reload_spreadsheet([_institutions_sheet(), _rights_sheet()])
+    database.reload_spreadsheet([_institutions_sheet(names=("A",)), _rights_sheet(2)])
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 1,
+        db_collection.variables: 3,
+        db_collection.rights: 2,
+    }
+
+    # A sheet that fails aborts the reload of the whole spreadsheet
+    InMemoryClient(db_connection_url).get_default_database().get_collection(
+        db_collection.rights
+    ).create_index("note", unique=True)
+    with pytest.raises(UnableToWriteDocuments):
+        database.reload_spreadsheet([_institutions_sheet(), _rights_sheet()])
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 1,
+        db_collection.variables: 3,
+        db_collection.rights: 2,
+    }
+
+
+def test_reload_spreadsheet_keeps_variables_composite(db_connection_url):
+    database = _database(db_connection_url)
+    database.reload_spreadsheet([_institutions_sheet()])
+    # The rights of another spreadsheet refer to a variable of ss1
+    database.reload_spreadsheet([_rights_sheet(spreadsheet_id="ss2")])
+    database.reload_spreadsheet([_institutions_sheet()])
+    composite_variables = database.find(
+        db_collection.variables, {"type": VariableType.composite}
+    )
+    assert [variable.get("hyperlink") for variable in composite_variables] == [
+        db_collection.rights
+    ]
+
+    # A reload that would delete the variable is refused
+    with pytest.raises(UnableToReloadSpreadsheet):
+        database.reload_spreadsheet([_institutions_sheet(names=("B",))])
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 2,
+        db_collection.variables: 6,
+        db_collection.rights: 3,
+    }
+
+
+def test_reload_spreadsheet_retries_transient_errors(db_connection_url, monkeypatch):
+    commit_transaction = InMemorySession.commit_transaction
+    errors = [PyMongoError("Write conflict", ["TransientTransactionError"])]
+
+    def _commit_transaction(session):
+        if errors:
+            raise errors.pop()
+        commit_transaction(session)
+
+    monkeypatch.setattr(InMemorySession, "commit_transaction", _commit_transaction)
+    _database(db_connection_url).reload_spreadsheet([_institutions_sheet()])
+    assert _count_documents(db_connection_url).get(db_collection.institutions) == 2
+
+
+@pytest.mark.parametrize("same_cluster", [True, False])
+def test_promote(same_cluster):
+    host = uuid4().hex
+    db_connection_url = f"memory://staging:password@{host}:27017,other-{host}/sigla"
+    target_db_connection_url = f"memory://other-{host},{host.upper()}/production"
+    if not same_cluster:
+        target_db_connection_url = f"memory://{uuid4().hex}/production"
+    database = _database(db_connection_url)
+    database.create_indexes()
+    database.load(_institutions_sheet())
+    database.load(_rights_sheet())
+    target = _database(target_db_connection_url)
+    target.load(_institutions_sheet("ss2", names=("C",)))
+    target.materialize_institutions()
+    database.save_spreadsheet_fingerprints({"ss1": "a"})
+    operation_counts = InMemoryClient(db_connection_url).operation_counts
+    operation_counts.clear()
+
+    database.promote(target_db_connection_url, InMemoryClient(target_db_connection_url))
+    # On the same cluster the collections are copied with $out, otherwise they are streamed
+    assert operation_counts.get((db_collection.rights, "aggregate")) == (
+        1 if same_cluster else None
+    )
+    assert operation_counts.get((db_collection.rights, "find")) == (
+        None if same_cluster else 1
+    )
+    assert _count_documents(target_db_connection_url) == _count_documents(
+        db_connection_url
+    )
+    target_db = InMemoryClient(target_db_connection_url).get_default_database()
+    assert sorted(target_db.list_collection_names()) == [
+        db_collection.amendments,
+        db_collection.body_of_law,
+        db_collection.institutions,
+        db_collection.rights,
+        db_collection.spreadsheet_fingerprints,
+        db_collection.variables,
+    ]
+    assert target.find_spreadsheet_fingerprints() == {"ss1": "a"}
+    assert (
+        target_db.get_collection(db_collection.rights).index_information()
+        == InMemoryClient(db_connection_url)
+        .get_default_database()
+        .get_collection(db_collection.rights)
+        .index_information()
+    )
+    InMemoryClient.drop_store(db_connection_url)
+    InMemoryClient.drop_store(target_db_connection_url)
+
+
+def test_write_concern_must_be_acknowledged(db_connection_url):
+    with pytest.raises(ValueError):
+        _database(db_connection_url, write_concern=0)
+
+
+def test_load_metrics(db_connection_url):
+    database = _database(db_connection_url)
+    database.load_many(
+        [_institutions_sheet("ss1"), _institutions_sheet("ss2", names=("C",))]
+    )
+    report = database.metrics.report()
+
+    variables_writes = report.get("collections").get(db_collection.variables)
+    assert variables_writes.get("bulk_write").get("round_trips") == 1
+    assert variables_writes.get("bulk_write").get("upserted") == 9
+    assert variables_writes.get("bulk_write").get("bytes_sent") > 0
+    assert sorted(
+        (sheet.get("sheet"), sheet.get("upserted")) for sheet in report.get("sheets")
+    ) == [("ss1/0", 8), ("ss2/0", 4)]
+
+
+def test_spreadsheet_fingerprints(db_connection_url):
+    database = _database(db_connection_url)
+    assert database.find_spreadsheet_fingerprints() == {}
+
+    database.save_spreadsheet_fingerprints({"ss1": "a", "ss2": "b"})
+    database.save_spreadsheet_fingerprints({"ss1": "c"})
+    assert database.find_spreadsheet_fingerprints() == {"ss1": "c"}
+
+
+def test_swap_shadow_collections_renames_referred_collections_first(
+    db_connection_url, monkeypatch
+):
+    shadow_database = _database(db_connection_url, shadow=True)
+    shadow_database.load(_institutions_sheet())
+    shadow_database.load(_rights_sheet())
+    renamed = []
+    command = _InMemoryAdmin.command
+
+    def _command(admin, command_name, value, to, dropTarget=False):
+        renamed.append(to.split(".")[-1])
+        return command(admin, command_name, value, to, dropTarget)
+
+    monkeypatch.setattr(_InMemoryAdmin, "command", _command)
+    _database(db_connection_url).swap_shadow_collections()
+
+    assert renamed == [
+        db_collection.rights,
+        db_collection.amendments,
+        db_collection.body_of_law,
+        db_collection.variables,
+        db_collection.institutions,
+    ]
+    assert _count_documents(db_connection_url) == {
+        db_collection.institutions: 2,
+        db_collection.variables: 6,
+        db_collection.rights: 3,
+    }
+
+
+def test_deferred_composite_sheets(db_connection_url, monkeypatch):
+    monkeypatch.setattr(mongodb_database, "DEFERRED_SHEET_CHUNK_BYTES", 64)
+    database = _database(db_connection_url)
+    sheet_data = SheetData(
+        "ss2",
+        "Spreadsheet ss2",
+        "1",
+        "Rights",
+        {"format": "composite-variable", "name": "A"},
+        [["right", "note"]] + [[f"right{i}", "note"] for i in range(10)],
+        None,
+    )
+    institution_key = ("A", "C", "Category")
+    database.defer_composite_sheets("run", None, [(sheet_data, [institution_key])])
+    database.defer_composite_sheets("other run", [institution_key], [])
+    assert database.claim_deferred_composite_sheets("run") == []
+
+    database.defer_composite_sheets("run", [institution_key], [])
+    # The rows are stored in chunks, and put back together when the sheet is claimed
+    collection = (
+        InMemoryClient(db_connection_url)
+        .get_default_database()
+        .get_collection(db_collection.deferred_composite_sheets)
+    )
+    assert collection.count_documents({"sheet": {"$exists": True}}) > 1
+    assert database.claim_deferred_composite_sheets("run") == [sheet_data]
+    assert database.claim_deferred_composite_sheets("run", claim_all=True) == []
+
+    database.delete_deferred_composite_sheets("run")
+    assert collection.count_documents({}) == 1
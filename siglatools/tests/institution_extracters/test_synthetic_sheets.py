@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+
+from siglatools.institution_extracters import (
+    GoogleSheetsInstitutionExtracter,
+    exceptions,
+)
+from siglatools.institution_extracters.synthetic_sheets import (
+    MASTER_SPREADSHEET_ID,
+    CorpusScale,
+    SyntheticSpreadsheets,
+    get_corpus_size,
+)
+
+
+def test_extract_synthetic_corpus():
+    scale = CorpusScale(spreadsheets=2, sheets=5, rows=3, institutions=2)
+    extracter = GoogleSheetsInstitutionExtracter(
+        spreadsheets=SyntheticSpreadsheets(scale)
+    )
+    spreadsheet_ids = extracter.get_spreadsheet_ids(MASTER_SPREADSHEET_ID)
+    assert spreadsheet_ids == ["synthetic-00000", "synthetic-00001"]
+
+    spreadsheet_data = extracter.get_spreadsheet_data(spreadsheet_ids[1])
+    formatted_sheets_data = [
+        GoogleSheetsInstitutionExtracter.process_sheet_data(sheet_data)
+        for sheet_data in spreadsheet_data
+    ]
+    assert [
+        (sheet.meta_data.get("format"), len(sheet.formatted_data))
+        for sheet in formatted_sheets_data
+    ] == [
+        ("standard-institution", 2),
+        ("multiple-sigla-answer-variable", 1),
+        ("institution-and-composite-variable", 3),
+        ("composite-variable", 3),
+        ("standard-institution", 2),
+    ]
+    assert spreadsheet_data[0].next_uv_dates == [
+        "",
+        "",
+        "2030-01-01",
+        "2030-01-02",
+        "2030-01-03",
+    ]
+    assert get_corpus_size(scale) == {"spreadsheets": 2, "sheets": 10, "cells": 284}
+
+    with pytest.raises(exceptions.UnableToAccessSpreadsheet):
+        extracter.get_spreadsheet_data("synthetic-00002")
@@ -6,6 +6,7 @@ import pytest
 
 from siglatools.institution_extracters.utils import (
     convert_col_to_name,
+    convert_name_to_col,
     convert_rowcol_to_A1_name,
     create_institution_sub_category,
 )
@@ -33,6 +34,11 @@ def test_convert_col_to_name(col, expected):
     assert convert_col_to_name(col) == expected
 
 
+@pytest.mark.parametrize("col", [0, 1, 25, 26, 27, 255, 16383, 16384])
+def test_convert_name_to_col(col):
+    assert convert_name_to_col(convert_col_to_name(col)) == col
+
+
 @pytest.mark.parametrize(
     "row, col, expected",
     [
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+from prefect import Flow, task
+
+from siglatools.pipelines.checkpoints import (
+    Checkpoint,
+    CheckpointStage,
+    get_checkpoint_task_args,
+)
+
+
+def test_get_checkpoint_task_args(tmp_path):
+    assert get_checkpoint_task_args(None, CheckpointStage.extract) == {}
+
+    runs = []
+
+    @task
+    def _extract(spreadsheet_id: str):
+        runs.append(spreadsheet_id)
+        return [spreadsheet_id]
+
+    def _run(run_id: str):
+        checkpoint = Checkpoint(str(tmp_path), run_id)
+        with Flow("Checkpoint") as flow:
+            _extract.map(
+                ["ss1", "ss2"],
+                task_args=get_checkpoint_task_args(checkpoint, CheckpointStage.extract),
+            )
+        assert flow.run(context={"checkpointing": True}).is_successful()
+
+    _run("1")
+    assert sorted(runs) == ["ss1", "ss2"]
+    assert sorted(path.name for path in (tmp_path / "1" / "extract").iterdir()) == [
+        "ss1",
+        "ss2",
+    ]
+    # Resuming the run skips the checkpointed task runs
+    _run("1")
+    assert len(runs) == 2
+    _run("2")
+    assert len(runs) == 4
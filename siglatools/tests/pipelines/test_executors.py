@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import pytest
+from prefect.executors import DaskExecutor, LocalDaskExecutor
+
+from siglatools.pipelines.constants import ExecutorType
+from siglatools.pipelines.executors import create_executor
+from siglatools.utils.exceptions import InvalidWorkflowInputs
+
+
+def test_create_executor():
+    executor = create_executor(ExecutorType.local_cluster, n_workers=2, n_threads=4)
+    assert isinstance(executor, DaskExecutor)
+    assert executor.cluster_kwargs.get("n_workers") == 2
+    assert executor.cluster_kwargs.get("threads_per_worker") == 4
+
+    executor = create_executor(ExecutorType.threads, n_threads=4)
+    assert isinstance(executor, LocalDaskExecutor)
+    assert executor.scheduler == "threads"
+
+    executor = create_executor(ExecutorType.scheduler, "tcp://127.0.0.1:8786")
+    assert executor.address == "tcp://127.0.0.1:8786"
+
+
+def test_prioritize_mapped_task_runs():
+    executor = create_executor(ExecutorType.local_cluster)
+    assert executor._prep_dask_kwargs({"task_name": "_extract"}).get("priority") is None
+    assert (
+        executor._prep_dask_kwargs({"task_name": "_extract", "task_index": 2}).get(
+            "priority"
+        )
+        == -2
+    )
+
+
+def test_create_executor_without_scheduler_address():
+    with pytest.raises(InvalidWorkflowInputs):
+        create_executor(ExecutorType.scheduler)
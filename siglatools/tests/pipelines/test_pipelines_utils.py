@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from typing import List
+from uuid import uuid4
+
+import prefect
+from prefect import Flow, task
+
+from siglatools.databases.constants import DatabaseCollection as db_collection
+from siglatools.databases.constants import LoadMode, VariableType
+from siglatools.databases.memory_client import InMemoryClient
+from siglatools.institution_extracters.utils import FormattedSheetData, SheetData
+from siglatools.pipelines.sigla_pipeline import add_sigla_pipeline_tasks
+from siglatools.pipelines.utils import (
+    DB_CLIENT_KEY,
+    _load_deferred_composites,
+    _split_composite_sheets_data,
+    _stream_spreadsheet,
+)
+
+
+def _sheet(sheet_id: str, meta_data: dict, formatted_data: list) -> FormattedSheetData:
+    return FormattedSheetData(
+        "ss1", "Spreadsheet", sheet_id, sheet_id, meta_data, formatted_data
+    )
+
+
+def test_split_composite_sheets_data():
+    institutions = _sheet(
+        "institutions",
+        {"format": "standard-institution"},
+        [
+            {"name": "A", "country": "C", "category": "Category"},
+            {"name": "B", "country": "C", "category": "Category"},
+        ],
+    )
+    local = _sheet(
+        "local",
+        {
+            "format": "composite-variable",
+            "name": "A; B",
+            "country": "C",
+            "category": "Category",
+        },
+        [],
+    )
+    other_country = _sheet(
+        "other_country",
+        {
+            "format": "composite-variable",
+            "name": "A",
+            "country": "D",
+            "category": "Category",
+        },
+        [],
+    )
+    other_institution = _sheet(
+        "other_institution",
+        {
+            "format": "composite-variable",
+            "name": "A;E",
+            "country": "C",
+            "category": "Category",
+        },
+        [],
+    )
+
+    assert _split_composite_sheets_data(
+        [institutions], [local, other_country, other_institution]
+    ) == ([local], [other_country, other_institution])
+
+
+def _spreadsheets_data(answer: str) -> List[List[SheetData]]:
+    data = [["A", "", "", ""], ["", "", "", ""]] + [
+        [f"heading{i}", f"variable{i}", answer, "original", "source"] for i in range(3)
+    ]
+    institutions = SheetData(
+        "ss1",
+        "Spreadsheet ss1",
+        "0",
+        "Institutions",
+        {"format": "standard-institution", "category": "Category", "country": "C"},
+        data,
+        None,
+    )
+    # A composite sheet of another spreadsheet, that refers to a variable of ss1
+    rights = SheetData(
+        "ss2",
+        "Spreadsheet ss2",
+        "0",
+        "Rights",
+        {
+            "format": "composite-variable",
+            "category": "Category",
+            "country": "C",
+            "name": "A",
+            "data_type": db_collection.rights,
+            "variable_heading": "heading0",
+            "variable_name": "variable0",
+        },
+        [["right", "note"]] + [[f"right{i}", "note"] for i in range(3)],
+        None,
+    )
+    return [[institutions], [rights]]
+
+
+def _load_incrementally(
+    db_connection_url: str, spreadsheets_data: List[List[SheetData]], tmp_path
+):
+    with Flow("Incremental load") as flow:
+        add_sigla_pipeline_tasks(
+            task(lambda: ["ss1", "ss2"])(),
+            task(lambda: spreadsheets_data)(),
+            db_connection_url,
+            load_mode=LoadMode.incremental,
+            metrics_report_path=str(tmp_path / "load-metrics.json"),
+        )
+    with prefect.context({DB_CLIENT_KEY: InMemoryClient(db_connection_url)}):
+        assert flow.run().is_successful()
+
+
+def test_incremental_load_reloads_dependent_composite_sheets(tmp_path):
+    db_connection_url = f"memory://{uuid4().hex}/sigla"
+    _load_incrementally(db_connection_url, _spreadsheets_data("yes"), tmp_path)
+    # Only ss1 changes, which reloads the variable the rights of ss2 refer to
+    _load_incrementally(db_connection_url, _spreadsheets_data("no"), tmp_path)
+
+    db = InMemoryClient(db_connection_url).get_default_database()
+    variable = db.get_collection(db_collection.variables).find_one(
+        {"heading": "heading0"}
+    )
+    rights = list(db.get_collection(db_collection.rights).find({}))
+    InMemoryClient.drop_store(db_connection_url)
+    assert variable.get("type") == VariableType.composite
+    assert variable.get("hyperlink") == db_collection.rights
+    assert [right.get("variable") for right in rights] == [variable.get("_id")] * 3
+
+
+def test_stream_spreadsheet_loads_deferred_composite_sheets():
+    db_connection_url = f"memory://{uuid4().hex}/sigla"
+    institutions, rights = _spreadsheets_data("yes")
+    db = InMemoryClient(db_connection_url).get_default_database()
+    with prefect.context({DB_CLIENT_KEY: InMemoryClient(db_connection_url)}):
+        # The rights of ss2 wait for the institutions of ss1, which load them
+        _stream_spreadsheet.run(rights, db_connection_url, "run")
+        deferred_rights_count = db.get_collection(db_collection.rights).count_documents(
+            {}
+        )
+        _stream_spreadsheet.run(institutions, db_connection_url, "run")
+        rights_count = db.get_collection(db_collection.rights).count_documents({})
+        _load_deferred_composites.run(db_connection_url, "run")
+    deferred_sheets_count = db.get_collection(
+        db_collection.deferred_composite_sheets
+    ).count_documents({})
+    InMemoryClient.drop_store(db_connection_url)
+    assert (deferred_rights_count, rights_count, deferred_sheets_count) == (0, 3, 0)
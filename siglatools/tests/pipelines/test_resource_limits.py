@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import asyncio
+import threading
+import time
+
+import pytest
+from distributed import Client, Scheduler, Semaphore, Worker
+from prefect import Flow, task
+from prefect.engine.state import State
+
+from siglatools.pipelines.arguments import parse_resource_limits
+from siglatools.pipelines.constants import ExecutorType, ResourceType
+from siglatools.pipelines.executors import create_executor
+from siglatools.pipelines.resource_limits import SEMAPHORE_NAME_PREFIX
+from siglatools.pipelines.run_report import run_flow
+from siglatools.utils.exceptions import InvalidWorkflowInputs
+
+_lock = threading.Lock()
+_running = {"now": 0, "max": 0}
+
+
+def _record_write():
+    with _lock:
+        _running["now"] += 1
+        _running["max"] = max(_running.get("max"), _running.get("now"))
+    time.sleep(0.05)
+    with _lock:
+        _running["now"] -= 1
+
+
+@task(tags=[ResourceType.mongo])
+def _write(i: int):
+    _record_write()
+
+
+@task(tags=[ResourceType.mongo])
+def _write_or_fail(i: int):
+    if i == 0:
+        raise ValueError("The write failed.")
+    _record_write()
+
+
+@pytest.fixture
+def scheduler_address():
+    # A local cluster of two workers of three threads, in this process so that the workers share _running.
+    # The scheduler and workers run on their own event loop, the way LocalCluster(processes=False) runs them.
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def _start():
+        scheduler = await Scheduler(port=0, dashboard_address=":0")
+        workers = [await Worker(scheduler.address, nthreads=3) for _ in range(2)]
+        return scheduler, workers
+
+    scheduler, workers = asyncio.run_coroutine_threadsafe(_start(), loop).result()
+    yield scheduler.address
+
+    async def _close():
+        for worker in workers:
+            # Don't wait for task runs blocked on a lease
+            await worker.close(executor_wait=False)
+        await scheduler.close()
+
+    asyncio.run_coroutine_threadsafe(_close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_limit_resource():
+    with Flow("Resource limits") as flow:
+        _write.map(list(range(6)))
+    state = run_flow(
+        flow,
+        create_executor(ExecutorType.threads, n_threads=6),
+        None,
+        resource_limits=parse_resource_limits("mongo=2"),
+    )
+    assert state.is_successful()
+    assert _running.get("max") == 2
+
+
+def _run_on_cluster(flow: Flow, scheduler_address: str, resource_limits: str) -> State:
+    # Run in a thread, so that task runs waiting for leaked leases fail the test instead of blocking it
+    states = []
+    run = threading.Thread(
+        target=lambda: states.append(
+            run_flow(
+                flow,
+                create_executor(ExecutorType.scheduler, scheduler_address),
+                None,
+                resource_limits=parse_resource_limits(resource_limits),
+            )
+        ),
+        daemon=True,
+    )
+    run.start()
+    run.join(timeout=30)
+    assert states, "The flow run is still waiting for resource leases."
+    return states[0]
+
+
+def test_limit_resource_on_cluster(scheduler_address):
+    _running["max"] = 0
+    with Flow("Resource limits") as flow:
+        _write.map(list(range(6)))
+    state = _run_on_cluster(flow, scheduler_address, "mongo=2")
+    assert state.is_successful()
+    # The limit holds across the workers of the cluster
+    assert _running.get("max") == 2
+
+    _running["max"] = 0
+    with Flow("Resource limits") as flow:
+        writes = _write_or_fail.map(list(range(4)))
+    state = _run_on_cluster(flow, scheduler_address, "mongo=1")
+    # The failed task released its lease, so the other tasks ran
+    assert [
+        child_state.is_successful()
+        for child_state in state.result.get(writes).map_states
+    ] == [False, True, True, True]
+    assert _running.get("max") == 1
+    with Client(scheduler_address):
+        semaphore = Semaphore(name=f"{SEMAPHORE_NAME_PREFIX}-{ResourceType.mongo}-1")
+        assert semaphore.get_value() == 0
+
+
+def test_parse_resource_limits():
+    assert parse_resource_limits("sheets=2, http=0") == {
+        ResourceType.sheets: 2,
+        ResourceType.mongo: 16,
+        ResourceType.http: 0,
+    }
+    with pytest.raises(InvalidWorkflowInputs):
+        parse_resource_limits("disk=2")
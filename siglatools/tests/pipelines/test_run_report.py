@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+import json
+
+from prefect import Flow, task
+
+from siglatools.institution_extracters.utils import SheetData
+from siglatools.pipelines.constants import ExecutorType
+from siglatools.pipelines.executors import create_executor
+from siglatools.pipelines.run_report import run_flow
+
+
+@task
+def _extract(spreadsheet_id: str):
+    return [SheetData(spreadsheet_id, "", "0", "", {}, [], [])]
+
+
+@task
+def _count(spreadsheets_data):
+    return len(spreadsheets_data)
+
+
+def test_run_flow(tmp_path):
+    with Flow("Run report") as flow:
+        spreadsheets_data = _extract.map(["ss1", "ss2"])
+        _count(spreadsheets_data)
+    run_report_path = tmp_path / "run-report.json"
+    state = run_flow(
+        flow,
+        create_executor(ExecutorType.threads),
+        str(run_report_path),
+        measure_result_bytes=True,
+    )
+    assert state.is_successful()
+
+    report = json.loads(run_report_path.read_text())
+    assert report.get("state") == "Success"
+    assert sorted(
+        (task.get("task"), task.get("task_runs")) for task in report.get("tasks")
+    ) == [
+        ("_count-1", 1),
+        ("_extract-1", 2),
+    ]
+    assert all(task.get("result_bytes") > 0 for task in report.get("tasks"))
+    # The mapped runs are attributed to their spreadsheet, the run on both isn't
+    assert sorted(
+        (spreadsheet.get("spreadsheet_id"), spreadsheet.get("task_runs"))
+        for spreadsheet in report.get("spreadsheets")
+    ) == [("ss1", 1), ("ss2", 1)]
+    critical_path = [
+        run.get("task_run") for run in report.get("critical_path").get("task_runs")
+    ]
+    assert critical_path[-1] == "_count-1"
+    assert critical_path[0] in ["_extract-1[0]", "_extract-1[1]"]
+
+
+def test_run_flow_without_result_bytes(tmp_path):
+    with Flow("Run report") as flow:
+        _count(_extract.map(["ss1"]))
+    run_report_path = tmp_path / "run-report.json"
+    run_flow(flow, create_executor(ExecutorType.threads), str(run_report_path))
+
+    report = json.loads(run_report_path.read_text())
+    assert all(task.get("result_bytes") is None for task in report.get("tasks"))
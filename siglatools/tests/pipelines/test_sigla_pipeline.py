@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+
+from uuid import uuid4
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from siglatools.databases.constants import DatabaseCollection as db_collection
+from siglatools.databases.constants import LoadMode, VariableType
+from siglatools.databases.memory_client import InMemoryClient, InMemoryCollection
+from siglatools.institution_extracters.synthetic_sheets import (
+    MASTER_SPREADSHEET_ID,
+    CorpusScale,
+    SyntheticSpreadsheets,
+)
+from siglatools.pipelines.constants import ExecutorType
+from siglatools.pipelines.exceptions import PrefectFlowFailure
+from siglatools.pipelines.executors import create_executor
+from siglatools.pipelines.sigla_pipeline import run_sigla_pipeline
+
+# The corpus of the first run, and the smaller corpus of the second run, which replaces it
+FIRST_SCALE = CorpusScale(spreadsheets=3, sheets=5, rows=4, institutions=3)
+SECOND_SCALE = CorpusScale(spreadsheets=3, sheets=5, rows=3, institutions=2)
+# The documents of the second corpus
+SECOND_SCALE_COUNTS = {
+    db_collection.institutions: 18,
+    db_collection.variables: 54,
+    db_collection.rights: 9,
+    db_collection.amendments: 9,
+    db_collection.body_of_law: 0,
+    "composite_variables": 6,
+    db_collection.spreadsheet_fingerprints: 3,
+}
+
+
+@pytest.fixture
+def db_connection_url():
+    db_connection_url = f"memory://{uuid4().hex}/sigla"
+    yield db_connection_url
+    InMemoryClient.drop_store(db_connection_url)
+
+
+def _run(db_connection_url: str, scale: CorpusScale, tmp_path, **kwargs):
+    run_sigla_pipeline(
+        MASTER_SPREADSHEET_ID,
+        None,
+        db_connection_url,
+        metrics_report_path=str(tmp_path / "load-metrics.json"),
+        executor=create_executor(ExecutorType.threads),
+        run_report_path=None,
+        db_client=InMemoryClient(db_connection_url),
+        spreadsheets=SyntheticSpreadsheets(scale),
+        **kwargs,
+    )
+
+
+def _count_documents(db_connection_url: str):
+    db = InMemoryClient(db_connection_url).get_default_database()
+    counts = {
+        collection: db.get_collection(collection).count_documents({})
+        for collection in [
+            db_collection.institutions,
+            db_collection.variables,
+            db_collection.rights,
+            db_collection.amendments,
+            db_collection.body_of_law,
+            db_collection.spreadsheet_fingerprints,
+        ]
+    }
+    counts["composite_variables"] = db.get_collection(
+        db_collection.variables
+    ).count_documents({"type": VariableType.composite})
+    return counts
+
+
+@pytest.mark.parametrize(
+    "load_mode, streaming",
+    [
+        (LoadMode.clean_up, False),
+        (LoadMode.swap, False),
+        (LoadMode.diff, False),
+        (LoadMode.generation, False),
+        (LoadMode.incremental, False),
+        (LoadMode.clean_up, True),
+    ],
+)
+def test_run_sigla_pipeline(db_connection_url, tmp_path, load_mode, streaming):
+    _run(
+        db_connection_url,
+        FIRST_SCALE,
+        tmp_path,
+        load_mode=load_mode,
+        streaming=streaming,
+    )
+    _run(
+        db_connection_url,
+        SECOND_SCALE,
+        tmp_path,
+        load_mode=load_mode,
+        streaming=streaming,
+    )
+
+    assert _count_documents(db_connection_url) == SECOND_SCALE_COUNTS
+
+
+def test_run_sigla_pipeline_keeps_indexes_when_dropping_them_fails(
+    db_connection_url, tmp_path, monkeypatch
+):
+    db = InMemoryClient(db_connection_url).get_default_database()
+    db.get_collection(db_collection.rights).create_index([("name", 1)])
+    db.get_collection(db_collection.variables).create_index([("name", 1)])
+    index_information = {
+        collection: db.get_collection(collection).index_information()
+        for collection in [db_collection.rights, db_collection.variables]
+    }
+    drop_index = InMemoryCollection.drop_index
+
+    def _drop_index(collection, name):
+        if collection.name == db_collection.variables:
+            raise OperationFailure("Dropping the index failed.")
+        drop_index(collection, name)
+
+    monkeypatch.setattr(InMemoryCollection, "drop_index", _drop_index)
+    with pytest.raises(PrefectFlowFailure):
+        _run(db_connection_url, FIRST_SCALE, tmp_path, bulk_load=True)
+
+    # The index dropped before the failure is rebuilt, and the load is skipped
+    assert {
+        collection: db.get_collection(collection).index_information()
+        for collection in [db_collection.rights, db_collection.variables]
+    } == index_information
+    assert db.get_collection(db_collection.institutions).count_documents({}) == 0